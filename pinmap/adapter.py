@@ -4,36 +4,199 @@
 # SPDX-License-Identifier: EUPL-1.2
 
 import os
+import sys
+import time
 import ipywidgets as widgets
+import numpy as np
 import pandas as pd
 import pathlib as pl
 import asyncio
+import contextlib
+import logging
 import threading
 import queue
+import weakref
 
 from pinmap.specifiers.board import Board
 
 from pinmap import StandardStrings as PMTSTR
-from pinmap.helper import PinSelector, ClearButton
+from pinmap.helper import PinSelector, PinCell, ClearButton
 from pinmap.filebackend import MappingColumnLabels
 from pinmap.filebackend import OptionsColumnLabels
+from pinmap.pinoptions import PinOptions
 from pinmap.filebackend.base import FileBackend
 from pinmap.filebackend.raw  import RawBackend as DefaultDataBackend
 from pinmap.filebackend.pdf  import PdfBackend as DefaultReportBackend
+from pinmap.filebackend.firmware import FirmwareBackend, CHeaderBackend
+from pinmap.compatibility import CompatibilityMatrix
+from pinmap.autosave import MappingJournal, JOURNAL_FILE_ENDING, SNAPSHOT_FILE_ENDING
+from pinmap.diff import MappingDiff
+from pinmap.export import ExportJob
+from pinmap.layout import PinGridLayout
+from pinmap.listeners import MappingListeners
+from pinmap.matching import assignBus
+from pinmap.reload import ReloadReport, remapMapping
+from pinmap.search import OptionsSearchIndex
+from pinmap.stats import UtilizationStats
+from pinmap.session import SessionSnapshot, SESSION_DERIVED_STATE, sourceFileTimes
+from pinmap.validation import ValidationReport, validateMapping
+
+
+class LoadStages():
+    __slots__ = ()
+    MAPPING          = 'Mapping'
+    OPTIONS          = 'Options'
+    FRONTEND         = 'Frontend'
+    SELECTOR_OPTIONS = 'Selector-Options'
+    INIT             = 'Init'
 
 def PinSelectorUpdate(change: dict) -> None:
     """Static function which is used as callback for updates of pin-selectors in the frontend."""
-    change['owner'].parent.updateQueue.put(change['owner'])
+    pinSelector = change['owner']
+    if pinSelector.typeAhead and change['new'] not in pinSelector.menuOptions:
+        # Text typed into the combobox which is no option yet, narrow the suggestions instead of changing the mapping.
+        pinSelector.narrowOptions(change['new'])
+        return
+    pinSelector.parent.enqueueSelectorChange(pinSelector)
+
+UPDATER_STOP = 'stop'
+LOGGER       = logging.getLogger(__name__)
+
+class FrontendTask(object):
+    """Item of the update queue which runs function on the update loop instead of applying a selector change, so work which
+    changes widgets, e.g. a reload of the base files, is done on the thread or task which owns the widgets."""
+    __slots__ = ('function',)
+
+    def __init__(self, function: callable) -> None:
+        self.function = function
+
+class SelectorRefresh(object):
+    """Item of the update queue which recomputes the options of the pin-selectors at mappingIdxs without changing the
+    mapping. Refreshes are only applied once no selector change is pending, since applying the options resets the value
+    of a pin-selector to the mapping, and are covered by the frontend update which follows a selector change."""
+    __slots__ = ('mappingIdxs',)
+
+    def __init__(self, mappingIdxs: list[int]) -> None:
+        self.mappingIdxs = mappingIdxs
+
+def ReportUpdateError(parent: object, exception: Exception) -> None:
+    """Keep an exception raised by an item of the update loop in updateError and log it, the loop continues with the next
+    item so the frontend keeps following later changes."""
+    parent.updateError = exception
+    LOGGER.error("Update of the pin mapping failed", exc_info=exception)
+
+def RunUpdateItem(parent: object, function: callable, *args) -> None:
+    try:
+        function(*args)
+    except Exception as exception:
+        ReportUpdateError(parent, exception)
+
+def ProcessSelectorChanges(parent: object, changedPinSelectors: list) -> object | None:
+    """Process every pin-selector once with its latest value, in the order of its last change. Returns the last processed
+    pin-selector or None."""
+    changedPinSelectors = list(reversed(dict.fromkeys(reversed(changedPinSelectors))))
+    for changedPinSelector in changedPinSelectors:
+        RunUpdateItem(parent, parent.processSelectorChange, changedPinSelector)
+    return changedPinSelectors[-1] if len(changedPinSelectors) > 0 else None
 
 def UpdaterFunction(parent: object) -> None:
+    pendingPinSelector = None
+    pendingRefreshIdxs = set()
     while True:
         changedPinSelector = parent.updateQueue.get()
-        parent.selectorChangeUpdateMapping(changedPinSelector)
-        if parent.updateQueue.empty():
-            parent.updateFrontend(changedPinSelector)
+        if changedPinSelector is UPDATER_STOP:
+            return
+        if changedPinSelector is None:
+            # Queued by a lazy adapter once its pin-selectors were created, see Adapter._queueSelectorOptions.
+            RunUpdateItem(parent, parent._fillSelectorOptions)
+        elif isinstance(changedPinSelector, FrontendTask):
+            RunUpdateItem(parent, changedPinSelector.function)
+        elif isinstance(changedPinSelector, SelectorRefresh):
+            pendingRefreshIdxs.update(changedPinSelector.mappingIdxs)
+        else:
+            RunUpdateItem(parent, parent.processSelectorChange, changedPinSelector)
+            pendingPinSelector = changedPinSelector
+        if not parent.updateQueue.empty():
+            continue
+        if pendingPinSelector is not None:
+            RunUpdateItem(parent, parent.updateFrontend, pendingPinSelector)
+        elif len(pendingRefreshIdxs) > 0:
+            RunUpdateItem(parent, parent.refreshSelectorOptions, pendingRefreshIdxs)
+        pendingPinSelector = None
+        pendingRefreshIdxs = set()
+
+async def AsyncUpdaterFunction(parent: object) -> None:
+    """Update loop which runs as task on the event loop of the kernel, so all widget states are changed from the thread which
+    also handles the widget comms. Changes which arrive within guiUpdateCoalesceTime are coalesced into one frontend update.
+    Like UpdaterFunction, the items are run in queue order and an item which raises does not stop the loop."""
+    while True:
+        changedPinSelectors = [await parent.updateQueue.get()]
+        try:
+            if changedPinSelectors[0] is None:
+                # Queued by a lazy adapter once its pin-selectors were created, see Adapter._queueSelectorOptions.
+                for _ in parent._selectorOptionsFill():
+                    await asyncio.sleep(0)
+                continue
+            await asyncio.sleep(parent.guiUpdateCoalesceTime)
+            while not parent.updateQueue.empty():
+                changedPinSelectors.append(parent.updateQueue.get_nowait())
+            fillQueued  = None in changedPinSelectors
+            refreshIdxs = set(mappingIdx for item in changedPinSelectors if isinstance(item, SelectorRefresh) for mappingIdx in item.mappingIdxs)
+            # The selector changes are coalesced between two frontend tasks only, so e.g. a reload queued after a change
+            # runs after it. A queued fill of the options of a lazy adapter and queued refreshes are covered by the
+            # frontend update of all pin-selectors.
+            lastPinSelector = None
+            pendingChanges  = []
+            for item in changedPinSelectors:
+                if isinstance(item, FrontendTask):
+                    lastPinSelector = ProcessSelectorChanges(parent, pendingChanges) or lastPinSelector
+                    pendingChanges  = []
+                    RunUpdateItem(parent, item.function)
+                elif item is not None and not isinstance(item, SelectorRefresh):
+                    pendingChanges.append(item)
+            lastPinSelector = ProcessSelectorChanges(parent, pendingChanges) or lastPinSelector
+            if lastPinSelector is not None:
+                await parent.updateFrontendAsync(lastPinSelector)
+            elif fillQueued or parent._frontendUpdateAbandoned:
+                # No selector changed, but an earlier update of all pin-selectors was abandoned or a fill is pending.
+                await parent.updateFrontendAsync(parent._firstPinSelector())
+            elif len(refreshIdxs) > 0 and parent.updateQueue.empty():
+                parent.refreshSelectorOptions(refreshIdxs)
+            elif len(refreshIdxs) > 0:
+                # Changes arrived meanwhile, keep the refresh for the next batch.
+                parent.updateQueue.put_nowait(SelectorRefresh(refreshIdxs))
+        except Exception as exception:
+            ReportUpdateError(parent, exception)
+
+def WatcherFunction(parent: object, stopEvent: threading.Event) -> None:
+    """Watch loop of adapters without event loop. It only polls the modification times, the reload itself changes widgets
+    and is therefore run by the update loop. A reload is only queued if the previous one has run."""
+    reloadDone = threading.Event()
+    reloadDone.set()
+
+    def reload() -> None:
+        if not stopEvent.is_set():
+            parent.reloadChangedBaseFiles()
+        reloadDone.set()
+
+    while not stopEvent.wait(parent.watchInterval):
+        if reloadDone.is_set() and parent._baseFileTimes() != parent._watchedFileTimes:
+            reloadDone.clear()
+            parent.enqueueFrontendTask(reload)
+
+async def AsyncWatcherFunction(parent: object) -> None:
+    """Watch loop which runs as task on the event loop of the kernel, so reloads change the widgets from the thread which
+    also handles the widget comms."""
+    while True:
+        await asyncio.sleep(parent.watchInterval)
+        parent.reloadChangedBaseFiles()
 
 class Adapter(Board):
-    """TODO PMi description"""
+    """Pin mapping of a baseboard onto an MCU board. The mapping table holds one row per pin of the baseboard with the
+    pin-module-function-combination of the MCU board assigned to it, the PinOptions hold all combinations the MCU board
+    offers. The assignments are edited in the notebook with one pin-selector per pin, see mappingFrontEnd, or without
+    widgets through an AdapterFork, and are imported and exported with the file backends. Every change of the mapping
+    is reported to the mappingListeners, e.g. the autosave journal and the utilization statistics."""
 
     def __init__(self, *args, **kwargs) -> None:
         """Initialize a AdaperPinMapping object.
@@ -46,15 +209,37 @@ class Adapter(Board):
         revision                : Revision of the adapter, defaults to >A<.
         generate                : A tuple with two entries, mappingFile path to the file containing the pins to be mapped on, e.g. the baseboard pin file, and optionsFile path to the file containing the pins to be mapped, e.g. the MCU-board pin file. Not used if importPath is set. Filetype must fit file backend.
         importPath              : Path to a valid pinmapping export, which is a directory containing and export directory named >Adapter_[revision]_[baseboard.vendor]_[baseboard.shortname]_[baseboard.revision]_[mcuboard.vendor]_[mcuboard.shortname]_[mcuboard.revision]<, which itself contains at least two files which fit the used file backend: mapping.*, options.*. Ignored if generate is set.
+        catalogPath             : Path to a bundle file which holds several adapters, e.g. a database of the SqliteBackend. If set, it is used as import and export bundle instead of a bundle file per adapter.
         exportPath              : Path to which a pinmapping is exported to by generating a directory named >Adapter_[revision]_[baseboard.vendor]_[baseboard.shortname]_[baseboard.revision]_[mcuboard.vendor]_[mcuboard.shortname]_[mcuboard.revision]<. Defaults to the working directory.
         backendImport           : Sets the used file backend for import files. Default is >raw<.
         backendExport           : Sets the used file backend for export files. Default is >raw<.
-        backendReport           : Sets the used file backend for the report. Default is >pdf<.
+        backendReport           : Sets the used file backend for the report. Default is >pdf<, the HtmlBackend writes a lightweight HTML/SVG report instead.
+        reportHeaderLogoPath    : Path to the logo image shown in the header of every report page, no logo is shown if not set.
+        reportFooterLogoPath    : Path to the logo image shown in the footer of every report page, no logo is shown if not set.
+        backendFirmware         : Sets the backend for the firmware pin configuration written by exportFirmwareConfig. Default is the CHeaderBackend, the JsonConfigBackend writes a JSON pin configuration instead.
+        firmwarePrefix          : Prefix of all identifiers in the firmware pin configuration, defaults to the name of the adapter.
+        firmwareAllowErrors     : Write the firmware pin configuration even if the mapping violates the design rules, the errors are then annotated in it. Defaults to False, i.e. exportFirmwareConfig raises an exception, see validate.
+        backendOptions          : Sets the used file backend for reading the options file when generating, e.g. the VendorBackend for vendor pin-mux databases. Defaults to backendImport.
+        sessionPath             : Path of a binary session snapshot written by saveSession. If the snapshot is up to date, the adapter is restored from it without parsing the base files or computing the pin-selector options, otherwise it is imported or generated as usual. The snapshot is unpickled, which can execute arbitrary code, only use session files you wrote yourself, see SessionSnapshot.
+        lazy                    : Only parse the mapping and the notes when the adapter is created. The PinOptions are derived and the widgets are created when mappingFrontEnd or a query first needs them, the options of the pin-selectors are then computed by the update loop after the frontend is shown. The duration of every stage is kept in loadTimings. Defaults to False.
+        sharedOptions           : PinOptions object used instead of reading the options file when generating or reloading, e.g. to map one MCU board onto several baseboards, see CompositeAdapter.
         guiLabelIdWidth         : String defining the pin-id label width in pixel, default is 25.
         guiLabelSignalWidth     : String defining the signal label width in pixel, defaults to 140
         guiDropboxWidth         : String defining the dropbox width in pixel, defaults to 350
         guiColumnSpacing        : String defining the spacing between the pinselector-columns in pixel, defaults to 10
         guiExtraEmtpyLines      : Number of empty lines in the extraMappingDatagrid, defaults to 10
+        guiMode                 : Either >grid< to show one pin-selector per pin arranged like the pin-grid of the baseboard, or >datagrid< to show the mapping as one virtualized ipydatagrid table which is edited with a single pin-selector for the selected cell, defaults to >grid<.
+        guiDatagridHeight       : String defining the height of the mapping datagrid in pixel, defaults to 600.
+        guiSelectorMode         : Either >dropdown< to select pins from dropdown menus or >combobox< to use type-ahead comboboxes which narrow the options while typing, defaults to >dropdown<.
+        guiSearchMaxOptions     : Maximum number of suggestions shown by a combobox while typing, defaults to 50.
+        guiAsyncUpdates         : Run the frontend updates as asyncio task on the running event loop of the kernel instead of a separate thread, defaults to True. Falls back to a thread if there is no running event loop.
+        guiUpdateChunkSize      : Number of pin-selectors which are refreshed before control is yielded back to the event loop, defaults to 20.
+        guiUpdateCoalesceTime   : Time in seconds to wait for further changes which are then handled with one frontend update, defaults to 0.05.
+        guiPreviewDelay         : Time in seconds without changes of the mapping or the notes after which the reportPreview is rendered again, defaults to 0.5.
+        autosave                : Journal every mapping change in the background and compact the journal into an autosave snapshot next to it when idle, on close or on exit, defaults to False. The export files are only written by explicit exports.
+        autosaveIdleTime        : Time in seconds without changes after which the autosave journal is compacted, defaults to 5.
+        watch                   : Watch the mapping and options file for changes and reload them while keeping the assignments, see reloadBaseFiles, defaults to False.
+        watchInterval           : Time in seconds between two checks of the modification times of the watched files, defaults to 1.
         """
 
         self.baseboard = kwargs.pop('baseboard', Board(vendor="XXX", longname='dummybaseboard', shortname="XXX", revision='A'))
@@ -67,18 +252,71 @@ class Adapter(Board):
         # object properties might not work.
         super(Adapter, self).__init__(*args, **kwargs)
 
-        if self._generateParameters is not None:
-            self._readBaseFiles(self._generateParameters[0], self._generateParameters[1])
+        self.mappingLock       = threading.RLock()
+        self.mappingListeners  = MappingListeners(self)
+        self.forks             = []
+        self.conflictIndex     = None
+        # Duration in seconds of every LoadStages stage, the options stage is missing if the options come with the mapping.
+        self.loadTimings       = {}
+        self._frontendPending  = True
+        initStart = time.perf_counter()
+
+        session = self._readSession()
+        with self._loadStage(LoadStages.MAPPING):
+            if session is not None:
+                self._restoreSession(session)
+            elif self._generateParameters is not None:
+                self._readBaseFiles(self._generateParameters[0], self._generateParameters[1])
+            else:
+                self.importMapping()
+        if not self.lazy:
+            # Derive the PinOptions and create the widgets right away, a lazy adapter does this on first use.
+            self._ensureOptions()
+            self._ensureFrontendElements()
+
+        try:
+            self._eventLoop = asyncio.get_running_loop() if self._initkwargs.get('guiAsyncUpdates', True) else None
+        except RuntimeError:
+            self._eventLoop = None
+        # Last exception raised by the update loop, see ReportUpdateError.
+        self.updateError = None
+        if self._eventLoop is not None:
+            self.updateQueue  = asyncio.Queue()
+            self._frontendUpdateAbandoned = False
+            self._updaterTask = self._eventLoop.create_task(AsyncUpdaterFunction(self))
         else:
-            self.importMapping()
-        self._generateFrontendElements()
-
-        self.updateQueue = queue.Queue(maxsize=self.mapping.shape[0])
-        self._workerThread = threading.Thread(target=UpdaterFunction, args=(self, ))
-        self._workerThread.start()
+            # Unbounded, so queueing from listeners or other threads never blocks while the update loop waits for a lock.
+            self.updateQueue = queue.Queue()
+            self._workerThread = threading.Thread(target=UpdaterFunction, args=(self, ))
+            self._workerThread.start()
+
+        if self._initkwargs.get('autosave', False):
+            self.enableAutosave(self._initkwargs.get('autosaveIdleTime', 5.0))
+        if self._initkwargs.get('watch', False):
+            self.enableWatch()
+        self.loadTimings[LoadStages.INIT] = time.perf_counter() - initStart
+        if self.lazy and not self._frontendPending:
+            # A query during the initialization needed the pin-selectors, their options are filled by the update loop.
+            self._queueSelectorOptions()
+
+    def close(self) -> None:
+        """Stop autosave, watch, the reportPreview and the update loop. The adapter must not be edited afterwards."""
+        self.disableAutosave()
+        self.disableWatch()
+        if getattr(self, '_reportPreview', None) is not None:
+            self._reportPreview.close()
+            del self._reportPreview
+        if getattr(self, '_updaterTask', None) is not None:
+            self._updaterTask.cancel()
+            self._updaterTask = None
+        if getattr(self, '_workerThread', None) is not None:
+            self.updateQueue.put(UPDATER_STOP)
+            if self._workerThread is not threading.current_thread():
+                self._workerThread.join()
+            self._workerThread = None
 
     def __del__(self) -> None:
-        self._workerThread.join()
+        self.close()
 
     @Board.name.getter
     def name(self) -> str:
@@ -90,12 +328,87 @@ class Adapter(Board):
             raise Exception("Object not populated yet, please import or generate.")
         return self._mapping
 
+    def _ensureOptions(self) -> None:
+        """Read the options file if this was deferred, a lazy adapter does this on first use."""
+        if hasattr(self, '_options'):
+            return
+        if getattr(self, '_optionsFilePath', None) is None:
+            raise Exception("Object not populated yet, please import or generate.")
+        with self.mappingLock:
+            if not hasattr(self, '_options'):
+                with self._loadStage(LoadStages.OPTIONS):
+                    self._options = self._readOptionsfile(self._optionsFilePath)
+                self._optionsFilePath = None
+
     @property
     def options(self) -> pd.DataFrame:
-        if not hasattr(self, '_options'):
-            raise Exception("Object not populated yet, please import or generate.")
+        self._ensureOptions()
         return self._options
 
+    @property
+    def lazy(self) -> bool:
+        return self._initkwargs.get('lazy', False)
+
+    @contextlib.contextmanager
+    def _loadStage(self, stage: str):
+        """Add the duration of the enclosed block to the load timing of stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.loadTimings[stage] = self.loadTimings.get(stage, 0.0) + time.perf_counter() - start
+
+    @property
+    def frontendGenerated(self) -> bool:
+        """Whether the widgets were created, a lazy adapter creates them when they are first needed."""
+        return not getattr(self, '_frontendPending', False)
+
+    def _ensureFrontendElements(self) -> None:
+        """Create the widgets if this was deferred, the options of the pin-selectors are computed right away unless the
+        adapter is lazy, then they are queued for the update loop."""
+        if self.frontendGenerated:
+            return
+        with self.mappingLock:
+            if self.frontendGenerated:
+                return
+            # Cleared first, since the generation itself uses buses and pinCells.
+            self._frontendPending = False
+            try:
+                with self._loadStage(LoadStages.FRONTEND):
+                    self._generateFrontendElements()
+                    # The mapping might have been changed before, e.g. by merging a fork into a lazy adapter.
+                    self._refreshBusModuleKeys()
+                    for bus, moduleKey in getattr(self, '_sessionBusModuleKeys', {}).items():
+                        self.buses[bus]['Module-Key'] = moduleKey
+                    self._sessionBusModuleKeys = {}
+            except Exception:
+                # The widgets are generated again on the next use.
+                self._frontendPending = True
+                raise
+            if not self.lazy:
+                self._fillSelectorOptions()
+            elif hasattr(self, 'updateQueue'):
+                self._queueSelectorOptions()
+
+    @property
+    def buses(self) -> dict:
+        """Members and module key of every bus, the members are the pin-selectors or PinCells of its pins."""
+        self._ensureFrontendElements()
+        return self._buses
+
+    @buses.setter
+    def buses(self, value: dict) -> None:
+        self._buses = value
+
+    @property
+    def pinCells(self) -> list[PinCell]:
+        self._ensureFrontendElements()
+        return self._pinCells
+
+    @pinCells.setter
+    def pinCells(self, value: list[PinCell]) -> None:
+        self._pinCells = value
+
     @property
     def notes(self) -> str:
         return self.noteBox.value
@@ -112,6 +425,13 @@ class Adapter(Board):
     def edbRowVals(self):
         return getattr(self, '_edbRowVals', pd.DataFrame())
 
+    @property
+    def layout(self) -> PinGridLayout:
+        """Sparse layout index of the baseboard pins, grouped by connector."""
+        if not hasattr(self, '_layout'):
+            self._layout = PinGridLayout(self.mapping)
+        return self._layout
+
     @property
     def busList(self) -> list[str]:
         """Return a list of all buses present in the pinmapping."""
@@ -129,6 +449,8 @@ class Adapter(Board):
 
     @property
     def importBundlePath(self) -> pl.Path:
+        if 'catalogPath' in self._initkwargs:
+            return pl.Path(self._initkwargs['catalogPath'])
         return self.importPath.joinpath(self.name + self.backendImport.getFileEnding())
 
     @property
@@ -137,12 +459,30 @@ class Adapter(Board):
 
     @property
     def exportBundlePath(self) -> pl.Path:
+        if 'catalogPath' in self._initkwargs:
+            return pl.Path(self._initkwargs['catalogPath'])
         return self.exportPath.joinpath(self.name + self.backendExport.getFileEnding())
 
     @property
     def exportDirPath(self) -> pl.Path:
         return self.exportPath.joinpath(self.name)
 
+    @property
+    def importJournalPath(self) -> pl.Path:
+        return self.importPath.joinpath(self.name + JOURNAL_FILE_ENDING)
+
+    @property
+    def exportJournalPath(self) -> pl.Path:
+        return self.exportPath.joinpath(self.name + JOURNAL_FILE_ENDING)
+
+    @property
+    def importAutosavePath(self) -> pl.Path:
+        return self.importPath.joinpath(self.name + SNAPSHOT_FILE_ENDING)
+
+    @property
+    def exportAutosavePath(self) -> pl.Path:
+        return self.exportPath.joinpath(self.name + SNAPSHOT_FILE_ENDING)
+
     @property
     def backendImport(self) -> FileBackend:
         return self._initkwargs.get('backendImport', DefaultDataBackend)
@@ -151,44 +491,384 @@ class Adapter(Board):
     def backendExport(self) -> FileBackend:
         return self._initkwargs.get('backendExport', DefaultDataBackend)
 
+    @property
+    def backendOptions(self) -> FileBackend:
+        return self._initkwargs.get('backendOptions', self.backendImport)
+
+    @property
+    def reportHeaderLogoPath(self) -> pl.Path | None:
+        return self._initkwargs.get('reportHeaderLogoPath', None)
+
+    @property
+    def reportFooterLogoPath(self) -> pl.Path | None:
+        return self._initkwargs.get('reportFooterLogoPath', None)
+
     @property
     def backendReport(self) -> FileBackend:
         return self._initkwargs.get('backendReport', DefaultReportBackend)
 
+    @property
+    def backendFirmware(self) -> FirmwareBackend:
+        return self._initkwargs.get('backendFirmware', CHeaderBackend)
+
     def importMapping(self):
         if self.backendImport.hasBundleSupport():
-            self._mapping, self._options, self._notes = self.backendImport.readBundle(self.importBundlePath)
+            self._mapping, self._options, notes = self.backendImport.readBundle(self.importBundlePath, name=self.name)
+            self.notes = notes
+            self._invalidateDerivedState()
         else:
             self._readBaseFiles(self.importDirPath.joinpath('mapping' + self.backendImport.getDataFileEnding()), self.importDirPath.joinpath('options' + self.backendImport.getDataFileEnding()))
             self.notes = self.backendImport.readNotesfile(self.importDirPath.joinpath('notes' + self.backendImport.getTextFileEnding()))
+        # Replay changes which were saved by autosave but not exported yet.
+        journaledNotes = MappingJournal.replay(self.importJournalPath, self._mapping, self.importAutosavePath)
+        if journaledNotes is not None:
+            self.notes = journaledNotes
+
+    @property
+    def sessionPath(self) -> pl.Path | None:
+        sessionPath = self._initkwargs.get('sessionPath', None)
+        return None if sessionPath is None else pl.Path(sessionPath)
+
+    def _sessionSourceTimes(self) -> tuple:
+        """Modification times of all files the adapter is created from, a session snapshot is stale if any of them changed."""
+        if self._generateParameters is None and self.backendImport.hasBundleSupport():
+            sourcePaths = [self.importBundlePath]
+        else:
+            sourcePaths = list(self.baseFilePaths)
+        if self._generateParameters is None:
+            sourcePaths.extend([self.importJournalPath, self.importAutosavePath])
+        return sourceFileTimes(sourcePaths)
+
+    def _readSession(self) -> SessionSnapshot | None:
+        if self.sessionPath is None:
+            self.sessionRestored = False
+            return None
+        session = SessionSnapshot.read(self.sessionPath, self.name, self._sessionSourceTimes())
+        self.sessionRestored = session is not None
+        return session
+
+    def _restoreSession(self, session: SessionSnapshot) -> None:
+        self._mapping = session.mapping
+        self._options = session.options
+        self.notes    = session.notes
+        for attribute, value in session.derivedState.items():
+            setattr(self, attribute, value)
+        self._sessionSelectorOptions = session.selectorOptions
+        self._sessionBusModuleKeys   = session.busModuleKeys
+
+    def saveSession(self, filepath: pl.Path | str | None = None) -> None:
+        """Write a binary snapshot of the current state including the derived indexes and the options of all pin-selectors,
+        see SessionSnapshot. An adapter created with this file as sessionPath is restored without recomputation. The widgets
+        of a lazy adapter are not created for this, the snapshot then holds no pin-selector options. The snapshot is a
+        pickle file which is only meant to be read back by yourself, do not share it.
+
+        Parameters
+        ----------
+        filepath : Path of the snapshot, defaults to sessionPath.
+        """
+        filepath = self.sessionPath if filepath is None else pl.Path(filepath)
+        if filepath is None:
+            raise Exception("No session path given, pass filepath or set sessionPath.")
+        with self.mappingLock:
+            if self.frontendGenerated:
+                selectorOptions = {pinSelector.mappingIdx: (pinSelector.menuOptions, pinSelector.allowedKeys)
+                                   for bus in self.buses.values() for pinSelector in bus['Members'] if getattr(pinSelector, 'allowedKeys', None) is not None}
+                busModuleKeys   = {bus: self.buses[bus]['Module-Key'] for bus in self.buses}
+            else:
+                # The restored adapter derives them when it creates its widgets, like after an import.
+                selectorOptions = {}
+                busModuleKeys   = {}
+            # Build the lazy indexes, so they are part of the snapshot.
+            self._buildDerivedState()
+            derivedState    = {attribute: getattr(self, attribute) for attribute in SESSION_DERIVED_STATE if hasattr(self, attribute)}
+            session = SessionSnapshot(self.name, self._sessionSourceTimes(), self.mapping.copy(), self.options, self.notes,
+                                      busModuleKeys, selectorOptions, derivedState)
+        session.write(filepath)
 
     def generateMapping(self, optionsFile: pl.Path | str, mappingFile: pl.Path | str) -> None:
         self._readBaseFiles(optionsFile, mappingFile)
 
     def _readBaseFiles(self, mappingFilePath: pl.Path | str, optionsFilePath: pl.Path | str) -> None:
+        """Read the mapping file, the options file is only read and the PinOptions derived on first use of options."""
         self._mapping = self.backendImport.readMappingfile(mappingFilePath)
+        if hasattr(self, '_options'):
+            del self._options
+        self._optionsFilePath = optionsFilePath
+        self._updateGridValues()
+        self._invalidateDerivedState()
+
+    def _readOptionsfile(self, optionsFilePath: pl.Path | str) -> PinOptions:
+        if self._initkwargs.get('sharedOptions') is not None:
+            return self._initkwargs['sharedOptions']
+        return self.backendOptions.readOptionsfile(optionsFilePath)
+
+    def _updateGridValues(self) -> None:
         self._edbColVals = pd.unique(self._mapping[MappingColumnLabels.PINGRID_COLUMN])
         self._edbColVals.sort()
         self._edbColVals = pd.DataFrame(self._edbColVals, columns=[MappingColumnLabels.PINGRID_COLUMN])
         self._edbRowVals = pd.unique(self._mapping[MappingColumnLabels.PINGRID_ROW])
         self._edbRowVals.sort()
         self._edbRowVals = pd.DataFrame(self._edbRowVals, columns=[MappingColumnLabels.PINGRID_ROW])
-        self._options = self.backendImport.readOptionsfile(optionsFilePath)
+
+    @property
+    def baseFilePaths(self) -> tuple[pl.Path, pl.Path]:
+        """Paths of the mapping and the options file, i.e. the generate parameters or the files of the import directory."""
+        if self._generateParameters is not None:
+            return (pl.Path(self._generateParameters[0]), pl.Path(self._generateParameters[1]))
+        return (self.importDirPath.joinpath('mapping' + self.backendImport.getDataFileEnding()), self.importDirPath.joinpath('options' + self.backendImport.getDataFileEnding()))
+
+    def reloadBaseFiles(self, mappingFilePath: pl.Path | str | None = None, optionsFilePath: pl.Path | str | None = None) -> ReloadReport:
+        """Read edited mapping and options files and carry the current assignments over, see remapMapping. The keys of the
+        assignments are remapped to the new options. Assignments whose pin or option was removed are cleared, assignments which
+        violate edited regexes are kept, both are reported in the returned ReloadReport. The pin-selectors are only rebuilt if
+        pins were added, removed or relabeled, otherwise only the selectors whose options changed are updated.
+
+        Parameters
+        ----------
+        mappingFilePath : Edited mapping file, defaults to the first entry of baseFilePaths.
+        optionsFilePath : Edited options file, defaults to the second entry of baseFilePaths.
+        """
+        mappingFilePath = self.baseFilePaths[0] if mappingFilePath is None else mappingFilePath
+        optionsFilePath = self.baseFilePaths[1] if optionsFilePath is None else optionsFilePath
+        newMapping = self.backendImport.readMappingfile(mappingFilePath)
+        newOptions = self._readOptionsfile(optionsFilePath)
+        with self.mappingLock, self.mappingListeners.change():
+            (oldMapping, oldOptions) = (self.mapping, self.options)
+            self._options = newOptions
+            self._invalidateDerivedState()
+            (self._mapping, report) = remapMapping(oldMapping, oldOptions, newMapping, newOptions, self.optionLabels)
+            self._updateGridValues()
+            self._invalidateDerivedState()
+            if report.structureChanged and self.frontendGenerated:
+                self._generateFrontendElements()
+                self._fillSelectorOptions()
+                self._updateMappingFrontEndBox()
+            if self.frontendGenerated:
+                self._refreshBusModuleKeys()
+        if not report.structureChanged and self.frontendGenerated:
+            self.updateFrontend(self._firstPinSelector())
+        self.reloadReport = report
+        return report
+
+    @property
+    def watchInterval(self) -> float:
+        return float(self._initkwargs.get('watchInterval', 1.0))
+
+    def _baseFileTimes(self) -> tuple:
+        return tuple(path.stat().st_mtime_ns if path.exists() else None for path in self.baseFilePaths)
+
+    def reloadChangedBaseFiles(self) -> ReloadReport | None:
+        """Reload the base files if they were modified since they were last loaded. Files which cannot be read, e.g. since
+        they are still being written, are tried again on the next call, the error is kept in reloadError."""
+        fileTimes = self._baseFileTimes()
+        if fileTimes == self._watchedFileTimes:
+            return None
+        try:
+            report = self.reloadBaseFiles()
+        except Exception as exception:
+            self.reloadError = exception
+            return None
+        self.reloadError       = None
+        self._watchedFileTimes = fileTimes
+        return report
+
+    def enableWatch(self) -> None:
+        """Poll the modification times of the base files every watchInterval seconds and reload them when they changed.
+        The watch runs on the event loop of the kernel if there is one, otherwise on a background thread."""
+        if getattr(self, '_watchedFileTimes', None) is not None:
+            return
+        self._watchedFileTimes = self._baseFileTimes()
+        if self._eventLoop is not None:
+            self._watcherTask = self._eventLoop.create_task(AsyncWatcherFunction(self))
+        else:
+            self._watcherStopEvent = threading.Event()
+            self._watcherThread    = threading.Thread(target=WatcherFunction, args=(self, self._watcherStopEvent), daemon=True)
+            self._watcherThread.start()
+
+    def disableWatch(self) -> None:
+        if getattr(self, '_watchedFileTimes', None) is None:
+            return
+        self._watchedFileTimes = None
+        if getattr(self, '_watcherTask', None) is not None:
+            self._watcherTask.cancel()
+            self._watcherTask = None
+        if getattr(self, '_watcherStopEvent', None) is not None:
+            self._watcherStopEvent.set()
+            self._watcherStopEvent = None
+
+    def _buildDerivedState(self) -> None:
+        """Build all indexes and caches which are derived from mapping and options, they are otherwise built on first use."""
+        for attribute in ['layout', 'optionLabels', 'searchIndex', 'compatibility']:
+            getattr(self, attribute)
+
+    def _invalidateDerivedState(self) -> None:
+        """Drop all indexes and caches which are derived from mapping and options, they are rebuilt on first use."""
+        for attribute in ['_layout', '_optionLabels', '_searchIndex', '_compatibility']:
+            if hasattr(self, attribute):
+                delattr(self, attribute)
 
     def exportMapping(self):
+        snapshot = self.snapshot()
+        snapshot.exportData()
+        self.backendReport.writeReportFile(snapshot)
+
+    def exportMappingAsync(self, withReport: bool = True) -> ExportJob:
+        """Export a snapshot of the current state on a background thread, so the mapping can be edited meanwhile. Returns
+        the ExportJob, its frontEnd shows the progress and allows to cancel the export."""
+        self.exportJob = ExportJob(self.snapshot(), withReport, self.enqueueFrontendTask)
+        return self.exportJob
+
+    def snapshot(self) -> object:
+        """Return a consistent copy of the current state as AdapterFork with the name of this adapter, which is not affected by
+        further changes. Only the assignment columns of the mapping are copied."""
+        from pinmap.fork import AdapterFork
+        return AdapterFork(self, None)
+
+    def exportData(self) -> None:
+        """Export mapping, options and notes with the export backend, without generating the report."""
+        with self.mappingLock:
+            mapping = self.mapping.copy()
+            notes   = self.notes
         if self.backendExport.hasBundleSupport():
-            self.backendExport.writeBundle(self.exportBundle, self._mapping, self._options, self._notes)
+            self.backendExport.writeBundle(self.exportBundlePath, mapping, self.options, notes, name=self.name)
         else:
             self.exportDirPath.mkdir(parents=True, exist_ok=True)
             self.backendExport.writeOptionsfile(self.exportDirPath.joinpath('options' + self.backendExport.getDataFileEnding()), self.options)
-            self.backendExport.writeMappingfile(self.exportDirPath.joinpath('mapping' + self.backendExport.getDataFileEnding()), self.mapping)
-            self.backendExport.writeNotesfile(self.exportDirPath.joinpath('notes' + self.backendExport.getTextFileEnding()), self.notes)
-        self.backendReport.writeReportFile(self)
+            self.backendExport.writeMappingfile(self.exportDirPath.joinpath('mapping' + self.backendExport.getDataFileEnding()), mapping)
+            self.backendExport.writeNotesfile(self.exportDirPath.joinpath('notes' + self.backendExport.getTextFileEnding()), notes)
+        self._removeExportedAutosave()
+
+    def _removeExportedAutosave(self) -> None:
+        """Without running autosave, journal and autosave snapshot next to the export hold no state which is not exported,
+        they are removed so they are not replayed over later exports."""
+        if getattr(self, '_journal', None) is None:
+            MappingJournal.remove(self.exportJournalPath, self.exportAutosavePath)
+
+    def exportFirmwareConfig(self, filepath: pl.Path | str | None = None) -> pl.Path:
+        """Generate the pin configuration for the firmware, i.e. MCU pin and ALT index of every assigned pin, with the firmware
+        backend. Written to the export directory unless filepath is set, returns the path of the written file. A mapping which
+        violates the design rules is refused, unless firmwareAllowErrors is set."""
+        with self.mappingLock:
+            mapping = self.mapping.copy()
+        if filepath is None:
+            filepath = self.exportDirPath.joinpath(self.name + self.backendFirmware.getTextFileEnding())
+        self.backendFirmware.writeFirmwareFile(filepath, self.name, mapping, self.options, self._initkwargs.get('firmwarePrefix', None),
+                                               self._initkwargs.get('firmwareAllowErrors', False))
+        return pl.Path(filepath)
+
+    def enableAutosave(self, idleTime: float = 5.0) -> None:
+        """Journal all mapping and note changes to exportJournalPath on a background thread. The journal is compacted into
+        the autosave snapshot at exportAutosavePath once no change happened for idleTime seconds, when autosave is disabled,
+        the adapter is closed or collected, or the interpreter exits. Both are replayed on import."""
+        if getattr(self, '_journal', None) is not None:
+            return
+        self._journal = MappingJournal(self.exportJournalPath, self.exportAutosavePath, idleTime)
+        # The finalizer only references the journal, so it neither keeps the adapter alive nor misses the interpreter exit.
+        self._journalFinalizer = weakref.finalize(self, self._journal.close)
+        self.mappingListeners.add(self._journalMappingDelta)
+        self.noteBox.observe(self._journalNotes, names='value', type='change')
+
+    def disableAutosave(self) -> None:
+        """Compact and close the autosave journal, if autosave is enabled."""
+        if getattr(self, '_journal', None) is None:
+            return
+        self._journal = None
+        self.mappingListeners.remove(self._journalMappingDelta)
+        self.noteBox.unobserve(self._journalNotes, names='value', type='change')
+        self._journalFinalizer()
+
+    def _journalMappingDelta(self, adapter: object, previous: pd.DataFrame, current: pd.DataFrame) -> None:
+        self._journal.appendMappingDelta(current)
+
+    @property
+    def utilization(self) -> UtilizationStats:
+        """Counters of used and free MCU pins, modules in use, bus fill and shared assignments, kept up to date on every change."""
+        if not hasattr(self, '_utilization'):
+            self._utilization = UtilizationStats(self)
+        return self._utilization
+
+    @property
+    def reportPreview(self) -> widgets.HTML:
+        """Show the report rendered by the HtmlBackend below the current cell, it follows the changes of the mapping and the
+        notes, see ReportPreview."""
+        if not hasattr(self, '_reportPreview'):
+            # The HtmlBackend is only imported if the preview is shown.
+            from pinmap.preview import ReportPreview
+            self._reportPreview = ReportPreview(self)
+        return self._reportPreview.frontEnd
+
+    def _journalNotes(self, change: dict) -> None:
+        self._journal.appendNotes(change['new'])
+
+    def diff(self, other: object) -> MappingDiff:
+        """Compare this adapter with another Adapter or mapping table, e.g. an older revision. Added, removed and changed
+        assignments are reported relative to other."""
+        otherMapping = other.mapping if isinstance(other, Adapter) else other
+        return MappingDiff(otherMapping, self.mapping)
+
+    def fork(self, label: str | None = None) -> object:
+        """Create a headless AdapterFork of the current state for what-if exploration, see AdapterFork. The fork is kept in
+        forks until it is merged back or discarded."""
+        from pinmap.fork import AdapterFork
+        child = AdapterFork(self, label if label is not None else 'fork' + str(len(self.forks)))
+        self.forks.append(child)
+        return child
+
+    def assignBus(self, bus: str, moduleKey: int | str) -> pd.Series:
+        """Map all members of a bus to one module in a single operation, see pinmap.matching.assignBus."""
+        return assignBus(self, bus, moduleKey)
+
+    @property
+    def compatibility(self) -> CompatibilityMatrix:
+        """Sparse matrix of the pin-module-function-combinations which fit the regexes of every baseboard pin."""
+        if not hasattr(self, '_compatibility'):
+            self._compatibility = CompatibilityMatrix(self.mapping, self.options)
+        return self._compatibility
+
+    def hostPins(self, mcuPin: str | None = None, module: str | None = None) -> pd.DataFrame:
+        """Return the baseboard pins which can host the given MCU pin, module or both, e.g. to answer where UART3 can go,
+        regardless of the current assignments. The MCU pin can be given by its MCU-Pin or Board-Pin name."""
+        compatibility = self.compatibility
+        if mcuPin is not None:
+            pins    = self.options.pins
+            pinKeys = pins.index[(pins[OptionsColumnLabels.MCU_PIN] == mcuPin) | (pins[OptionsColumnLabels.BOARD_PIN] == mcuPin)]
+            if len(pinKeys) == 0:
+                raise Exception("Unknown MCU pin: " + mcuPin)
+        if module is not None:
+            moduleKeys = self.options.modules.index[self.options.modules.names == module]
+            if len(moduleKeys) == 0:
+                raise Exception("Unknown module: " + module)
+        if mcuPin is not None and module is not None:
+            # Both have to be hosted by the same pin-module-function-combination.
+            pinModFuncKeys = np.flatnonzero(np.isin(compatibility.pinKeys, pinKeys) & (compatibility.moduleKeys == moduleKeys[0]))
+            mappingIdxs    = np.unique(np.concatenate([compatibility.mappingIdxsForPinModFunc(key) for key in pinModFuncKeys] + [np.zeros(0, dtype=np.int64)]))
+        elif mcuPin is not None:
+            mappingIdxs = np.unique(np.concatenate([compatibility.mappingIdxsForMcuPin(pinKey) for pinKey in pinKeys]))
+        elif module is not None:
+            mappingIdxs = compatibility.mappingIdxsForModule(moduleKeys[0])
+        else:
+            mappingIdxs = np.arange(len(self.mapping))
+        return self.mapping.iloc[mappingIdxs]
+
+    def _refreshBusModuleKeys(self) -> None:
+        """Derive the module of every bus from the current mapping, e.g. after the mapping was changed without PinSelectors."""
+        for bus in self.buses:
+            if bus != '' and len(self.buses[bus]['Members']) > 0:
+                self._updateBusModuleKey(self.mapping.iloc[self.buses[bus]['Members'][0].mappingIdx])
+
+    def _firstPinSelector(self) -> PinSelector:
+        return next(member for bus in self.buses.values() for member in bus['Members'])
+
+    def validate(self) -> ValidationReport:
+        """Check the whole mapping against the design rules, see validateMapping."""
+        with self.mappingLock:
+            mapping = self.mapping.copy()
+        return validateMapping(mapping, self.options)
 
     @property
     def mappingGridShape(self):
-        """Return the shape of the frontend baseboard pin-grid."""
-        return (len(self.edbRowVals), len(self.edbColVals))
+        """Return the shape of the frontend baseboard pin-grid, i.e. of all populated connector grids stacked below each other."""
+        return self.layout.shape
 
     @property
     def noteBox(self) -> widgets.Textarea:
@@ -257,6 +937,38 @@ class Adapter(Board):
     def guiColumnSpacingPxStr(self) -> str:
         return str(self.guiColumnSpacing) + 'px'
 
+    @property
+    def guiMode(self) -> str:
+        return self._initkwargs.get('guiMode', 'grid')
+
+    @property
+    def guiDatagridHeight(self) -> int:
+        return int(self._initkwargs.get('guiDatagridHeight', 600))
+
+    @property
+    def guiDatagridHeightPxStr(self) -> str:
+        return str(self.guiDatagridHeight) + 'px'
+
+    @property
+    def guiSelectorMode(self) -> str:
+        return self._initkwargs.get('guiSelectorMode', 'dropdown')
+
+    @property
+    def guiSearchMaxOptions(self) -> int:
+        return self._initkwargs.get('guiSearchMaxOptions', 50)
+
+    @property
+    def guiUpdateChunkSize(self) -> int:
+        return self._initkwargs.get('guiUpdateChunkSize', 20)
+
+    @property
+    def guiUpdateCoalesceTime(self) -> float:
+        return self._initkwargs.get('guiUpdateCoalesceTime', 0.05)
+
+    @property
+    def guiPreviewDelay(self) -> float:
+        return self._initkwargs.get('guiPreviewDelay', 0.5)
+
     @property
     def guiElementWidth(self) -> int:
         return (self.guiDropboxWidth + self.guiLabelSignalWidth + self.guiLabelStatusWidth +  self.guiLabelIdWidth  + self.guiColumnSpacing)
@@ -275,20 +987,56 @@ class Adapter(Board):
 
     @property
     def mappingFrontEnd(self) -> widgets.VBox:
-        """Show the mapping frontend below the current cell."""
-        return widgets.VBox([self.mappingGrid, widgets.HBox(self.refreshbuttons), self.noteBox], layout=widgets.Layout(overflow='scroll'))
+        """Show the mapping frontend below the current cell. The same box is returned every time, its children are replaced
+        when the frontend elements are rebuilt, e.g. by reloadBaseFiles, so a displayed frontend stays connected."""
+        self._ensureFrontendElements()
+        if not hasattr(self, '_mappingFrontEndBox'):
+            layout = widgets.Layout() if self.guiMode == 'datagrid' else widgets.Layout(overflow='scroll')
+            self._mappingFrontEndBox = widgets.VBox(layout=layout)
+            self._updateMappingFrontEndBox()
+        return self._mappingFrontEndBox
+
+    def _updateMappingFrontEndBox(self) -> None:
+        """Put the current frontend elements into the box returned by mappingFrontEnd, if it was created already."""
+        if not hasattr(self, '_mappingFrontEndBox'):
+            return
+        if self.guiMode == 'datagrid':
+            self._mappingFrontEndBox.children = self.datagrid.frontEnd + [widgets.HBox(self.refreshbuttons), self.utilization.frontEnd, self.noteBox]
+        else:
+            self._mappingFrontEndBox.children = [self.mappingGrid, widgets.HBox(self.refreshbuttons), self.utilization.frontEnd, self.noteBox]
 
     def _generateFrontendElements(self) -> None:
-        """Generate the frontend elements, i.e. the dropdown menus with labels and the clear buttons."""
-        self.mappingGrid = widgets.GridspecLayout(self.mappingGridShape[0], self.mappingGridShape[1], layout=widgets.Layout(width=self.guiGridWidthPxStr))
+        """Generate the frontend elements, i.e. the dropdown menus with labels and the clear buttons. Every connector gets
+        its own grid which only spans the populated columns and rows of that connector."""
+        if self.guiMode == 'datagrid':
+            # ipydatagrid is only imported if the datagrid frontend is used.
+            from pinmap.datagrid import DatagridFrontend
+            self._generatePinCells()
+            self.datagrid = DatagridFrontend(self)
+        else:
+            self._generateGridElements()
+        self._generateClearButtons()
+
+    def _generateGridElements(self) -> None:
+        connectorGrids = {}
+        for connector in self.layout.connectors:
+            (numRows, numCols) = self.layout.connectorShape(connector)
+            connectorGrids[connector] = widgets.GridspecLayout(numRows, numCols, layout=widgets.Layout(width=str(self.guiElementWidth * numCols) + 'px'))
+        if len(connectorGrids) == 1:
+            self.mappingGrid = connectorGrids[self.layout.connectors[0]]
+        else:
+            connectorElements = []
+            for connector, connectorGrid in connectorGrids.items():
+                connectorElements.append(widgets.Label(value=connector, style=self.guiStyleDict))
+                connectorElements.append(connectorGrid)
+            self.mappingGrid = widgets.VBox(connectorElements, layout=widgets.Layout(width=self.guiGridWidthPxStr))
         self.buses       = {bus: {'Members': [], 'Module-Key': -1} for bus in self.busList}
 
         prevPinSelectorElement = None
         currPinSelectorElement = None
         nextPinSelectorElement = None
         for mappingIdx, pin in self.mapping.iterrows():
-            rowIdx = self.edbRowVals[self.edbRowVals[MappingColumnLabels.PINGRID_ROW] == pin[MappingColumnLabels.PINGRID_ROW]].index[0]
-            colIdx = self.edbColVals[self.edbColVals[MappingColumnLabels.PINGRID_COLUMN] == pin[MappingColumnLabels.PINGRID_COLUMN]].index[0]
+            (connector, rowIdx, colIdx) = self.layout.position(mappingIdx)
             selectorLabel = "{:<1}{:<2}".format(pin[MappingColumnLabels.PINGRID_COLUMN], pin[MappingColumnLabels.PINGRID_ROW])
             statusSymbol  = PMTSTR.STATUS_OPEN_SYMBOL if PMTSTR.STATUS_OPEN in pin[MappingColumnLabels.STATUS] else PMTSTR.STATUS_CLOSED_SYMBOL
             tmpPinLabelElement = widgets.HBox([
@@ -299,20 +1047,79 @@ class Adapter(Board):
 
             prevPinSelectorElement = currPinSelectorElement
             currPinSelectorElement = nextPinSelectorElement
-            nextPinSelectorElement = PinSelector(description="", disabled=False, layout=widgets.Layout(width=self.guiDropboxWidthPxStr, grid_area='header', style=self.guiStyleDict),
-                                                mappingIdx=mappingIdx, parent=self, fullLabel=selectorLabel +  "-" + pin[MappingColumnLabels.SIGNAL] + " " + statusSymbol)
+            nextPinSelectorElement = self._createPinSelector(disabled=False, layout=widgets.Layout(width=self.guiDropboxWidthPxStr, grid_area='header', style=self.guiStyleDict),
+                                                             mappingIdx=mappingIdx, parent=self, fullLabel=selectorLabel +  "-" + pin[MappingColumnLabels.SIGNAL] + " " + statusSymbol)
 
             if currPinSelectorElement != None:
                 currPinSelectorElement.previous = prevPinSelectorElement
                 currPinSelectorElement.next     = nextPinSelectorElement
 
-            self.mappingGrid[rowIdx, colIdx] = widgets.HBox([tmpPinLabelElement, nextPinSelectorElement], layout=widgets.Layout(width=self.guiElementWidthPxStr))
+            connectorGrids[connector][rowIdx, colIdx] = widgets.HBox([tmpPinLabelElement, nextPinSelectorElement], layout=widgets.Layout(width=self.guiElementWidthPxStr))
             self.buses[pin[MappingColumnLabels.BUS]]['Members'].append(nextPinSelectorElement)
             nextPinSelectorElement.options = ['']
             nextPinSelectorElement.value = ''
             nextPinSelectorElement.observe(PinSelectorUpdate, names='value', type='change')
-            self._updateSelectorOptions(nextPinSelectorElement)
-
+            if self.lazy:
+                # Until its options are computed, see _selectorOptionsFill, the pin-selector only offers its current value.
+                value = pin[MappingColumnLabels.MAPPED_PINMODFUNC]
+                self._applySelectorOptions(nextPinSelectorElement, ('', value) if value != '' else ('',), None)
+
+    def _createPinSelector(self, **kwargs) -> PinSelector:
+        """Create a pin-selector of the guiSelectorMode, the combobox is only imported if it is used."""
+        if self.guiSelectorMode == 'combobox':
+            from pinmap.combobox import PinComboSelector
+            return PinComboSelector(description="", placeholder='Search...', ensure_option=False, **kwargs)
+        return PinSelector(description="", **kwargs)
+
+    def _selectorOptionsFill(self):
+        """Compute the options of all pin-selectors in mapping order, or take them from the session snapshot. Yields after
+        every guiUpdateChunkSize pin-selectors, so the update loop can pass control back to the event loop in between."""
+        if self.guiMode == 'datagrid':
+            self._sessionSelectorOptions = {}
+            return
+        start = time.perf_counter()
+        pinSelectors = sorted((member for bus in self.buses.values() for member in bus['Members']), key=lambda pinSelector: pinSelector.mappingIdx)
+        for count, pinSelector in enumerate(pinSelectors):
+            if count > 0 and count % self.guiUpdateChunkSize == 0:
+                yield
+            sessionOptions = getattr(self, '_sessionSelectorOptions', {}).get(pinSelector.mappingIdx)
+            if sessionOptions is not None:
+                self._applySelectorOptions(pinSelector, *sessionOptions)
+            else:
+                self._updateSelectorOptions(pinSelector)
+        self._sessionSelectorOptions = {}
+        self.loadTimings[LoadStages.SELECTOR_OPTIONS] = time.perf_counter() - start
+
+    def _fillSelectorOptions(self) -> None:
+        for _ in self._selectorOptionsFill():
+            pass
+
+    def _queueSelectorOptions(self) -> None:
+        """Let the update loop compute the options of all pin-selectors, queued like a change so it never runs concurrently
+        with the processing of a change."""
+        if self.guiMode != 'datagrid':
+            self.enqueueSelectorChange(None)
+
+    def _generatePinCells(self) -> None:
+        """Generate one headless PinCell per pin and the buses with the PinCells as members."""
+        buses        = {bus: {'Members': [], 'Module-Key': -1} for bus in self.busList}
+        pinCells     = []
+        previousCell = None
+        columns      = [MappingColumnLabels.PINGRID_COLUMN, MappingColumnLabels.PINGRID_ROW, MappingColumnLabels.STATUS, MappingColumnLabels.SIGNAL,
+                        MappingColumnLabels.BUS, MappingColumnLabels.MAPPED_PINMODFUNC]
+        for mappingIdx, (column, row, status, signal, bus, value) in zip(self.mapping.index, self.mapping[columns].itertuples(index=False, name=None)):
+            selectorLabel = "{:<1}{:<2}".format(column, row)
+            statusSymbol  = PMTSTR.STATUS_OPEN_SYMBOL if PMTSTR.STATUS_OPEN in status else PMTSTR.STATUS_CLOSED_SYMBOL
+            pinCell = PinCell(mappingIdx=mappingIdx, parent=self, previous=previousCell, value=value, fullLabel=selectorLabel +  "-" + signal + " " + statusSymbol)
+            if previousCell is not None:
+                previousCell.next = pinCell
+            pinCells.append(pinCell)
+            buses[bus]['Members'].append(pinCell)
+            previousCell = pinCell
+        self.buses    = buses
+        self.pinCells = pinCells
+
+    def _generateClearButtons(self) -> None:
         self.refreshbuttons = []
         for bus in self.busList:
             if bus == '':
@@ -333,15 +1140,64 @@ class Adapter(Board):
         usedModFuncKeys = usedModFuncKeys[usedModFuncKeys != ownModFuncKey] # Remove own modFuncKey from usedModFuncKeys
         return usedModFuncKeys
 
+    @property
+    def optionLabels(self) -> list[str]:
+        """Dropdown label of every pin-module-function-combination without conflict prefix, indexed by the pinModFunc key."""
+        if not hasattr(self, '_optionLabels'):
+            pinKeys     = self.options.pinModFunc['Pin-Key'].values.astype(int)
+            modFuncKeys = self.options.pinModFunc['ModFunc-Key'].values.astype(int)
+            modKeys     = self.options.modFunc['Module-Key'].values.astype(int)[modFuncKeys]
+            funcKeys    = self.options.modFunc['Function-Key'].values.astype(int)[modFuncKeys]
+            boardPins   = self.options.pins[OptionsColumnLabels.BOARD_PIN].astype(str).values[pinKeys]
+            mcuPins     = self.options.pins[OptionsColumnLabels.MCU_PIN].astype(str).values[pinKeys]
+            modules     = self.options.modules['names'].astype(str).values[modKeys]
+            functions   = self.options.functions['names'].astype(str).values[funcKeys]
+            # TODO PMi: Dropdown widgets do not support monospaced fonts yet, so the formatting is not really useful....
+            self._optionLabels = ["{:<6} - {:<5} - {} - {}".format(*labelParts) for labelParts in zip(boardPins, mcuPins, modules, functions)]
+        return self._optionLabels
+
+    @property
+    def searchIndex(self) -> OptionsSearchIndex:
+        """Inverted index over the tokens of all pin-module-function-combinations."""
+        if not hasattr(self, '_searchIndex'):
+            self._searchIndex = OptionsSearchIndex(self.options)
+        return self._searchIndex
+
+    def searchOptions(self, query: str, mappingIdx: int | None = None, prefix: bool = False) -> list[str]:
+        """Return the labels of all pin-module-function-combinations matching the query, see OptionsSearchIndex.search. If
+        mappingIdx is given, the result is restricted to the options currently allowed for this pin."""
+        allowedKeys = None
+        if mappingIdx is not None:
+            allowedKeys = self._computeSelectorOptions(mappingIdx, self.mapping.iloc[mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC])[1]
+        return [self.optionLabels[pinModFuncKey] for pinModFuncKey in self.searchIndex.search(query, allowedKeys, prefix)]
+
     def _updateSelectorOptions(self, pinSelector: PinSelector) -> None:
-        """Update the PinSelector options list according to the current state of the mapping, i.e. the already selected pins and module-function-combinations."""
-        currentPin = self.mapping.iloc[pinSelector.mappingIdx]
+        """Update the PinSelector options list according to the current state of the mapping, i.e. the already selected pins and module-function-combinations.
+        The options are only sent to the frontend if they differ from the last options sent for this PinSelector."""
+        (menuOptions, allowedKeys) = self._computeSelectorOptions(pinSelector.mappingIdx, pinSelector.value)
+        self._applySelectorOptions(pinSelector, menuOptions, allowedKeys)
+
+    def _applySelectorOptions(self, pinSelector: PinSelector, menuOptions: tuple[str], allowedKeys: np.ndarray) -> None:
+        pinSelector.menuOptions = menuOptions
+        pinSelector.allowedKeys = allowedKeys
+        optionsHash = hash(menuOptions)
+        if optionsHash != pinSelector.optionsHash:
+            pinSelector.unobserve(PinSelectorUpdate, names='value', type='change')
+            pinSelector.options = menuOptions
+            pinSelector.observe(PinSelectorUpdate, names='value', type='change')
+            pinSelector.optionsHash = optionsHash
+        self._safeSetPinSelectorValue(pinSelector, self.mapping.iloc[pinSelector.mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC])
+
+    def _computeSelectorOptions(self, mappingIdx: int, selectorValue: str) -> tuple[tuple[str], np.ndarray]:
+        """Compute the options of the PinSelector of the pin at mappingIdx which currently shows selectorValue. Returns the
+        options, starting with the empty option, and the pinModFunc keys of the remaining options."""
+        currentPin = self.mapping.iloc[mappingIdx]
         if currentPin[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] != -1 and currentPin[MappingColumnLabels.PRIMARY] != '':
-            if "Pin>" in pinSelector.value:
+            if "Pin>" in selectorValue:
                 # The selected pin is already used, do not remove from usedPinKeys list
                 ownPinKey     = -1
                 ownModFuncKey = self.options.pinModFunc.iloc[currentPin[MappingColumnLabels.MAPPED_PINMODFUNC_KEY]]['ModFunc-Key']
-            elif "Func>" in pinSelector.value:
+            elif "Func>" in selectorValue:
                 # The selected module-function-combination is already used, do not remove from usedPinKeys list
                 ownPinKey     = self.options.pinModFunc.iloc[currentPin[MappingColumnLabels.MAPPED_PINMODFUNC_KEY]]['Pin-Key']
                 ownModFuncKey = -1
@@ -366,41 +1222,41 @@ class Adapter(Board):
         allowedPinModFuncKeys = self.options.pinModFunc[self.options.pinModFunc['ModFunc-Key'].isin(allowedModFuncKeys)].index
 
         # Add Shared Label
-        usedPinKeys = self._getUsedPinKeys(ownPinKey)
-        usedModFuncKeys = self._getUsedModFuncKeys(ownModFuncKey)
-        menuOptions = ['']
+        usedPinKeys     = set(self._getUsedPinKeys(ownPinKey).values)
+        usedModFuncKeys = set(self._getUsedModFuncKeys(ownModFuncKey).values)
+        pinKeys         = self.options.pinModFunc['Pin-Key'].values
+        modFuncKeys     = self.options.pinModFunc['ModFunc-Key'].values
+        optionLabels    = self.optionLabels
+        conflictTags    = {}
+        menuOptions     = ['']
 
         for pinModFuncKey in allowedPinModFuncKeys:
-            pinKey      = self.options.pinModFunc.iloc[pinModFuncKey]['Pin-Key']
-            modFuncKey  = self.options.pinModFunc.iloc[pinModFuncKey]['ModFunc-Key']
-            modKey      = self.options.modFunc.iloc[modFuncKey]['Module-Key']
-            funcKey     = self.options.modFunc.iloc[modFuncKey]['Function-Key']
+            pinKey      = pinKeys[pinModFuncKey]
+            modFuncKey  = modFuncKeys[pinModFuncKey]
+            strOption   = optionLabels[pinModFuncKey]
 
-            strBoardPin = str(self.options.pins.iloc[pinKey][OptionsColumnLabels.BOARD_PIN])
-            strMcuPin   = str(self.options.pins.iloc[pinKey][OptionsColumnLabels.MCU_PIN])
-            strModule   = str(self.options.modules.iloc[modKey]['names'])
-            strFunction = str(self.options.functions.iloc[funcKey]['names'])
-
-            # TODO PMi: Dropdown widgets do not support monospaced fonts yet, so the formatting is not really useful....
-            strOption   = "{:<6} - {:<5} - {} - {}".format(strBoardPin, strMcuPin, strModule, strFunction)
-
-            # Add prefix that the pin or function has a conflict
+            # Add prefix that the pin or function has a conflict, the tags are the same for all options sharing the pin or
+            # module-function-combination and are therefore only generated once.
             strConflictPrefix = ''
-            if (pinKey in usedPinKeys.values):
-                strConflictPrefix = strConflictPrefix + self._generateConflictTags(pinSelector, "Pin", self.options.pinModFunc[self.options.pinModFunc['Pin-Key'] == pinKey].index)
-            if (modFuncKey in usedModFuncKeys.values) and len(strConflictPrefix) == 0: # Pin conflict overrules function conflict.
-                strConflictPrefix = strConflictPrefix + self._generateConflictTags(pinSelector, "Func", self.options.pinModFunc[self.options.pinModFunc['ModFunc-Key'] == modFuncKey].index)
-            strOption = "{}{}".format(strConflictPrefix, strOption)
+            if pinKey in usedPinKeys:
+                if ("Pin", pinKey) not in conflictTags:
+                    conflictTags[("Pin", pinKey)] = self._generateConflictTags(mappingIdx, "Pin", self.options.pinModFunc.index[pinKeys == pinKey])
+                strConflictPrefix = conflictTags[("Pin", pinKey)]
+            if (modFuncKey in usedModFuncKeys) and len(strConflictPrefix) == 0: # Pin conflict overrules function conflict.
+                if ("Func", modFuncKey) not in conflictTags:
+                    conflictTags[("Func", modFuncKey)] = self._generateConflictTags(mappingIdx, "Func", self.options.pinModFunc.index[modFuncKeys == modFuncKey])
+                strConflictPrefix = conflictTags[("Func", modFuncKey)]
+            if len(strConflictPrefix) == 0 and self.conflictIndex is not None:   # Conflicts with other adapters sharing the options.
+                strConflictPrefix = self.conflictIndex.conflictTag(self, pinKey, modFuncKey)
+            if len(strConflictPrefix) > 0:
+                strOption = "{}{}".format(strConflictPrefix, strOption)
             menuOptions.append(strOption)
-        pinSelector.unobserve(PinSelectorUpdate, names='value', type='change')
-        pinSelector.options = menuOptions
-        pinSelector.observe(PinSelectorUpdate, names='value', type='change')
-        self._safeSetPinSelectorValue(pinSelector, currentPin[MappingColumnLabels.MAPPED_PINMODFUNC])
+        return (tuple(menuOptions), np.asarray(allowedPinModFuncKeys, dtype=int))
 
-    def _generateConflictTags(self, pinSelector: PinSelector, strSpecifier: str, primaryPinModFuncPinCandidates: pd.core.indexes.base.Index) -> str:
+    def _generateConflictTags(self, mappingIdx: int, strSpecifier: str, primaryPinModFuncPinCandidates: pd.core.indexes.base.Index) -> str:
         """Check whether a pin or module-function-combination is already in use and attach the corresponding conflict tags. An empty tag
-        is returend if not conflicts are found."""
-        currentPin = self.mapping.iloc[pinSelector.mappingIdx]
+        is returend if not conflicts are found. The tags are interned, since the same tags show up in the options of many PinSelectors."""
+        currentPin = self.mapping.iloc[mappingIdx]
         primaryMapping = self.mapping[(self.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].isin(primaryPinModFuncPinCandidates)) & (self.mapping[MappingColumnLabels.PRIMARY] != '')]
         primaryMapping = primaryMapping[primaryMapping[MappingColumnLabels.PINGRID_COLUMN].index != currentPin.name]   # Avoid adding shared prefix for own pin.
         if len(primaryMapping) == 0:
@@ -415,7 +1271,7 @@ class Adapter(Board):
         else:
             strPrimaryMappedBus = ''
         strPrimaryMapped = str(primaryMapping[MappingColumnLabels.PINGRID_COLUMN]) + str(primaryMapping[MappingColumnLabels.PINGRID_ROW])
-        return "{}>{}{}>> ".format(strSpecifier, strPrimaryMapped, strPrimaryMappedBus)
+        return sys.intern("{}>{}{}>> ".format(strSpecifier, strPrimaryMapped, strPrimaryMappedBus))
 
     def _removeSharedPrefixFromSelectorValue(self, value: str) -> str:
         """Remove the shared prefix from a PinSelector value string."""
@@ -426,11 +1282,13 @@ class Adapter(Board):
         value is not in the options list anymore. In this case, an empty value will be set, i.e.
         the PinSelector is reset."""
         value = self._removeSharedPrefixFromSelectorValue(value)
-        valueToSet = pinSelector.options[0]
+        valueToSet = pinSelector.menuOptions[0]
         if value != '':
-            for option in pinSelector.options:
+            for option in pinSelector.menuOptions:
                 if value in option:
                     valueToSet = option
+        if pinSelector.value == valueToSet:
+            return
         pinSelector.unobserve(PinSelectorUpdate, names='value', type='change')
         pinSelector.value = valueToSet
         pinSelector.observe(PinSelectorUpdate, names='value', type='change')
@@ -448,11 +1306,54 @@ class Adapter(Board):
         strFunction   = strFunction.replace(' ', '')
         return (strBoardPin, strMcuPin, strModule, strFunction)
 
+    def enqueueSelectorChange(self, pinSelector: PinSelector) -> None:
+        """Queue a changed PinSelector for the update loop, can be called from any thread."""
+        if self._eventLoop is not None:
+            self._eventLoop.call_soon_threadsafe(self.updateQueue.put_nowait, pinSelector)
+        else:
+            self.updateQueue.put(pinSelector)
+
+    def enqueueFrontendTask(self, function: callable) -> None:
+        """Queue function to run on the update loop, i.e. on the thread or task which owns the widgets, can be called from
+        any thread. Used for work which changes widgets but not the mapping, see FrontendTask."""
+        self.enqueueSelectorChange(FrontendTask(function))
+
+    def enqueueSelectorRefresh(self, mappingIdxs: list[int]) -> None:
+        """Queue a refresh of the options of the pin-selectors at mappingIdxs for the update loop, e.g. since the conflict
+        tags of another adapter sharing the options changed, can be called from any thread. See SelectorRefresh."""
+        if self.frontendGenerated:
+            self.enqueueSelectorChange(SelectorRefresh(list(mappingIdxs)))
+
+    def refreshSelectorOptions(self, mappingIdxs: list[int]) -> None:
+        """Recompute the options of the pin-selectors of the pins at mappingIdxs without changing the mapping. Called by the
+        update loop, see enqueueSelectorRefresh."""
+        if not self.frontendGenerated:
+            return
+        if self.guiMode == 'datagrid':
+            self.datagrid.refresh()
+            return
+        refreshIdxs = set(int(mappingIdx) for mappingIdx in mappingIdxs)
+        with self.mappingLock:
+            mappedValues = self.mapping[MappingColumnLabels.MAPPED_PINMODFUNC].values
+            for bus in self.buses.values():
+                for pinSelector in bus['Members']:
+                    if pinSelector.mappingIdx not in refreshIdxs:
+                        continue
+                    if self._removeSharedPrefixFromSelectorValue(pinSelector.value or '') != self._removeSharedPrefixFromSelectorValue(mappedValues[pinSelector.mappingIdx]):
+                        # A change of this pin-selector is still queued, the frontend update after the change covers it.
+                        continue
+                    self._updateSelectorOptions(pinSelector)
+
+    def processSelectorChange(self, pinSelector: PinSelector) -> None:
+        """Apply the change of a PinSelector to the mapping while holding the mappingLock and inform the mapping listeners."""
+        with self.mappingLock, self.mappingListeners.change():
+            self.selectorChangeUpdateMapping(pinSelector)
+
     def selectorChangeUpdateMapping(self, pinSelector: PinSelector) -> None:
         """Update a single mapping for a given selector. Reset the value of the selector if reset is
         true and update the value of the corresponding row in the mapping table.
         """
-        oldPinModFunc    = self.mapping.iloc[pinSelector.mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC]
+        oldPinModFuncKey = self.mapping.iloc[pinSelector.mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC_KEY]
         changePrimary    = self.mapping.iloc[pinSelector.mappingIdx][MappingColumnLabels.PRIMARY] != ''
         if pinSelector.value == '' or pinSelector.value == None:
             self.mapping.loc[pinSelector.mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC] = ''
@@ -469,42 +1370,42 @@ class Adapter(Board):
 
             self.mapping.loc[pinSelector.mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC]     = pinSelector.value
             self.mapping.loc[pinSelector.mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = pinModFuncKey
-
-            allPinModFuncForPin     = self.options.pinModFunc[self.options.pinModFunc['Pin-Key'] == pinKey].index
-            allPinModFuncForModFunc = self.options.pinModFunc[self.options.pinModFunc['ModFunc-Key']== modFuncKey].index
-            if (len(self.mapping[self.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].isin(allPinModFuncForPin)]) > 1) or (len(self.mapping[self.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].isin(allPinModFuncForModFunc)]) > 1):
-                self.mapping.loc[pinSelector.mappingIdx, MappingColumnLabels.PRIMARY] = ''
-            else:
-                self.mapping.loc[pinSelector.mappingIdx, MappingColumnLabels.PRIMARY] = 'x'
+            self.mapping.loc[pinSelector.mappingIdx, MappingColumnLabels.PRIMARY]               = ''
+            # The pin is primary unless another primary pin already uses the MCU pin or the module-function-combination.
+            if not self._claimedByPrimary(pinModFuncKey):
+                self._setPrimary(pinSelector.mappingIdx)
 
         if changePrimary:
-            self._updatePrimary(oldPinModFunc)
+            self._updatePrimary(oldPinModFuncKey)
 
         # Update bus module
         self._updateBusModuleKey(self.mapping.iloc[pinSelector.mappingIdx])
 
-    def _updatePrimary(self, oldPinModFunc: str) -> None:
-        (strOldBoardPin, strOldMcuPin, strOldModule, strOldFunction) = self._splitPinSelectorValueString(oldPinModFunc)
-        oldPinKey       = self.options.pins[(self.options.pins[OptionsColumnLabels.BOARD_PIN] == strOldBoardPin) & (self.options.pins[OptionsColumnLabels.MCU_PIN] == strOldMcuPin)].index[0]
-        oldModKey       = self.options.modules[self.options.modules.names == strOldModule].index[0]
-        oldFuncKey      = self.options.functions[self.options.functions.names == strOldFunction].index[0]
-        oldModFuncKey   = self.options.modFunc[(self.options.modFunc['Module-Key'] == oldModKey) & (self.options.modFunc['Function-Key']== oldFuncKey)].index[0]
-        usedPinKeys     = self._getUsedPinKeys()
-        usedModFuncKeys = self._getUsedModFuncKeys()
-
-        if (oldPinKey in usedPinKeys.values):
-            newPrimaryPinModFuncCandidateKeys = self.options.pinModFunc[self.options.pinModFunc['Pin-Key'] == oldPinKey].index
-        elif (oldModFuncKey in usedModFuncKeys.values):
-            newPrimaryPinModFuncCandidateKeys = self.options.pinModFunc[self.options.pinModFunc['ModFunc-Key']== oldModFuncKey].index
-        else:
-            newPrimaryPinModFuncCandidateKeys = []
-
-        if len(newPrimaryPinModFuncCandidateKeys) > 0:
-            # Set new primary pin
-            newPrimaryIdx = self.mapping[self.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].isin(newPrimaryPinModFuncCandidateKeys)].index
-            if len(newPrimaryIdx) > 0:
-                self.mapping.loc[newPrimaryIdx[0], MappingColumnLabels.PRIMARY] = 'x'
-                self.mapping.loc[newPrimaryIdx[0], MappingColumnLabels.MAPPED_PINMODFUNC] = self._removeSharedPrefixFromSelectorValue(self.mapping.loc[newPrimaryIdx[0], MappingColumnLabels.MAPPED_PINMODFUNC])
+    def _claimedByPrimary(self, pinModFuncKey: int) -> bool:
+        """Return whether a primary pin uses the MCU pin or the module-function-combination of pinModFuncKey."""
+        pinKeys     = self.options.pinModFunc['Pin-Key'].values
+        modFuncKeys = self.options.pinModFunc['ModFunc-Key'].values
+        mappedKeys  = self.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int)
+        primaryKeys = mappedKeys[(mappedKeys != -1) & (self.mapping[MappingColumnLabels.PRIMARY] != '').values]
+        return bool(np.any((pinKeys[primaryKeys] == pinKeys[pinModFuncKey]) | (modFuncKeys[primaryKeys] == modFuncKeys[pinModFuncKey])))
+
+    def _setPrimary(self, mappingIdx: int) -> None:
+        self.mapping.loc[mappingIdx, MappingColumnLabels.PRIMARY]           = 'x'
+        self.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC] = self._removeSharedPrefixFromSelectorValue(self.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC])
+
+    def _updatePrimary(self, oldPinModFuncKey: int) -> None:
+        """A primary pin released the MCU pin and module-function-combination of oldPinModFuncKey. The pins sharing either of
+        them become primary in mapping order, as long as no primary pin uses their MCU pin or module-function-combination."""
+        pinKeys     = self.options.pinModFunc['Pin-Key'].values
+        modFuncKeys = self.options.pinModFunc['ModFunc-Key'].values
+        mappedKeys  = self.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int)
+        assigned    = mappedKeys != -1
+        safeKeys    = np.where(assigned, mappedKeys, 0)
+        sharing     = assigned & (self.mapping[MappingColumnLabels.PRIMARY] == '').values & \
+                      ((pinKeys[safeKeys] == pinKeys[oldPinModFuncKey]) | (modFuncKeys[safeKeys] == modFuncKeys[oldPinModFuncKey]))
+        for mappingIdx in np.flatnonzero(sharing):
+            if not self._claimedByPrimary(mappedKeys[mappingIdx]):
+                self._setPrimary(self.mapping.index[mappingIdx])
 
     def _updateBusModuleKey(self, pinSelector: PinSelector):
         """Update the bus module that is associated with the bus of the current pinSelector."""
@@ -519,25 +1420,48 @@ class Adapter(Board):
                 break
         self.buses[pinSelector[MappingColumnLabels.BUS]]['Module-Key'] = busMemModKey
 
-    def updateFrontend(self, startingPinSelector: PinSelector) -> None:
-        """Update the pinmapping front end, i.e. update all options for all dropdown menus and the
-        mappig table."""
-        self._updateSelectorOptions(startingPinSelector)
+    def _frontendUpdateOrder(self, startingPinSelector: PinSelector):
+        """Yield all PinSelectors, starting with startingPinSelector and alternating outwards to its neighbours."""
+        yield startingPinSelector
         prev = startingPinSelector.previous
         next = startingPinSelector.next
         while prev != None or next != None:
             if prev != None:
-                self._updateSelectorOptions(prev)
+                yield prev
                 prev = prev.previous
             if next != None:
-                self._updateSelectorOptions(next)
+                yield next
                 next = next.next
 
+    def updateFrontend(self, startingPinSelector: PinSelector) -> None:
+        """Update the pinmapping front end, i.e. update all options for all dropdown menus and the
+        mappig table."""
+        if self.guiMode == 'datagrid':
+            self.datagrid.refresh()
+            return
+        for pinSelector in self._frontendUpdateOrder(startingPinSelector):
+            self._updateSelectorOptions(pinSelector)
+
+    async def updateFrontendAsync(self, startingPinSelector: PinSelector) -> None:
+        """Same as updateFrontend, but yields to the event loop after every guiUpdateChunkSize PinSelectors. The update is
+        abandoned if new changes are queued meanwhile, since the next update refreshes all PinSelectors anyway."""
+        if self.guiMode == 'datagrid':
+            self.datagrid.refresh()
+            return
+        self._frontendUpdateAbandoned = False
+        for count, pinSelector in enumerate(self._frontendUpdateOrder(startingPinSelector)):
+            if count > 0 and count % self.guiUpdateChunkSize == 0:
+                await asyncio.sleep(0)
+                if not self.updateQueue.empty():
+                    self._frontendUpdateAbandoned = True
+                    return
+            self._updateSelectorOptions(pinSelector)
+
     def _resetPinSelector(self, pinSelector: PinSelector) -> None:
         pinSelector.unobserve(PinSelectorUpdate, names='value', type='change')
-        pinSelector.value = pinSelector.options[0]
+        pinSelector.value = pinSelector.menuOptions[0]
         pinSelector.observe(PinSelectorUpdate, names='value', type='change')
-        self.updateQueue.put(pinSelector)
+        self.enqueueSelectorChange(pinSelector)
 
     def _clearBus(self, button: ClearButton) -> None:
         if button.bus == 'All':
@@ -0,0 +1,139 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import os
+import json
+import pathlib as pl
+import queue
+import threading
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+
+JOURNAL_FILE_ENDING  = '.journal'
+SNAPSHOT_FILE_ENDING = '.autosave'
+JOURNAL_STATE_COLUMNS = [MappingColumnLabels.MAPPED_PINMODFUNC, MappingColumnLabels.MAPPED_PINMODFUNC_KEY, MappingColumnLabels.PRIMARY]
+
+def _readRecords(filepath: pl.Path, states: dict, notes: list) -> None:
+    """Collect the last state per mapping row into states and the journaled notes into notes. A partially written last
+    line, e.g. after a crash, is ignored."""
+    if not filepath.exists():
+        return
+    with open(filepath, 'r', encoding='utf-8') as recordFile:
+        for line in recordFile:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if 'notes' in record:
+                notes.append(record['notes'])
+            else:
+                states[record['idx']] = record['state']
+
+class MappingJournal(object):
+    """Append-only journal of mapping deltas which is written on a background thread.
+
+    Every record is one JSON line holding the absolute state of a single mapping row (or the notes),
+    so replaying the journal is idempotent and only the last record per row matters. Once no
+    record was appended for idleTime seconds, or when the journal is closed, the records are merged
+    into the autosave snapshot next to the journal, which keeps only the last record per row, and the
+    journal is truncated. The export files are never written by the journal.
+    """
+
+    def __init__(self, filepath: pl.Path | str, snapshotPath: pl.Path | str, idleTime: float = 5.0) -> None:
+        """Initialize a MappingJournal object.
+
+        Parameters
+        ----------
+        filepath     : Path of the journal file, it is created if it does not exist.
+        snapshotPath : Path of the autosave snapshot the journal is compacted into, see SNAPSHOT_FILE_ENDING.
+        idleTime     : Time in seconds without new records after which the journal is compacted, defaults to 5.
+        """
+        self.filepath      = pl.Path(filepath)
+        self.snapshotPath  = pl.Path(snapshotPath)
+        self._idleTime     = idleTime
+        self._recordQueue  = queue.Queue()
+        self._closed       = False
+        self._workerThread = threading.Thread(target=self._writerFunction, daemon=True)
+        self._workerThread.start()
+
+    def appendMappingDelta(self, delta: pd.DataFrame) -> None:
+        """Queue the changed mapping rows, delta must be indexed by the mapping index and contain the JOURNAL_STATE_COLUMNS."""
+        for mappingIdx, row in zip(delta.index.tolist(), delta[JOURNAL_STATE_COLUMNS].itertuples(index=False)):
+            self._recordQueue.put({'idx': int(mappingIdx), 'state': [str(row[0]), int(row[1]), str(row[2])]})
+
+    def appendNotes(self, notes: str) -> None:
+        """Queue the current notes."""
+        self._recordQueue.put({'notes': notes})
+
+    def close(self) -> None:
+        """Write all pending records, compact the journal and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._recordQueue.put(None)
+        self._workerThread.join()
+
+    def _writerFunction(self) -> None:
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        dirty = self.filepath.exists() and self.filepath.stat().st_size > 0
+        with open(self.filepath, 'a', encoding='utf-8') as journalFile:
+            while True:
+                try:
+                    record = self._recordQueue.get(timeout=self._idleTime)
+                except queue.Empty:
+                    if dirty:
+                        self._compact(journalFile)
+                        dirty = False
+                    continue
+                if record is None:
+                    if dirty:
+                        self._compact(journalFile)
+                    return
+                journalFile.write(json.dumps(record, separators=(',', ':')) + '\n')
+                # Drain whatever is queued already before paying for the flush.
+                if self._recordQueue.empty():
+                    journalFile.flush()
+                dirty = True
+
+    def _compact(self, journalFile) -> None:
+        journalFile.flush()
+        states = {}
+        notes  = []
+        _readRecords(self.snapshotPath, states, notes)
+        _readRecords(self.filepath, states, notes)
+        # Write the merged snapshot next to the old one and swap it in, so a crash never leaves a partial snapshot.
+        temporaryPath = self.snapshotPath.with_name(self.snapshotPath.name + '.tmp')
+        with open(temporaryPath, 'w', encoding='utf-8') as snapshotFile:
+            for mappingIdx in sorted(states):
+                snapshotFile.write(json.dumps({'idx': mappingIdx, 'state': states[mappingIdx]}, separators=(',', ':')) + '\n')
+            if len(notes) > 0:
+                snapshotFile.write(json.dumps({'notes': notes[-1]}, separators=(',', ':')) + '\n')
+        os.replace(temporaryPath, self.snapshotPath)
+        journalFile.seek(0)
+        journalFile.truncate()
+
+    @staticmethod
+    def remove(filepath: pl.Path | str, snapshotPath: pl.Path | str) -> None:
+        """Remove the journal at filepath and the autosave snapshot at snapshotPath, if they exist."""
+        for path in [pl.Path(filepath), pl.Path(snapshotPath)]:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def replay(filepath: pl.Path | str, mapping: pd.DataFrame, snapshotPath: pl.Path | str | None = None) -> str | None:
+        """Apply the autosave snapshot at snapshotPath and then all pending records of the journal at filepath to mapping
+        in place. Returns the journaled notes or None if neither contains notes. A partially written last line, e.g. after
+        a crash, is ignored."""
+        states = {}
+        notes  = []
+        if snapshotPath is not None:
+            _readRecords(pl.Path(snapshotPath), states, notes)
+        _readRecords(pl.Path(filepath), states, notes)
+        if len(states) > 0:
+            delta = pd.DataFrame(list(states.values()), index=list(states.keys()), columns=JOURNAL_STATE_COLUMNS)
+            delta = delta[delta.index.isin(mapping.index)]
+            for column in JOURNAL_STATE_COLUMNS:
+                mapping.loc[delta.index, column] = delta[column].values
+        return notes[-1] if len(notes) > 0 else None
@@ -0,0 +1,34 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import ipywidgets as widgets
+import numpy as np
+
+from pinmap.helper import PinSelectorBase
+from pinmap.filebackend import MappingColumnLabels
+
+class PinComboSelector(PinSelectorBase, widgets.Combobox):
+    """Type-ahead variant of the PinSelector based on ipywidget.Combobox. Typed text narrows the suggested options, an option
+    is only selected once the text equals one of the menuOptions. Only used with guiSelectorMode >combobox<."""
+    typeAhead = True
+
+    def __init__(self, *args, **kwargs):
+        super(PinComboSelector, self).__init__(*args, **kwargs)
+        self._initPinSelector(**kwargs)
+
+    def narrowOptions(self, query: str) -> None:
+        """Show only the menuOptions which match the query, at most guiSearchMaxOptions of the parent Adapter."""
+        adapter = self.parent
+        if self.allowedKeys is None and self.mappingIdx is not None:
+            # The options of a lazy adapter were not computed yet.
+            (self.menuOptions, self.allowedKeys) = adapter._computeSelectorOptions(self.mappingIdx,
+                    adapter.mapping.iloc[self.mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC])
+        if self.allowedKeys is None:
+            return
+        matchingKeys = adapter.searchIndex.search(query, self.allowedKeys)
+        positions    = np.flatnonzero(np.isin(self.allowedKeys, matchingKeys))[:adapter.guiSearchMaxOptions]
+        self.options = [self.menuOptions[position + 1] for position in positions]
+        # The frontend does not show the full options anymore, they have to be pushed again on the next update.
+        self.optionsHash = None
@@ -0,0 +1,96 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pandas as pd
+
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend import MappingColumnLabels
+
+def _groupIndex(groupKeys: np.ndarray, numGroups: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return (indptr, indices) of the positions of groupKeys grouped by key, i.e. the CSR form of a one-hot matrix."""
+    order  = np.argsort(groupKeys, kind='stable')
+    indptr = np.zeros(numGroups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(groupKeys, minlength=numGroups), out=indptr[1:])
+    return (indptr, order.astype(np.int64))
+
+class CompatibilityMatrix(object):
+    def __init__(self, mapping: pd.DataFrame, options: PinOptions) -> None:
+        """Sparse matrix of baseboard pins x pin-module-function-combinations which fit the Regex-Module and Regex-Function of
+        the pin, regardless of the current assignments and bus modules. The matrix is stored in CSR form for the forward
+        direction (pin -> pinModFunc keys) and in CSC form for the reverse direction (pinModFunc key -> pins), so both queries
+        are O(nnz) of the result. Every distinct pair of regexes is only evaluated once.
+
+        Parameters
+        ----------
+        mapping : Mapping table as in Adapter.mapping.
+        options : PinOptions of the MCU board.
+        """
+        pinModFunc            = options.pinModFunc
+        self.numPins          = len(mapping)
+        self.numPinModFuncs   = len(pinModFunc)
+        self.pinKeys          = pinModFunc['Pin-Key'].values.astype(np.int64)
+        self.modFuncKeys      = pinModFunc['ModFunc-Key'].values.astype(np.int64)
+        self.moduleKeys       = options.modFunc['Module-Key'].values.astype(np.int64)[self.modFuncKeys]
+        functionKeys          = options.modFunc['Function-Key'].values.astype(np.int64)[self.modFuncKeys]
+        moduleNames           = options.modules.names
+        functionNames         = options.functions.names
+
+        rows       = {}
+        rowLengths = np.zeros(self.numPins, dtype=np.int64)
+        rowKeys    = []
+        regexPairs = zip(mapping[MappingColumnLabels.REGEX_MODULE].values, mapping[MappingColumnLabels.REGEX_FUNCTION].values)
+        for position, regexPair in enumerate(regexPairs):
+            if regexPair not in rows:
+                allowedModules   = moduleNames.str.contains(regexPair[0], regex=True, na=False).values
+                allowedFunctions = functionNames.str.contains(regexPair[1], regex=True, na=False).values
+                rows[regexPair]  = np.flatnonzero(allowedModules[self.moduleKeys] & allowedFunctions[functionKeys]).astype(np.int64)
+            rowKeys.append(rows[regexPair])
+            rowLengths[position] = len(rows[regexPair])
+        self.indptr  = np.zeros(self.numPins + 1, dtype=np.int64)
+        np.cumsum(rowLengths, out=self.indptr[1:])
+        self.indices = np.concatenate(rowKeys) if len(rowKeys) > 0 else np.zeros(0, dtype=np.int64)
+
+        # Transpose: sort the entries by pinModFunc key, the pins of every column stay in mapping order.
+        rowOfEntry          = np.repeat(np.arange(self.numPins, dtype=np.int64), rowLengths)
+        (self.reverseIndptr, order) = _groupIndex(self.indices, self.numPinModFuncs)
+        self.reverseIndices = rowOfEntry[order]
+
+        # Group the pinModFunc keys by MCU pin and by module, to answer the reverse queries for whole pins and modules.
+        self.mcuPinGroups = _groupIndex(self.pinKeys, len(options.pins))
+        self.moduleGroups = _groupIndex(self.moduleKeys, len(options.modules))
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def pinModFuncKeys(self, mappingIdx: int) -> np.ndarray:
+        """Return the pinModFunc keys which fit the baseboard pin at mappingIdx, in ascending order."""
+        return self.indices[self.indptr[mappingIdx]:self.indptr[mappingIdx + 1]]
+
+    def row(self, mappingIdx: int) -> np.ndarray:
+        """Return a boolean mask over all pinModFunc keys which fit the baseboard pin at mappingIdx."""
+        mask = np.zeros(self.numPinModFuncs, dtype=bool)
+        mask[self.pinModFuncKeys(mappingIdx)] = True
+        return mask
+
+    def mappingIdxsForPinModFunc(self, pinModFuncKey: int) -> np.ndarray:
+        """Return the mapping indexes of all baseboard pins which can host the pin-module-function-combination."""
+        return self.reverseIndices[self.reverseIndptr[pinModFuncKey]:self.reverseIndptr[pinModFuncKey + 1]]
+
+    def _mappingIdxsForGroup(self, groups: tuple[np.ndarray, np.ndarray], groupKey: int) -> np.ndarray:
+        (indptr, members) = groups
+        pinModFuncKeys = members[indptr[groupKey]:indptr[groupKey + 1]]
+        if len(pinModFuncKeys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate([self.mappingIdxsForPinModFunc(pinModFuncKey) for pinModFuncKey in pinModFuncKeys]))
+
+    def mappingIdxsForMcuPin(self, pinKey: int) -> np.ndarray:
+        """Return the mapping indexes of all baseboard pins which can host any function of the MCU pin."""
+        return self._mappingIdxsForGroup(self.mcuPinGroups, pinKey)
+
+    def mappingIdxsForModule(self, moduleKey: int) -> np.ndarray:
+        """Return the mapping indexes of all baseboard pins which can host any function of the module."""
+        return self._mappingIdxsForGroup(self.moduleGroups, moduleKey)
@@ -0,0 +1,224 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import sys
+import pathlib as pl
+import ipywidgets as widgets
+import numpy as np
+import pandas as pd
+
+from pinmap.adapter import Adapter
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.filebackend.raw import RawBackend as DefaultDataBackend
+from pinmap.validation import ValidationReport
+
+class ConflictKinds():
+    __slots__ = ()
+    PIN  = 'Pin'
+    FUNC = 'Func'
+
+class ConflictIndex(object):
+    def __init__(self, options: PinOptions) -> None:
+        """Index of the MCU pins and module-function-combinations used by several adapters which share one PinOptions
+        object. The index is updated incrementally by a mapping listener of every registered adapter, so every change costs
+        O(1) per changed pin and looking up the users of a pin or module-function-combination is a dictionary lookup.
+
+        Parameters
+        ----------
+        options : PinOptions shared by all registered adapters.
+        """
+        self.options      = options
+        self._pinKeys     = options.pinModFunc['Pin-Key'].values.astype(int)
+        self._modFuncKeys = options.pinModFunc['ModFunc-Key'].values.astype(int)
+        self._labels      = {}
+        self._assigned    = {}
+        self._users       = {ConflictKinds.PIN: {}, ConflictKinds.FUNC: {}}
+        self._crossKeys   = {ConflictKinds.PIN: set(), ConflictKinds.FUNC: set()}
+
+    @property
+    def adapters(self) -> list[Adapter]:
+        return list(self._labels.keys())
+
+    def register(self, adapter: Adapter, label: str) -> None:
+        """Add the assignments of adapter to the index and keep them up to date. label identifies the adapter in conflict tags."""
+        if adapter.options is not self.options:
+            raise Exception("Only adapters sharing the PinOptions of the ConflictIndex can be registered.")
+        self._labels[adapter]   = label
+        self._assigned[adapter] = {}
+        adapter.conflictIndex   = self
+        self._resync(adapter)
+        adapter.mappingListeners.add(self._mappingChanged)
+
+    def unregister(self, adapter: Adapter) -> None:
+        if adapter not in self._labels:
+            return
+        adapter.mappingListeners.remove(self._mappingChanged)
+        for mappingIdx in list(self._assigned[adapter]):
+            self._remove(adapter, mappingIdx)
+        del self._labels[adapter]
+        del self._assigned[adapter]
+        adapter.conflictIndex = None
+
+    def _entries(self, pinModFuncKey: int) -> list[tuple[str, int]]:
+        return [(ConflictKinds.PIN, int(self._pinKeys[pinModFuncKey])), (ConflictKinds.FUNC, int(self._modFuncKeys[pinModFuncKey]))]
+
+    def _updateCrossKey(self, kind: str, key: int) -> None:
+        users = self._users[kind].get(key, {})
+        if len({adapter for (adapter, _) in users}) > 1:
+            self._crossKeys[kind].add(key)
+        else:
+            self._crossKeys[kind].discard(key)
+            if len(users) == 0:
+                self._users[kind].pop(key, None)
+
+    def _add(self, adapter: Adapter, mappingIdx: int, pinModFuncKey: int) -> None:
+        self._assigned[adapter][mappingIdx] = pinModFuncKey
+        for kind, key in self._entries(pinModFuncKey):
+            self._users[kind].setdefault(key, {})[(adapter, mappingIdx)] = pinModFuncKey
+            self._updateCrossKey(kind, key)
+
+    def _remove(self, adapter: Adapter, mappingIdx: int) -> None:
+        pinModFuncKey = self._assigned[adapter].pop(mappingIdx, None)
+        if pinModFuncKey is None:
+            return
+        for kind, key in self._entries(pinModFuncKey):
+            self._users[kind].get(key, {}).pop((adapter, mappingIdx), None)
+            self._updateCrossKey(kind, key)
+
+    def _resync(self, adapter: Adapter) -> None:
+        for mappingIdx in list(self._assigned[adapter]):
+            self._remove(adapter, mappingIdx)
+        keys = adapter.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY]
+        for mappingIdx, pinModFuncKey in keys[keys != -1].items():
+            self._add(adapter, mappingIdx, int(pinModFuncKey))
+
+    def _mappingChanged(self, adapter: Adapter, previous: pd.DataFrame, current: pd.DataFrame) -> None:
+        changedKeys = set()
+        if previous[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].isna().any():
+            # The pins of the mapping table were reloaded, the mapping indexes are not comparable anymore.
+            changedKeys.update(self._assigned[adapter].values())
+            self._resync(adapter)
+            changedKeys.update(self._assigned[adapter].values())
+        else:
+            newKeys = current[MappingColumnLabels.MAPPED_PINMODFUNC_KEY]
+            for mappingIdx in current.index:
+                oldKey = self._assigned[adapter].get(mappingIdx, -1)
+                newKey = int(newKeys[mappingIdx])
+                if oldKey == newKey:
+                    # Only the primary flag or the conflict prefix changed, which is not visible to the other adapters.
+                    continue
+                changedKeys.update(key for key in (oldKey, newKey) if key != -1)
+                self._remove(adapter, mappingIdx)
+                if newKey != -1:
+                    self._add(adapter, mappingIdx, newKey)
+        self._queueRefresh(adapter, changedKeys)
+
+    def _queueRefresh(self, adapter: Adapter, changedKeys: set) -> None:
+        """Only the other adapters show options tagged with adapter. Their pin-selectors which can host an MCU pin or
+        module-function-combination of the changed pinModFunc keys are refreshed by their own update loop."""
+        if len(changedKeys) == 0:
+            return
+        changedKeys       = np.fromiter(changedKeys, dtype=int)
+        changedPinModFunc = np.isin(self._pinKeys, self._pinKeys[changedKeys]) | np.isin(self._modFuncKeys, self._modFuncKeys[changedKeys])
+        for otherAdapter in self._labels:
+            if otherAdapter is adapter or not otherAdapter.frontendGenerated:
+                continue
+            compatibility = otherAdapter.compatibility
+            mappingIdxs   = [compatibility.mappingIdxsForPinModFunc(pinModFuncKey) for pinModFuncKey in np.flatnonzero(changedPinModFunc)]
+            if len(mappingIdxs) == 0:
+                continue
+            mappingIdxs = np.unique(np.concatenate(mappingIdxs)).tolist()
+            if len(mappingIdxs) > 0:
+                otherAdapter.enqueueSelectorRefresh(mappingIdxs)
+
+    def _member(self, adapter: Adapter) -> Adapter:
+        """Return the registered adapter, forks of a registered adapter are treated like their parent."""
+        while adapter not in self._labels and hasattr(adapter, 'parentAdapter'):
+            adapter = adapter.parentAdapter
+        return adapter
+
+    def users(self, kind: str, key: int) -> list[tuple[Adapter, int]]:
+        """Return (adapter, mapping index) of all pins which use the MCU pin (kind Pin) or module-function-combination (kind
+        Func) with the given key."""
+        return list(self._users[kind].get(key, {}).keys())
+
+    def conflictTag(self, adapter: Adapter, pinKey: int, modFuncKey: int) -> str:
+        """Return the conflict tag of an option of adapter whose MCU pin or module-function-combination is used by another
+        registered adapter, or an empty string. Pin conflicts overrule function conflicts, like within one adapter."""
+        member = self._member(adapter)
+        for kind, key in [(ConflictKinds.PIN, pinKey), (ConflictKinds.FUNC, modFuncKey)]:
+            for (user, mappingIdx) in self._users[kind].get(key, {}):
+                if user is not member:
+                    pin = user.mapping.iloc[mappingIdx]
+                    return sys.intern("{}>{}:{}{}>> ".format(kind, self._labels[user], pin[MappingColumnLabels.PINGRID_COLUMN], pin[MappingColumnLabels.PINGRID_ROW]))
+        return ''
+
+    @property
+    def conflicts(self) -> pd.DataFrame:
+        """MCU pins and module-function-combinations which are used by more than one adapter, one row per usage."""
+        rows = []
+        for kind, keys in self._crossKeys.items():
+            for key in sorted(keys):
+                for (user, mappingIdx), pinModFuncKey in self._users[kind][key].items():
+                    pin = user.mapping.iloc[mappingIdx]
+                    rows.append({
+                            'Kind':                              kind,
+                            'Key':                               key,
+                            'Adapter':                           self._labels[user],
+                            MappingColumnLabels.PINGRID_COLUMN:  pin[MappingColumnLabels.PINGRID_COLUMN],
+                            MappingColumnLabels.PINGRID_ROW:     pin[MappingColumnLabels.PINGRID_ROW],
+                            MappingColumnLabels.SIGNAL:          pin[MappingColumnLabels.SIGNAL],
+                            'Assignment':                        user.optionLabels[pinModFuncKey],
+                        })
+        return pd.DataFrame(rows, columns=['Kind', 'Key', 'Adapter', MappingColumnLabels.PINGRID_COLUMN, MappingColumnLabels.PINGRID_ROW, MappingColumnLabels.SIGNAL, 'Assignment'])
+
+class CompositeAdapter(object):
+    def __init__(self, baseboards: list[tuple[object, pl.Path | str]], optionsFile: pl.Path | str, **kwargs) -> None:
+        """Map one MCU board onto several baseboards, e.g. a carrier which plugs into two baseboard connectors at once. Every
+        baseboard gets its own Adapter, all of them share one PinOptions object, which is read only once, and one
+        ConflictIndex, so pins and functions used on several baseboards are tagged in the selectors of all of them.
+
+        Parameters
+        ----------
+        baseboards  : List of (baseboard, mappingFile) tuples, the baseboard shortnames label the adapters and must be unique.
+        optionsFile : Path to the file containing the pins of the MCU board, read with the backendOptions or backendImport.
+        kwargs      : Further parameters passed to every Adapter, e.g. mcuboard or the gui parameters.
+        """
+        optionsBackend     = kwargs.get('backendOptions', kwargs.get('backendImport', DefaultDataBackend))
+        self.options       = optionsBackend.readOptionsfile(optionsFile)
+        self.conflictIndex = ConflictIndex(self.options)
+        self.adapters      = {}
+        for (baseboard, mappingFile) in baseboards:
+            if baseboard.shortname in self.adapters:
+                raise Exception("Baseboard shortnames must be unique: " + baseboard.shortname)
+            adapter = Adapter(baseboard=baseboard, generate=(mappingFile, optionsFile), sharedOptions=self.options, **kwargs)
+            self.adapters[baseboard.shortname] = adapter
+            self.conflictIndex.register(adapter, baseboard.shortname)
+        # Adapters registered earlier do not know the assignments of the later ones yet, their update loops refresh them.
+        for adapter in self.adapters.values():
+            adapter.enqueueSelectorRefresh(adapter.mapping.index)
+
+    @property
+    def mappingFrontEnd(self) -> widgets.VBox:
+        """Show the mapping frontends of all baseboards below each other."""
+        frontEnds = []
+        for label, adapter in self.adapters.items():
+            frontEnds.append(widgets.Label(value=label))
+            frontEnds.append(adapter.mappingFrontEnd)
+        return widgets.VBox(frontEnds)
+
+    @property
+    def conflicts(self) -> pd.DataFrame:
+        """Pins and functions used on more than one baseboard, see ConflictIndex.conflicts."""
+        return self.conflictIndex.conflicts
+
+    def validate(self) -> dict[str, ValidationReport]:
+        """Check the mapping of every baseboard against the design rules, see Adapter.validate."""
+        return {label: adapter.validate() for label, adapter in self.adapters.items()}
+
+    def exportMapping(self) -> None:
+        for adapter in self.adapters.values():
+            adapter.exportMapping()
@@ -0,0 +1,105 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import ipywidgets as widgets
+import numpy as np
+import pandas as pd
+from ipydatagrid import DataGrid, TextRenderer, VegaExpr
+
+from pinmap.helper import PinCell
+from pinmap.filebackend import MappingColumnLabels
+
+DATAGRID_CONFLICT_COLUMN     = 'Conflict'
+DATAGRID_CONFLICT_COLOR      = '#f4cccc'
+DATAGRID_MAX_CELL_UPDATES    = 50
+
+class DatagridFrontend(object):
+    def __init__(self, adapter: object) -> None:
+        """Frontend of an adapter with guiMode >datagrid<, i.e. one DataGrid showing the whole mapping and one shared
+        pin-selector which edits the pin of the selected cell. Every pin is represented by a headless PinCell of the adapter,
+        so the mapping logic and the update loop work the same as with the pin-grid, but only the options of the edited pin
+        are computed and sent to the frontend.
+
+        Parameters
+        ----------
+        adapter : Adapter whose PinCells were generated already.
+        """
+        self.adapter = adapter
+        self.editor  = adapter._createPinSelector(disabled=True, layout=widgets.Layout(width=adapter.guiDropboxWidthPxStr), mappingIdx=None, parent=adapter)
+        self.editor.options = ['']
+        self.editor.value   = ''
+        self.editor.observe(self._editorUpdate, names='value', type='change')
+        self.editorLabel = widgets.Label(value='', style=adapter.guiStyleDict, layout=widgets.Layout(width=adapter.guiLabelSignalWidthPxStr))
+        self._cell       = None
+
+        # The conflict highlighting is evaluated by the frontend from the Conflict column, so it follows every data update.
+        conflictRenderer = TextRenderer(background_color=VegaExpr("cell.metadata.data['{}'] !== '' ? '{}' : 'white'".format(DATAGRID_CONFLICT_COLUMN, DATAGRID_CONFLICT_COLOR)))
+        self._data = self.frame()
+        self.grid  = DataGrid(self._data, selection_mode='cell', editable=False, auto_fit_columns=True,
+                              renderers={MappingColumnLabels.MAPPED_PINMODFUNC: conflictRenderer, DATAGRID_CONFLICT_COLUMN: conflictRenderer},
+                              layout=widgets.Layout(height=adapter.guiDatagridHeightPxStr))
+        self.grid.on_cell_click(self._cellClicked)
+
+    @property
+    def frontEnd(self) -> list:
+        return [self.grid, widgets.HBox([self.editorLabel, self.editor])]
+
+    def frame(self) -> pd.DataFrame:
+        """Return the table shown by the datagrid. The conflict tag of a mapped pin is split off into its own column."""
+        mapping = self.adapter.mapping
+        columns = [MappingColumnLabels.PINGRID_COLUMN, MappingColumnLabels.PINGRID_ROW, MappingColumnLabels.SIGNAL, MappingColumnLabels.STATUS,
+                   MappingColumnLabels.BUS, MappingColumnLabels.MAPPED_PINMODFUNC]
+        if MappingColumnLabels.CONNECTOR in mapping.columns:
+            columns.insert(0, MappingColumnLabels.CONNECTOR)
+        frame  = mapping[columns].copy()
+        parts  = frame[MappingColumnLabels.MAPPED_PINMODFUNC].str.split('>> ')
+        frame[MappingColumnLabels.MAPPED_PINMODFUNC] = parts.str[-1]
+        frame[DATAGRID_CONFLICT_COLUMN]              = np.where(parts.str.len() > 1, parts.str[0], '')
+        return frame
+
+    def _cellClicked(self, cell: dict) -> None:
+        self.edit(self.adapter.pinCells[cell['primary_key_row']])
+
+    def edit(self, pinCell: PinCell) -> None:
+        """Load the options and value of pinCell into the shared pin-selector."""
+        adapter    = self.adapter
+        self._cell = pinCell
+        pinCell.value = adapter.mapping.iloc[pinCell.mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC]
+        adapter._updateSelectorOptions(pinCell)
+        editor = self.editor
+        editor.unobserve(self._editorUpdate, names='value', type='change')
+        editor.menuOptions = pinCell.menuOptions
+        editor.allowedKeys = pinCell.allowedKeys
+        optionsHash = hash(pinCell.menuOptions)
+        if optionsHash != editor.optionsHash:
+            editor.options     = pinCell.menuOptions
+            editor.optionsHash = optionsHash
+        editor.value    = pinCell.value
+        editor.disabled = False
+        editor.observe(self._editorUpdate, names='value', type='change')
+        self.editorLabel.value = pinCell.fullLabel
+
+    def _editorUpdate(self, change: dict) -> None:
+        """Callback of the shared pin-selector, which forwards the new value to the edited PinCell."""
+        if self._cell is None:
+            return
+        if self.editor.typeAhead and change['new'] not in self.editor.menuOptions:
+            self.editor.narrowOptions(change['new'])
+            return
+        self._cell.value = change['new']
+        self.adapter.enqueueSelectorChange(self._cell)
+
+    def refresh(self) -> None:
+        """Send the changed cells of the mapping to the datagrid, the whole table is only sent if many cells changed."""
+        frame   = self.frame()
+        changed = np.nonzero(frame.astype(str).values != self._data.astype(str).values)
+        if len(changed[0]) > DATAGRID_MAX_CELL_UPDATES:
+            self.grid.data = frame
+        else:
+            for rowPos, colPos in zip(*changed):
+                self.grid.set_cell_value_by_index(frame.columns[colPos], frame.index[rowPos], frame.iat[rowPos, colPos])
+        self._data = frame
+        if self._cell is not None:
+            self.edit(self._cell)
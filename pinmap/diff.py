@@ -0,0 +1,229 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+
+PIN_KEY_COLUMNS           = [MappingColumnLabels.PINGRID_COLUMN, MappingColumnLabels.PINGRID_ROW]
+CONNECTOR_PIN_KEY_COLUMNS = [MappingColumnLabels.CONNECTOR, MappingColumnLabels.PINGRID_COLUMN, MappingColumnLabels.PINGRID_ROW]
+
+class ChangeLabels():
+    __slots__ = ()
+    ADDED     = 'added'
+    REMOVED   = 'removed'
+    CHANGED   = 'changed'
+    UNCHANGED = ''
+
+class MergeConflictReasons():
+    __slots__ = ()
+    ASSIGNMENT = 'assignment'
+    PIN        = 'pin'
+    FUNCTION   = 'function'
+
+def pinKeyColumns(*mappings: pd.DataFrame) -> list[str]:
+    """Return the columns identifying a pin in all given mapping tables, i.e. (Connector, Column, Row) if all tables have
+    a connector column and (Column, Row) otherwise. Boards with several connectors reuse the same Column and Row."""
+    if all(MappingColumnLabels.CONNECTOR in mapping.columns for mapping in mappings):
+        return CONNECTOR_PIN_KEY_COLUMNS
+    return PIN_KEY_COLUMNS
+
+def _assignmentParts(mapping: pd.DataFrame) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """Return the assignment of every pin without conflict prefix and padding, and the names identifying its MCU pin and
+    module-function-combination, i.e. the key representation which does not depend on the options."""
+    assignment = mapping[MappingColumnLabels.MAPPED_PINMODFUNC].astype(str).str.split('>> ').str[-1]
+    assignment = assignment.str.replace(r'\s+-\s+', ' - ', regex=True).str.strip()
+    parts      = assignment.str.split(' - ')
+    pins       = parts.str[0].fillna('') + ' - ' + parts.str[1].fillna('')
+    modFuncs   = parts.str[2].fillna('') + ' - ' + parts.str[3].fillna('')
+    return assignment, pins, modFuncs
+
+def normalizedAssignments(mapping: pd.DataFrame, keyColumns: list[str] | None = None) -> pd.DataFrame:
+    """Return a table indexed by keyColumns, by default see pinKeyColumns, with the comparable state of every pin of a mapping
+    table, i.e. the assignment without conflict prefix and padding, the primary flag, the bus and the mapped module."""
+    if keyColumns is None:
+        keyColumns = pinKeyColumns(mapping)
+    (assignment, _, modFuncs) = _assignmentParts(mapping)
+    normalized = pd.DataFrame({column: mapping[column].values for column in keyColumns})
+    normalized[MappingColumnLabels.BUS] = mapping[MappingColumnLabels.BUS].values
+    normalized['Assignment']            = assignment.values
+    normalized['Module']                = modFuncs.str.split(' - ').str[0].values
+    normalized['Primary']               = (mapping[MappingColumnLabels.PRIMARY] != '').values
+    return normalized.set_index(keyColumns)
+
+def recomputePrimaries(mapping: pd.DataFrame) -> None:
+    """Recompute the primary flags and conflict prefixes of a mapping table in place from its assignments alone. A pin is
+    primary if no other primary pin uses the same MCU pin or module-function-combination, existing primaries are kept
+    where possible and the remaining pins are considered in mapping order, as if they were selected one after another.
+    Shared pins get the conflict prefix of the primary they conflict with, a pin conflict overrules a function conflict."""
+    (_, pins, modFuncs) = _assignmentParts(mapping)
+    assigned   = (mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int) != -1)
+    primary    = (mapping[MappingColumnLabels.PRIMARY] != '').values & assigned
+    labels     = mapping[MappingColumnLabels.MAPPED_PINMODFUNC].values.astype(object)
+    columns    = mapping[MappingColumnLabels.PINGRID_COLUMN].astype(str).values
+    rows       = mapping[MappingColumnLabels.PINGRID_ROW].astype(str).values
+    buses      = mapping[MappingColumnLabels.BUS].astype(str).values
+    pins       = pins.values
+    modFuncs   = modFuncs.values
+    newPrimary = np.zeros(len(mapping), dtype=bool)
+    pinOwner   = {}
+    funcOwner  = {}
+    order      = np.concatenate([np.flatnonzero(primary), np.flatnonzero(assigned & ~primary)])
+    for position in order:
+        if pins[position] in pinOwner or modFuncs[position] in funcOwner:
+            continue
+        newPrimary[position]          = True
+        pinOwner[pins[position]]      = position
+        funcOwner[modFuncs[position]] = position
+    for position in np.flatnonzero(assigned):
+        label = labels[position].split('>> ')[-1]
+        if not newPrimary[position]:
+            if pins[position] in pinOwner:
+                (specifier, owner) = ('Pin', pinOwner[pins[position]])
+            else:
+                (specifier, owner) = ('Func', funcOwner[modFuncs[position]])
+            strBus = '@' + buses[owner] if buses[owner] != '' else ''
+            label  = "{}>{}{}{}>> {}".format(specifier, columns[owner], rows[owner], strBus, label)
+        labels[position] = label
+    mapping[MappingColumnLabels.MAPPED_PINMODFUNC] = labels
+    mapping[MappingColumnLabels.PRIMARY]           = np.where(newPrimary, 'x', '')
+
+def busModules(normalized: pd.DataFrame) -> pd.Series:
+    """Return the module each bus is locked to, i.e. the module of the first assigned bus member, indexed by bus."""
+    assigned = normalized[(normalized[MappingColumnLabels.BUS] != '') & (normalized['Assignment'] != '')]
+    modules  = assigned.groupby(MappingColumnLabels.BUS, sort=True)['Module'].first()
+    allBuses = pd.Index(pd.unique(normalized.loc[normalized[MappingColumnLabels.BUS] != '', MappingColumnLabels.BUS]))
+    return modules.reindex(allBuses.sort_values(), fill_value='')
+
+class MappingDiff(object):
+    def __init__(self, old: pd.DataFrame, new: pd.DataFrame) -> None:
+        """Compare two mapping tables, e.g. of two adapter revisions. The pins are aligned by (Connector,) Column and Row, see pinKeyColumns,
+        pins which only exist in one of the tables are treated as unassigned in the other one.
+
+        Parameters
+        ----------
+        old : Mapping table of the old revision, as in Adapter.mapping.
+        new : Mapping table of the new revision, as in Adapter.mapping.
+        """
+        keyColumns = pinKeyColumns(old, new)
+        oldState   = normalizedAssignments(old, keyColumns)
+        newState   = normalizedAssignments(new, keyColumns)
+        aligned  = oldState.join(newState, how='outer', lsuffix='-Old', rsuffix='-New')
+        for column in ['Assignment', 'Module', MappingColumnLabels.BUS]:
+            aligned[column + '-Old'] = aligned[column + '-Old'].fillna('')
+            aligned[column + '-New'] = aligned[column + '-New'].fillna('')
+        for column in ['Primary']:
+            aligned[column + '-Old'] = aligned[column + '-Old'].fillna(False).astype(bool)
+            aligned[column + '-New'] = aligned[column + '-New'].fillna(False).astype(bool)
+
+        oldAssigned = (aligned['Assignment-Old'] != '').values
+        newAssigned = (aligned['Assignment-New'] != '').values
+        aligned['Change'] = np.select(
+                [~oldAssigned & newAssigned, oldAssigned & ~newAssigned, oldAssigned & newAssigned & (aligned['Assignment-Old'] != aligned['Assignment-New']).values],
+                [ChangeLabels.ADDED,         ChangeLabels.REMOVED,       ChangeLabels.CHANGED],
+                default=ChangeLabels.UNCHANGED)
+        aligned['Primary-Flip'] = oldAssigned & newAssigned & (aligned['Primary-Old'] != aligned['Primary-New']).values
+        self.pins = aligned
+
+        oldBuses = busModules(oldState)
+        newBuses = busModules(newState)
+        buses    = pd.concat([oldBuses.rename('Module-Old'), newBuses.rename('Module-New')], axis=1).fillna('')
+        self.buses = buses[buses['Module-Old'] != buses['Module-New']]
+
+    @property
+    def added(self) -> pd.DataFrame:
+        """Pins which are unassigned in the old and assigned in the new mapping."""
+        return self.pins[self.pins['Change'] == ChangeLabels.ADDED]
+
+    @property
+    def removed(self) -> pd.DataFrame:
+        """Pins which are assigned in the old and unassigned in the new mapping."""
+        return self.pins[self.pins['Change'] == ChangeLabels.REMOVED]
+
+    @property
+    def changed(self) -> pd.DataFrame:
+        """Pins which are assigned in both mappings, but to a different pin-module-function-combination."""
+        return self.pins[self.pins['Change'] == ChangeLabels.CHANGED]
+
+    @property
+    def primaryFlips(self) -> pd.DataFrame:
+        """Pins which are assigned in both mappings and switched between primary and shared usage."""
+        return self.pins[self.pins['Primary-Flip']]
+
+    @property
+    def busChanges(self) -> pd.DataFrame:
+        """Buses which are locked to a different module, or got locked or unlocked."""
+        return self.buses
+
+    @property
+    def isEmpty(self) -> bool:
+        return (not (self.pins['Change'] != ChangeLabels.UNCHANGED).any()) and (not self.pins['Primary-Flip'].any()) and len(self.buses) == 0
+
+    def summary(self) -> dict:
+        return {
+            'added':        len(self.added),
+            'removed':      len(self.removed),
+            'changed':      len(self.changed),
+            'primaryFlips': len(self.primaryFlips),
+            'busChanges':   len(self.busChanges),
+        }
+
+def diffMappings(old: pd.DataFrame, new: pd.DataFrame) -> MappingDiff:
+    """Compare two mapping tables, see MappingDiff."""
+    return MappingDiff(old, new)
+
+def diffRevisions(mappings: list[pd.DataFrame]) -> list[MappingDiff]:
+    """Compare a sequence of mapping tables, e.g. ordered by revision, and return the diff of each consecutive pair."""
+    return [MappingDiff(old, new) for old, new in zip(mappings[:-1], mappings[1:])]
+
+def mergeMappings(base: pd.DataFrame, ours: pd.DataFrame, theirs: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Three-way merge of the assignments of two mapping tables ours and theirs, which both derive from base.
+
+    The merged table has the structure of ours, pins are aligned by (Connector,) Column and Row, see pinKeyColumns. For every
+    pin, the assignment of theirs is taken if only theirs changed it compared to base, otherwise the assignment of ours is
+    kept. Afterwards the primary flags and conflict prefixes are recomputed for the merged assignments, see recomputePrimaries.
+    All tables are expected to use the same options, i.e. the same keys.
+
+    Conflicts are reported with their reason:
+    - assignment : The pin was changed on both sides to different assignments, it is kept as in ours.
+    - pin        : The pin was taken from theirs and uses the same MCU pin as a pin changed in ours.
+    - function   : The pin was taken from theirs and uses the same module-function-combination as a pin changed in ours.
+
+    Returns the merged mapping table and a conflict table indexed by the pin key columns.
+    """
+    keyColumns  = pinKeyColumns(base, ours, theirs)
+    baseState   = normalizedAssignments(base, keyColumns)['Assignment']
+    oursState   = normalizedAssignments(ours, keyColumns)['Assignment']
+    theirsState = normalizedAssignments(theirs, keyColumns)['Assignment']
+    aligned     = pd.concat([baseState.rename('Base'), oursState.rename('Ours'), theirsState.rename('Theirs')], axis=1)
+    aligned     = aligned.reindex(oursState.index).fillna('')
+
+    oursChanged   = aligned['Ours']   != aligned['Base']
+    theirsChanged = aligned['Theirs'] != aligned['Base']
+    takeTheirs    = theirsChanged & ~oursChanged
+    conflicts     = aligned[oursChanged & theirsChanged & (aligned['Ours'] != aligned['Theirs'])].assign(Reason=MergeConflictReasons.ASSIGNMENT)
+
+    merged       = ours.copy()
+    stateColumns = [MappingColumnLabels.MAPPED_PINMODFUNC, MappingColumnLabels.MAPPED_PINMODFUNC_KEY, MappingColumnLabels.PRIMARY]
+    theirsRows   = theirs.set_index(keyColumns)[stateColumns].reindex(aligned.index)
+    takeMask     = takeTheirs.values
+    for column in stateColumns:
+        fillValue = -1 if column == MappingColumnLabels.MAPPED_PINMODFUNC_KEY else ''
+        merged.loc[merged.index[takeMask], column] = theirsRows[column].fillna(fillValue).values[takeMask].astype(merged[column].dtype)
+    recomputePrimaries(merged)
+
+    # Both sides may have started to use the same MCU pin or module-function-combination on different pins.
+    (mergedAssignment, pins, modFuncs) = _assignmentParts(merged)
+    assigned    = (mergedAssignment != '').values
+    oursSide    = oursChanged.values & assigned
+    theirsSide  = takeMask & assigned
+    crossRows   = []
+    for (reason, resources) in [(MergeConflictReasons.PIN, pins.values), (MergeConflictReasons.FUNCTION, modFuncs.values)]:
+        shared = theirsSide & np.isin(resources, resources[oursSide])
+        crossRows.append(aligned[shared].assign(Reason=reason))
+    conflicts = pd.concat([conflicts] + crossRows)
+    conflicts = conflicts[~conflicts.index.duplicated(keep='first')]
+    return merged, conflicts
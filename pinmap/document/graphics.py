@@ -3,13 +3,19 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import functools
 import pathlib as pl
 
 from pinmap.document.lib.utils import ImageReader
 from pinmap.document.lib.units import cm
 
-def getImageSize(path: pl.Path, height: float|int = 0.5*cm) -> tuple[float|int,float|int]:
-    img = ImageReader(path)
-    iw, ih = img.getSize()
+@functools.lru_cache(maxsize=None)
+def getImageReader(path: pl.Path | str) -> ImageReader:
+    """Return the ImageReader of an image file, every file is only read once per process."""
+    return ImageReader(str(path))
+
+@functools.lru_cache(maxsize=None)
+def getImageSize(path: pl.Path | str, height: float|int = 0.5*cm) -> tuple[float|int,float|int]:
+    iw, ih = getImageReader(path).getSize()
     aspect = ih / float(iw)
     return (height / aspect, height)
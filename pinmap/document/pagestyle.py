@@ -10,36 +10,55 @@ from pinmap.document.pdfgen import canvas
 
 import pinmap.document.graphics as GraphicsHelper
 
-def headerLogoInternal(canvas, doc, landscape: bool = False, logoPath: pl.Path, filename='') -> None:
+def _doStaticForm(canvas, formName: str, drawFunction: callable) -> None:
+    """Draw the static part of a page decoration. It is rendered into the document as form XObject when it is used for the
+    first time, all further pages only reference the form."""
+    if not canvas.hasForm(formName):
+        canvas.beginForm(formName)
+        drawFunction()
+        canvas.endForm()
+    canvas.doForm(formName)
+
+def _drawLogo(canvas, logoPath: pl.Path | None, x: float, y: float) -> None:
+    if logoPath is None:
+        return
+    logoPathAspect = GraphicsHelper.getImageSize(logoPath)
+    canvas.drawImage(GraphicsHelper.getImageReader(logoPath), x, y, width=logoPathAspect[0], height=logoPathAspect[1])
+
+def headerLogoInternal(canvas, doc, landscape: bool = False, logoPath: pl.Path | None = None, filename='') -> None:
+    def drawHeader() -> None:
+        if landscape:
+            _drawLogo(canvas, logoPath, doc.topMargin, doc.width)
+            canvas.drawRightString(doc.height, doc.width, filename)
+        else:
+            _drawLogo(canvas, logoPath, doc.leftMargin, doc.height)
+            canvas.drawRightString(doc.width, doc.height, filename)
     # Save the state of our canvas so we can draw on it
     canvas.saveState()
-    logoPathAspect = GraphicsHelper.getImageSize(logoPath)
-    if landscape:
-        canvas.drawImage(logoPath, doc.topMargin, doc.width, width=logoPathAspect[0], height=logoPathAspect[1])
-        canvas.drawRightString(doc.height, doc.width, filename)
-    else:
-        canvas.drawImage(logoPath, doc.leftMargin, doc.height, width=logoPathAspect[0], height=logoPathAspect[1])
-        canvas.drawRightString(doc.width, doc.height, filename)
+    _doStaticForm(canvas, "pinmapHeader{}{}".format('L' if landscape else 'P', abs(hash((str(logoPath), filename)))), drawHeader)
     # Release the canvas
     canvas.restoreState()
 
-def footerLogoPagenumber(canvas, doc, landscape: bool = False, logoPath: pl.Path, numPages: int = 0, extraString: str = '') -> None:
+def footerLogoPagenumber(canvas, doc, landscape: bool = False, logoPath: pl.Path | None = None, numPages: int = 0, extraString: str = '') -> None:
+    def drawFooter() -> None:
+        if landscape:
+            _drawLogo(canvas, logoPath, doc.topMargin, doc.leftMargin)
+            canvas.drawCentredString((doc.height-doc.topMargin)/2+doc.topMargin, doc.leftMargin, extraString)
+        else:
+            _drawLogo(canvas, logoPath, doc.leftMargin, doc.bottomMargin)
+            canvas.drawCentredString((doc.width-doc.leftMargin)/2+doc.leftMargin, doc.bottomMargin, extraString)
     # Save the state of our canvas so we can draw on it
     canvas.saveState()
-    logoPathAspect = GraphicsHelper.getImageSize(logoPath)
+    _doStaticForm(canvas, "pinmapFooter{}{}".format('L' if landscape else 'P', abs(hash((str(logoPath), extraString)))), drawFooter)
+    # Only the page number changes from page to page.
     pageNumStr = "%d/%d" % (canvas._pageNumber, numPages)
     if landscape:
-        canvas.drawImage(logoPath, doc.topMargin, doc.leftMargin, width=logoPathAspect[0], height=logoPathAspect[1])
-        canvas.drawCentredString((doc.height-doc.topMargin)/2+doc.topMargin, doc.leftMargin, extraString)
         canvas.drawRightString(doc.height, doc.leftMargin, pageNumStr)
     else:
-        canvas.drawImage(logoPath, doc.leftMargin, doc.bottomMargin, width=logoPathAspect[0], height=logoPathAspect[1])
-        canvas.drawCentredString((doc.width-doc.leftMargin)/2+doc.leftMargin, doc.bottomMargin, extraString)
         canvas.drawRightString(doc.width, doc.bottomMargin, pageNumStr)
     # Release the canvas
     canvas.restoreState()
 
-def logosInternalPagenumber(canvas, doc, landscape: bool = False, headerLogoPath: pl.Path, footerLogoPath: pl.Path, numPages: int = 0, filename='') -> None:
+def logosInternalPagenumber(canvas, doc, landscape: bool = False, headerLogoPath: pl.Path | None = None, footerLogoPath: pl.Path | None = None, numPages: int = 0, filename='') -> None:
     headerLogoInternal(canvas, doc, landscape, headerLogoPath, filename)
     footerLogoPagenumber(canvas, doc, landscape, footerLogoPath, numPages)
-
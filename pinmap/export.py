@@ -0,0 +1,109 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import threading
+import ipywidgets as widgets
+
+EXPORT_DATA_SHARE = 0.1
+
+class ExportStatus():
+    __slots__ = ()
+    RUNNING   = 'Running'
+    DONE      = 'Done'
+    CANCELLED = 'Cancelled'
+    FAILED    = 'Failed'
+
+class ExportJob(object):
+    def __init__(self, snapshot: object, withReport: bool = True, schedule: callable = None) -> None:
+        """Export a snapshot of an adapter, e.g. created by Adapter.snapshot, on a background thread. The snapshot is not
+        changed by further edits of the adapter, so the exported files are consistent while editing continues.
+
+        Parameters
+        ----------
+        snapshot   : Adapter object to export, usually a snapshot.
+        withReport : Also write the report with the report backend, defaults to True.
+        schedule   : Function which runs a function on the thread owning the widgets, e.g. Adapter.enqueueFrontendTask. The
+                     export thread never changes the widgets itself, progress and status are pushed through schedule.
+                     Defaults to None, then the widgets are changed directly.
+        """
+        self.snapshot    = snapshot
+        self.withReport  = withReport
+        self.schedule    = schedule
+        self.progress    = 0.0
+        self.status      = ExportStatus.RUNNING
+        self.error       = None
+        self.cancelEvent = threading.Event()
+        self.doneEvent   = threading.Event()
+        self.progressBar  = widgets.FloatProgress(value=0.0, min=0.0, max=1.0, description='Export:')
+        self.statusLabel  = widgets.Label(value=self.status)
+        self.cancelButton = widgets.Button(description='Cancel')
+        self.cancelButton.on_click(lambda button: self.cancel())
+        self._widgetsLock    = threading.Lock()
+        self._widgetsPending = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def frontEnd(self) -> widgets.HBox:
+        """Show the progress of the export below the current cell."""
+        return widgets.HBox([self.progressBar, self.statusLabel, self.cancelButton])
+
+    @property
+    def done(self) -> bool:
+        return self.doneEvent.is_set()
+
+    def cancel(self) -> None:
+        """Request the export to stop, the report backend checks the request between pages."""
+        self.cancelEvent.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until the export has finished, returns False if the timeout expired before."""
+        return self.doneEvent.wait(timeout)
+
+    def _setProgress(self, progress: float) -> None:
+        self.progress = progress
+        self._scheduleWidgetsUpdate()
+
+    def _setStatus(self, status: str) -> None:
+        self.status = status
+        self._scheduleWidgetsUpdate()
+
+    def _scheduleWidgetsUpdate(self) -> None:
+        """Push progress and status to the widgets. Updates are coalesced, at most one is scheduled at a time and it shows
+        the state at the time it runs."""
+        if self.schedule is None:
+            self._updateWidgets()
+            return
+        with self._widgetsLock:
+            if self._widgetsPending:
+                return
+            self._widgetsPending = True
+        self.schedule(self._updateWidgets)
+
+    def _updateWidgets(self) -> None:
+        with self._widgetsLock:
+            self._widgetsPending = False
+        self.progressBar.value     = self.progress
+        self.statusLabel.value     = self.status
+        self.cancelButton.disabled = self.done
+
+    def _run(self) -> None:
+        try:
+            self.snapshot.exportData()
+            self._setProgress(EXPORT_DATA_SHARE)
+            if self.withReport and not self.cancelEvent.is_set():
+                self.snapshot.backendReport.writeReportFile(self.snapshot,
+                        progress=lambda reportProgress: self._setProgress(EXPORT_DATA_SHARE + (1.0 - EXPORT_DATA_SHARE) * reportProgress), cancelEvent=self.cancelEvent)
+            if self.cancelEvent.is_set():
+                self._setStatus(ExportStatus.CANCELLED)
+            else:
+                self._setProgress(1.0)
+                self._setStatus(ExportStatus.DONE)
+        except Exception as exception:
+            self.error = exception
+            self._setStatus(ExportStatus.CANCELLED if self.cancelEvent.is_set() else ExportStatus.FAILED)
+        finally:
+            self.doneEvent.set()
+            self._scheduleWidgetsUpdate()
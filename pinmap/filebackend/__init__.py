@@ -15,6 +15,7 @@ class MappingColumnLabels():
     MAPPED_PINMODFUNC     = 'Mapped-PinModFunc'
     MAPPED_PINMODFUNC_KEY = 'Mapped-PinModFunc-Key'
     PRIMARY         = 'Primary'
+    CONNECTOR       = 'Connector'
 
 class OptionsColumnLabels():
     __slots__ = ()
@@ -4,12 +4,18 @@
 # SPDX-License-Identifier: EUPL-1.2
 
 import pathlib as pl
+import threading
 import pandas as pd
 import numpy as np
 
 from pinmap.pinoptions import PinOptions
 
 class FileBackend():
+    @staticmethod
+    def getFileEnding() -> str:
+        """File ending of bundle files."""
+        return ''
+
     @staticmethod
     def getDataFileEnding() -> str:
         return ''
@@ -24,8 +30,9 @@ class FileBackend():
         return False
 
     @staticmethod
-    def readBundle(filepath: pl.Path) -> tuple[pd.DataFrame, PinOptions, str]:
-        """Read all data from one bundle, returns True if successful/supported and False if not."""
+    def readBundle(filepath: pl.Path, name: str | None = None) -> tuple[pd.DataFrame, PinOptions, str]:
+        """Read all data from one bundle, returns True if successful/supported and False if not. Backends which store several
+        adapters in one bundle file select the adapter by name."""
         raise Exception("This backend cannot be used to read the bundle files.")
 
     @staticmethod
@@ -41,7 +48,7 @@ class FileBackend():
         raise Exception("This backend cannot be used to read the notes file.")
 
     @staticmethod
-    def writeBundle(filepath: pl.Path, mapping: pd.DataFrame, options: PinOptions, notes: str) -> None:
+    def writeBundle(filepath: pl.Path, mapping: pd.DataFrame, options: PinOptions, notes: str, name: str | None = None) -> None:
         """Write all data in one bundle, returns True if successful/supported and False if not."""
         raise Exception("This backend cannot be used to write the bundle files.")
 
@@ -58,6 +65,8 @@ class FileBackend():
         raise Exception("This backend cannot be used to write the notes file.")
 
     @staticmethod
-    def writeReportFile(adapterObj: object) -> None:
+    def writeReportFile(adapterObj: object, progress: callable = None, cancelEvent: threading.Event | None = None) -> None:
+        """Write the report of adapterObj. progress(fraction) is called while the report is generated, the generation
+        is aborted with an Exception once cancelEvent is set."""
         raise Exception("This backend cannot be used to write the report file.")
 
@@ -0,0 +1,290 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import io
+import re
+import json
+import string
+import pathlib as pl
+import numpy as np
+import pandas as pd
+
+from pinmap.__version__ import __version__
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend import MappingColumnLabels, OptionsColumnLabels
+from pinmap.filebackend.base import FileBackend
+from pinmap.validation import validateMapping
+
+FIRMWARE_CONFIG_COLUMNS = ['Position', 'Identifier', 'Signal', 'Bus', 'Board-Pin', 'MCU-Pin', 'Module', 'Function', 'Alt-Index', 'Primary']
+
+def _cIdentifier(value: str) -> str:
+    """Upper case C identifier of value, every run of other characters becomes one underscore."""
+    identifier = re.sub(r'[^A-Za-z0-9]+', '_', value).strip('_').upper()
+    if identifier == '' or identifier[0].isdigit():
+        identifier = '_' + identifier
+    return identifier
+
+def _cString(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def firmwarePinConfigs(mapping: pd.DataFrame, options: PinOptions) -> pd.DataFrame:
+    """Return one row per assigned baseboard pin with the MCU pin, module, function and ALT index it is mapped to, in mapping
+    order. Shared assignments, i.e. several baseboard pins on the same MCU pin, are marked by Primary False. The Identifier is
+    a C identifier of baseboard pin position and signal, which is unique within the adapter."""
+    keys     = mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(np.int64)
+    assigned = mapping[keys != -1]
+    keys     = keys[keys != -1]
+    pinModFunc  = options.pinModFunc
+    altIndexes  = pinModFunc['Alt-Index'] if 'Alt-Index' in pinModFunc.columns else pinModFunc.groupby('Pin-Key').cumcount()
+    pinKeys     = pinModFunc['Pin-Key'].values.astype(np.int64)[keys]
+    modFuncKeys = pinModFunc['ModFunc-Key'].values.astype(np.int64)[keys]
+    position = assigned[MappingColumnLabels.PINGRID_COLUMN].astype(str) + assigned[MappingColumnLabels.PINGRID_ROW].astype(str)
+    if MappingColumnLabels.CONNECTOR in assigned.columns:
+        position = (assigned[MappingColumnLabels.CONNECTOR].astype(str) + '.' + position).str.lstrip('.')
+    signals = assigned[MappingColumnLabels.SIGNAL].astype(str)
+    return pd.DataFrame({
+                'Position':   position.values,
+                'Identifier': [_cIdentifier(pos + '_' + signal) for pos, signal in zip(position.values, signals.values)],
+                'Signal':     signals.values,
+                'Bus':        assigned[MappingColumnLabels.BUS].astype(str).values,
+                'Board-Pin':  options.pins[OptionsColumnLabels.BOARD_PIN].astype(str).values[pinKeys],
+                'MCU-Pin':    options.pins[OptionsColumnLabels.MCU_PIN].astype(str).values[pinKeys],
+                'Module':     options.modules['names'].astype(str).values[options.modFunc['Module-Key'].values.astype(np.int64)[modFuncKeys]],
+                'Function':   options.functions['names'].astype(str).values[options.modFunc['Function-Key'].values.astype(np.int64)[modFuncKeys]],
+                'Alt-Index':  altIndexes.values.astype(np.int64)[keys],
+                'Primary':    assigned[MappingColumnLabels.PRIMARY].values != '',
+            }, index=assigned.index, columns=FIRMWARE_CONFIG_COLUMNS)
+
+class FirmwareBackend(FileBackend):
+    """Base of the backends which generate the pin configuration for the firmware of an adapter, i.e. MCU pin and ALT index of
+    every assigned baseboard pin. The output is produced from precompiled string.Template objects: the HEADER once, then the
+    PIN template for every assigned pin, the MUX_HEADER, the MUX template for every MCU pin, i.e. primary assignment, and the
+    FOOTER. Every substituted line is written to the stream directly, so whole catalogs are generated without building the
+    files in memory, see writeCatalogFirmwareFiles. The mapping is checked with validateMapping before anything is written,
+    if the design rule errors are allowed, they are written with the ISSUE template after the HEADER, followed by the
+    PIN_HEADER."""
+    HEADER     = string.Template('')
+    ISSUE      = string.Template('')
+    PIN_HEADER = string.Template('')
+    PIN        = string.Template('')
+    MUX_HEADER = string.Template('')
+    MUX        = string.Template('')
+    FOOTER     = string.Template('')
+    SEPARATOR  = ''
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        return value
+
+    @classmethod
+    def _pinValues(cls, pinConfig: tuple, prefix: str) -> dict:
+        (position, identifier, signal, bus, boardPin, mcuPin, module, function, altIndex, primary) = pinConfig
+        return {
+                'prefix':     prefix,
+                'position':   cls._quote(position),
+                'identifier': identifier,
+                'signal':     cls._quote(signal),
+                'bus':        cls._quote(bus),
+                'boardPin':   cls._quote(boardPin),
+                'mcuPin':     cls._quote(mcuPin),
+                'module':     cls._quote(module),
+                'function':   cls._quote(function),
+                'altIndex':   int(altIndex),
+                'primary':    'true' if primary else 'false',
+                'comment':    "{} {}: {} - {} - {}_{}".format(position, signal, boardPin, mcuPin, module, function).replace('*/', '* /'),
+            }
+
+    @classmethod
+    def writeFirmwareStream(cls, stream: io.TextIOBase, name: str, mapping: pd.DataFrame, options: PinOptions, prefix: str | None = None,
+                            allowErrors: bool = False) -> int:
+        """Write the pin configuration of the adapter name to the text stream, returns the number of assigned pins. prefix
+        is put in front of all generated identifiers, defaults to the C identifier of name. A mapping which violates the
+        design rules is refused with an exception before anything is written, unless allowErrors is set, then the errors
+        are written into the pin configuration, see validateMapping."""
+        return cls._writeStream(stream, name, mapping, options, prefix, cls._checkDesignRules(name, mapping, options, allowErrors))
+
+    @staticmethod
+    def _checkDesignRules(name: str, mapping: pd.DataFrame, options: PinOptions, allowErrors: bool) -> list[tuple[str, str, str]]:
+        """Return rule, pin position and message of every design rule error, raise if there are errors but they are not allowed."""
+        errors   = validateMapping(mapping, options).errors
+        position = errors[MappingColumnLabels.PINGRID_COLUMN].astype(str) + errors[MappingColumnLabels.PINGRID_ROW].astype(str)
+        if MappingColumnLabels.CONNECTOR in errors.columns:
+            position = (errors[MappingColumnLabels.CONNECTOR].astype(str) + '.' + position).str.lstrip('.')
+        issues = list(zip(errors['Rule'].astype(str), position, errors['Message'].astype(str)))
+        if len(issues) > 0 and not allowErrors:
+            raise Exception("Pin configuration of {} not written, the mapping violates the design rules: {}".format(
+                    name, "; ".join("{} {}: {}".format(*issue) for issue in issues)))
+        return issues
+
+    @classmethod
+    def _writeStream(cls, stream: io.TextIOBase, name: str, mapping: pd.DataFrame, options: PinOptions, prefix: str | None, issues: list[tuple[str, str, str]]) -> int:
+        pinConfigs = firmwarePinConfigs(mapping, options)
+        prefix     = _cIdentifier(name) if prefix is None else _cIdentifier(prefix)
+        muxConfigs = pinConfigs[pinConfigs['Primary']]
+        values     = {
+                'name':       cls._quote(name),
+                'prefix':     prefix,
+                'generator':  cls._quote("pinmap {}".format(__version__)),
+                'numPins':    len(pinConfigs),
+                'numMux':     len(muxConfigs),
+            }
+        stream.write(cls.HEADER.substitute(values))
+        for position, (rule, pinPosition, message) in enumerate(issues):
+            stream.write((cls.SEPARATOR if position > 0 else '') + cls.ISSUE.substitute({
+                    'rule':     cls._quote(rule),
+                    'position': cls._quote(pinPosition),
+                    'message':  cls._quote(message),
+                    'comment':  "{} {}: {}".format(rule, pinPosition, message).replace('*/', '* /')}))
+        stream.write(cls.PIN_HEADER.substitute(values))
+        for position, pinConfig in enumerate(pinConfigs.itertuples(index=False, name=None)):
+            stream.write((cls.SEPARATOR if position > 0 else '') + cls.PIN.substitute(cls._pinValues(pinConfig, prefix)))
+        stream.write(cls.MUX_HEADER.substitute(values))
+        for position, pinConfig in enumerate(muxConfigs.itertuples(index=False, name=None)):
+            stream.write((cls.SEPARATOR if position > 0 else '') + cls.MUX.substitute(cls._pinValues(pinConfig, prefix)))
+        stream.write(cls.FOOTER.substitute(values))
+        return len(pinConfigs)
+
+    @classmethod
+    def writeFirmwareFile(cls, filepath: pl.Path | str, name: str, mapping: pd.DataFrame, options: PinOptions, prefix: str | None = None,
+                          allowErrors: bool = False) -> int:
+        # Checked before the file is opened, so a refused mapping does not leave an empty file behind.
+        issues   = cls._checkDesignRules(name, mapping, options, allowErrors)
+        filepath = pl.Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8', newline='\n') as firmwareFile:
+            return cls._writeStream(firmwareFile, name, mapping, options, prefix, issues)
+
+class CHeaderBackend(FirmwareBackend):
+    """Generates a C header with the MCU pin and ALT index of every assigned signal as defines and a pin-mux table with one
+    entry per used MCU pin, which the pin-mux init code of the firmware iterates."""
+    HEADER = string.Template(
+            "/* Generated pin configuration, do not edit. */\n"
+            "#ifndef ${prefix}_PINCONFIG_H\n"
+            "#define ${prefix}_PINCONFIG_H\n"
+            "\n"
+            "#define ${prefix}_ADAPTER_NAME ${name}\n"
+            "#define ${prefix}_GENERATOR    ${generator}\n"
+            "\n"
+            "#include <stdint.h>\n"
+            "\n"
+            "#ifndef PINMAP_PINMUX_T_DEFINED\n"
+            "#define PINMAP_PINMUX_T_DEFINED\n"
+            "typedef struct {\n"
+            "    const char *mcuPin;\n"
+            "    uint8_t     alt;\n"
+            "    const char *module;\n"
+            "    const char *function;\n"
+            "} pinmap_pinmux_t;\n"
+            "#endif\n"
+            "\n"
+            "#define ${prefix}_NUM_PINS ${numPins}\n"
+            "\n")
+    ISSUE = string.Template(
+            "/* DESIGN RULE VIOLATED: ${comment} */\n")
+    PIN = string.Template(
+            "/* ${comment} */\n"
+            "#define ${prefix}_${identifier}_MCU_PIN ${mcuPin}\n"
+            "#define ${prefix}_${identifier}_ALT     ${altIndex}\n")
+    MUX_HEADER = string.Template(
+            "\n"
+            "#define ${prefix}_PINMUX_COUNT ${numMux}\n"
+            "static const pinmap_pinmux_t ${prefix}_PINMUX[${prefix}_PINMUX_COUNT + 1] = {\n")
+    MUX = string.Template(
+            "    { ${mcuPin}, ${altIndex}, ${module}, ${function} }, /* ${comment} */\n")
+    FOOTER = string.Template(
+            "    { 0, 0, 0, 0 }\n"
+            "};\n"
+            "\n"
+            "#endif /* ${prefix}_PINCONFIG_H */\n")
+
+    @staticmethod
+    def getTextFileEnding() -> str:
+        return '.h'
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        return _cString(value)
+
+class JsonConfigBackend(FirmwareBackend):
+    """Generates a JSON pin configuration with every assigned pin, for firmware build scripts and code generators."""
+    HEADER = string.Template(
+            "{\n"
+            "  \"adapter\": ${name},\n"
+            "  \"generator\": ${generator},\n"
+            "  \"issues\": [\n")
+    ISSUE = string.Template(
+            "    {\"rule\": ${rule}, \"position\": ${position}, \"message\": ${message}}")
+    PIN_HEADER = string.Template(
+            "\n"
+            "  ],\n"
+            "  \"pins\": [\n")
+    PIN = string.Template(
+            "    {\"position\": ${position}, \"signal\": ${signal}, \"bus\": ${bus}, \"boardPin\": ${boardPin}, \"mcuPin\": ${mcuPin}, "
+            "\"module\": ${module}, \"function\": ${function}, \"alt\": ${altIndex}, \"primary\": ${primary}}")
+    MUX_HEADER = string.Template(
+            "\n"
+            "  ],\n"
+            "  \"pinmux\": [\n")
+    MUX = string.Template(
+            "    {\"mcuPin\": ${mcuPin}, \"alt\": ${altIndex}, \"module\": ${module}, \"function\": ${function}}")
+    FOOTER = string.Template(
+            "\n"
+            "  ]\n"
+            "}\n")
+    SEPARATOR = ",\n"
+
+    @staticmethod
+    def getTextFileEnding() -> str:
+        return '.json'
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        return json.dumps(value)
+
+def writeCatalogFirmwareFiles(catalogPath: pl.Path | str, backendCatalog: FileBackend, outputPath: pl.Path | str, backendFirmware: FirmwareBackend = CHeaderBackend,
+                              allowErrors: bool = False, progress: callable = None) -> list[pl.Path]:
+    """Generate the pin configuration of every adapter in a catalog into outputPath, one file per adapter named after it.
+    Only mapping and options are read, no Adapter object and no widgets are created. progress(fraction) is called after
+    every adapter. Returns the written files.
+
+    Parameters
+    ----------
+    catalogPath     : Bundle file of a backendCatalog with bundle support, which holds several adapters, e.g. the SqliteBackend,
+                      or else a directory with one export directory per adapter, e.g. written by the RawBackend.
+    backendCatalog  : File backend the catalog was written with.
+    outputPath      : Directory the pin configurations are written to.
+    backendFirmware : Firmware backend, defaults to the CHeaderBackend.
+    allowErrors     : Write the pin configuration of adapters which violate the design rules with the errors annotated,
+                      otherwise an exception is raised before anything is written, defaults to False.
+    """
+    catalogPath = pl.Path(catalogPath)
+    outputPath  = pl.Path(outputPath)
+    mappingName = 'mapping' + backendCatalog.getDataFileEnding()
+    optionsName = 'options' + backendCatalog.getDataFileEnding()
+    if backendCatalog.hasBundleSupport():
+        names = backendCatalog.listAdapters(catalogPath)['Name'].tolist()
+    else:
+        names = sorted(directory.name for directory in catalogPath.iterdir() if directory.joinpath(mappingName).exists())
+
+    # All adapters are checked first, so a refused catalog does not leave some of the files behind.
+    checked = []
+    for name in names:
+        if backendCatalog.hasBundleSupport():
+            (mapping, options, _) = backendCatalog.readBundle(catalogPath, name=name)
+        else:
+            mapping = backendCatalog.readMappingfile(catalogPath.joinpath(name, mappingName))
+            options = backendCatalog.readOptionsfile(catalogPath.joinpath(name, optionsName))
+        checked.append((name, mapping, options, backendFirmware._checkDesignRules(name, mapping, options, allowErrors)))
+
+    writtenFiles = []
+    outputPath.mkdir(parents=True, exist_ok=True)
+    for position, (name, mapping, options, issues) in enumerate(checked):
+        filepath = outputPath.joinpath(name + backendFirmware.getTextFileEnding())
+        with open(filepath, 'w', encoding='utf-8', newline='\n') as firmwareFile:
+            backendFirmware._writeStream(firmwareFile, name, mapping, options, None, issues)
+        writtenFiles.append(filepath)
+        if progress is not None:
+            progress((position + 1) / len(checked))
+    return writtenFiles
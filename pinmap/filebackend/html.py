@@ -0,0 +1,113 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import datetime as dt
+import html
+import threading
+
+from pinmap.filebackend.base import FileBackend
+from pinmap.filebackend.report import MAPPING_TABLE_COLUMN_NAMES, buildMappingTables
+
+# Landscape A4 in points, like the mapping pages of the PdfBackend.
+SVG_PAGE_WIDTH   = 842
+SVG_PAGE_HEIGHT  = 595
+SVG_PAGE_MARGIN  = 25
+SVG_TABLE_GAP    = 6
+SVG_ROW_HEIGHT   = 12
+SVG_FONT_SIZE    = 8
+SVG_HEADER_COLOR = '#808080'
+
+HTML_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; }
+.pinmap-page { border: 1px solid #c0c0c0; margin: 8px 0; display: block; }
+.pinmap-page text { font-family: Helvetica, Arial, sans-serif; }
+"""
+
+class HtmlBackend(FileBackend):
+    """Report backend which renders the report as one self-contained HTML file, every mapping page is an inline SVG. The
+    pages are the same as in the PdfBackend, see buildMappingTables, but no document layout engine is involved, so the
+    report renders fast enough to be used as live preview, see Adapter.reportPreview."""
+
+    @staticmethod
+    def getTextFileEnding() -> str:
+        return '.html'
+
+    @staticmethod
+    def _renderTable(table, x: float, y: float, width: float) -> list[str]:
+        elements = ['<g transform="translate({:.1f},{:.1f})">'.format(x, y)]
+        for rowIdx, row in enumerate(table):
+            background = SVG_HEADER_COLOR if rowIdx % 2 == 0 else 'white'
+            elements.append('<rect x="0" y="{}" width="{:.1f}" height="{}" fill="{}"/>'.format(rowIdx * SVG_ROW_HEIGHT, width, SVG_ROW_HEIGHT, background))
+            weight = ' font-weight="bold"' if rowIdx == 0 else ''
+            for colIdx, cell in enumerate(row):
+                if cell == '':
+                    continue
+                cellX = width / 2 + 3 if colIdx == 1 else 3
+                elements.append('<text x="{:.1f}" y="{}" font-size="{}"{}>{}</text>'.format(cellX, rowIdx * SVG_ROW_HEIGHT + SVG_ROW_HEIGHT - 3, SVG_FONT_SIZE, weight, html.escape(str(cell))))
+        height = len(table) * SVG_ROW_HEIGHT
+        elements.append('<rect x="0" y="0" width="{:.1f}" height="{}" fill="none" stroke="black" stroke-width="2"/>'.format(width, height))
+        elements.append('<line x1="0" y1="{0}" x2="{1:.1f}" y2="{0}" stroke="black" stroke-width="1"/>'.format(SVG_ROW_HEIGHT, width))
+        elements.append('</g>')
+        return elements
+
+    @staticmethod
+    def _renderPage(title: str, tables: list, pageNumber: int, numPages: int, filename: str) -> str:
+        tableWidth = (SVG_PAGE_WIDTH - 2 * SVG_PAGE_MARGIN - (len(tables) - 1) * SVG_TABLE_GAP) / max(len(tables), 1)
+        elements   = ['<svg class="pinmap-page" xmlns="http://www.w3.org/2000/svg" width="{0}" height="{1}" viewBox="0 0 {0} {1}">'.format(SVG_PAGE_WIDTH, SVG_PAGE_HEIGHT),
+                      '<text x="{}" y="{}" font-size="14" font-weight="bold">{}</text>'.format(SVG_PAGE_MARGIN, SVG_PAGE_MARGIN + 14, html.escape(title)),
+                      '<text x="{}" y="{}" font-size="{}" text-anchor="end">{}</text>'.format(SVG_PAGE_WIDTH - SVG_PAGE_MARGIN, SVG_PAGE_MARGIN, SVG_FONT_SIZE, html.escape(filename))]
+        for tableIdx, table in enumerate(tables):
+            elements.extend(HtmlBackend._renderTable(table, SVG_PAGE_MARGIN + tableIdx * (tableWidth + SVG_TABLE_GAP), SVG_PAGE_MARGIN + 30, tableWidth))
+        elements.append('<text x="{}" y="{}" font-size="{}" text-anchor="end">{}/{}</text>'.format(SVG_PAGE_WIDTH - SVG_PAGE_MARGIN, SVG_PAGE_HEIGHT - SVG_PAGE_MARGIN,
+                                                                                                   SVG_FONT_SIZE, pageNumber, numPages))
+        elements.append('</svg>')
+        return '\n'.join(elements)
+
+    @staticmethod
+    def renderReport(adapterObj: object, progress: callable = None, cancelEvent: threading.Event | None = None, standalone: bool = True) -> str:
+        """Render the report of adapterObj and return it as HTML. With standalone, a complete HTML document is returned,
+        otherwise only the body, e.g. to embed it into a notebook output."""
+        def checkCancelled() -> None:
+            if cancelEvent is not None and cancelEvent.is_set():
+                raise Exception("Report generation cancelled.")
+        filename = adapterObj.name + HtmlBackend.getTextFileEnding()
+        (pages, mappingTables) = buildMappingTables(adapterObj, checkCancelled)
+
+        body = ['<h1>{}</h1>'.format(html.escape("Adapter for {} {} on {} {}".format(adapterObj.mcuboard.vendor, adapterObj.mcuboard.longname,
+                                                                                       adapterObj.baseboard.vendor, adapterObj.baseboard.longname))),
+                '<h2>Date: {}</h2>'.format(dt.datetime.today().strftime('%Y-%m-%d')),
+                '<h2>Adapter-Revision: {}</h2>'.format(html.escape(adapterObj.revision)),
+                '<h2>Baseboard: {}</h2>'.format(html.escape("_".join([adapterObj.baseboard.vendor, adapterObj.baseboard.shortname, adapterObj.baseboard.revision]))),
+                '<h2>MCU-Board: {}</h2>'.format(html.escape("_".join([adapterObj.mcuboard.vendor, adapterObj.mcuboard.shortname, adapterObj.mcuboard.revision]))),
+                '<h2>Important Notes</h2>',
+                '<ul>']
+        for line in adapterObj.notes.split('\n'):
+            body.append('<li>{}</li>'.format(html.escape(line.replace('* ', '').replace('- ', ''))))
+        body.append('</ul>')
+
+        numPages = len(MAPPING_TABLE_COLUMN_NAMES) * len(pages)
+        for groupIdx, mappingGroup in enumerate(MAPPING_TABLE_COLUMN_NAMES.keys()):
+            for pageIdx, page in enumerate(pages):
+                checkCancelled()
+                if page.connector != '':
+                    title = "Pin Mappings - {} - {}".format(mappingGroup, page.connector)
+                else:
+                    title = "Pin Mappings - {}".format(mappingGroup)
+                pageNumber = groupIdx * len(pages) + pageIdx + 1
+                body.append(HtmlBackend._renderPage(title, mappingTables[mappingGroup][pageIdx], pageNumber, numPages, filename))
+                if progress is not None:
+                    progress(pageNumber / numPages)
+
+        if not standalone:
+            return '<style>{}</style>\n{}'.format(HTML_STYLE, '\n'.join(body))
+        return '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{}</title>\n<style>{}</style>\n</head>\n<body>\n{}\n</body>\n</html>\n'.format(
+                    html.escape(filename), HTML_STYLE, '\n'.join(body))
+
+    @staticmethod
+    def writeReportFile(adapterObj: object, progress: callable = None, cancelEvent: threading.Event | None = None) -> None:
+        report = HtmlBackend.renderReport(adapterObj, progress, cancelEvent)
+        adapterObj.exportDirPath.mkdir(parents=True, exist_ok=True)
+        with open(adapterObj.exportDirPath.joinpath(adapterObj.name + HtmlBackend.getTextFileEnding()), 'w', encoding='utf-8') as reportFile:
+            reportFile.write(report)
@@ -8,9 +8,10 @@ import math
 import pathlib as pl
 import os
 import re
+import threading
 
 import numpy as np
-from functools import partial
+from functools import partial, lru_cache
 
 from pinmap.document.platypus import *
 from pinmap.document.lib import colors
@@ -22,7 +23,7 @@ from pinmap.document.lib.colors import CMYKColor
 import pinmap.document.pagestyle as PageStyle
 
 from pinmap.filebackend.base import FileBackend
-from pinmap.filebackend import MappingColumnLabels
+from pinmap.filebackend.report import MAPPING_TABLE_COLUMN_NAMES, buildMappingTables
 
 GRID_STYLE = TableStyle(
       [
@@ -51,60 +52,44 @@ GRID_STYLE = TableStyle(
       ]
     )
 
+REPORT_TABLES_SHARE = 0.1
+
+@lru_cache(maxsize=None)
+def getReportStyles() -> object:
+    """Paragraph styles of the report, the style sheet is only generated once per process."""
+    styles = getSampleStyleSheet()
+    styles['bu'].leftIndent = -7
+    return styles
+
 class PdfBackend(FileBackend):
     @staticmethod
     def getTextFileEnding() -> str:
         return '.pdf'
 
-    def writeReportFile(adapterObj: object) -> None:
-        numColsPerPage          = 3
-        numRowsPerpage          = 33
-        mappingTableColumnNames = {
-                                    'ELO': ['Baseboard', 'MCU Board Pin'],
-                                    'SW':  ['Baseboard', 'MCU Pinfunction']
-                                  }
-        pagesPerRow             = math.ceil(len(adapterObj.edbColVals[MappingColumnLabels.PINGRID_COLUMN])/numColsPerPage)
-        pagesPerColumn          = math.ceil(len(adapterObj.edbRowVals[MappingColumnLabels.PINGRID_ROW])/numRowsPerpage)
-        numTotalPages           = pagesPerRow*pagesPerColumn
-        mappingTables           = {mappingGroup: [[np.full((numRowsPerpage,2), "", dtype=str) for __ in range(pagesPerRow)] for _ in range(numTotalPages)] for mappingGroup in mappingTableColumnNames.keys()}
-        for mappingGroup in mappingTableColumnNames.keys():
-            mappingTables[mappingGroup] = []
-            for pageIdx in range(numTotalPages):
-                mappingTables[mappingGroup].append([])
-                for tableIdx in range(numColsPerPage):
-                    mappingTables[mappingGroup][pageIdx].append(np.full((numRowsPerpage,2), '', dtype=np.dtype('U100')))
-                    mappingTables[mappingGroup][pageIdx][tableIdx][0,:] = mappingTableColumnNames[mappingGroup]
-
-        for _, pin in adapterObj.mapping.iterrows():
-            rowIdx = adapterObj.edbRowVals[adapterObj.edbRowVals[MappingColumnLabels.PINGRID_ROW] == pin[MappingColumnLabels.PINGRID_ROW]].index[0]
-            colIdx = adapterObj.edbColVals[adapterObj.edbColVals[MappingColumnLabels.PINGRID_COLUMN] == pin[MappingColumnLabels.PINGRID_COLUMN]].index[0]
-
-            if pagesPerColumn > 1:
-                pageIdx  = math.floor(colIdx / numColsPerPage) * pagesPerRow + math.floor(rowIdx / numRowsPerpage)
-            else:
-                pageIdx  = math.floor(rowIdx / numRowsPerpage) * pagesPerColumn + math.floor(colIdx / numColsPerPage)
-            tableIdx     = colIdx % numColsPerPage
-            onPageRowIdx = (rowIdx % numRowsPerpage) + 1
-
-            baseboardPin    = str(pin[MappingColumnLabels.PINGRID_COLUMN]) + str(pin[MappingColumnLabels.PINGRID_ROW])
-            baseboardSignal = re.match(r'[A-Za-z0-9]+_*[A-Za-z0-9]*', pin[MappingColumnLabels.SIGNAL]).group(0)
-            (strBoardPin, strMcuPin, strModule, strFunction) = adapterObj._splitPinSelectorValueString(pin[MappingColumnLabels.MAPPED_PINMODFUNC])
-
-            try:
-                mappingTables['ELO'][pageIdx][tableIdx][onPageRowIdx, 0] = baseboardPin + ": " + baseboardSignal
-            except:
-                pass
-            mappingTables['SW'][pageIdx][tableIdx][onPageRowIdx, 0]  = baseboardPin + ": " + baseboardSignal
-            if len(strBoardPin) > 0 and len(strMcuPin) > 0:
-                mappingTables['ELO'][pageIdx][tableIdx][onPageRowIdx, 1] = strBoardPin + " - " + strMcuPin
-                mappingTables['SW'][pageIdx][tableIdx][onPageRowIdx, 1]  = strMcuPin + " - " + strModule + "_" + strFunction
+    def writeReportFile(adapterObj: object, progress: callable = None, cancelEvent: threading.Event | None = None) -> None:
+        def checkCancelled() -> None:
+            if cancelEvent is not None and cancelEvent.is_set():
+                raise Exception("Report generation cancelled.")
+        buildSize = {'Total': 1}
+        def buildProgress(progressType: str, value: int) -> None:
+            # Called by the document template while the story is laid out.
+            if progressType == 'SIZE_EST':
+                buildSize['Total'] = max(value, 1)
+            elif progressType == 'PROGRESS' and progress is not None:
+                progress(REPORT_TABLES_SHARE + (1.0 - REPORT_TABLES_SHARE) * min(value / buildSize['Total'], 1.0))
+            checkCancelled()
+
+        # Only pages and table rows which contain populated pins are rendered, see PinGridLayout.paginate.
+        (pages, mappingTables)  = buildMappingTables(adapterObj, checkCancelled)
+        numTotalPages           = len(pages)
+
+        if progress is not None:
+            progress(REPORT_TABLES_SHARE)
 
         filename = adapterObj.name + adapterObj.backendReport.getTextFileEnding()
         filepath = str(adapterObj.exportDirPath.joinpath(filename))
         doc = BaseDocTemplate(filepath, pagesize=A4, rightMargin=25, leftMargin=25, topMargin=25, bottomMargin=25)
-        styles = getSampleStyleSheet()
-
-        styles['bu'].leftIndent = -7
+        styles = getReportStyles()
 
         story= []
         # Title Page
@@ -133,10 +118,13 @@ class PdfBackend(FileBackend):
 
         # Mapping pages
         story.append(NextPageTemplate('landscape'))
-        for mappingGroup in mappingTableColumnNames.keys():
-            for pageIdx in range(numTotalPages):
+        for mappingGroup in MAPPING_TABLE_COLUMN_NAMES.keys():
+            for pageIdx, page in enumerate(pages):
                 story.append(PageBreak())
-                story.append(Paragraph("Pin Mappings - {}".format(mappingGroup), style=styles['Heading2']))
+                if page.connector != '':
+                    story.append(Paragraph("Pin Mappings - {} - {}".format(mappingGroup, page.connector), style=styles['Heading2']))
+                else:
+                    story.append(Paragraph("Pin Mappings - {}".format(mappingGroup), style=styles['Heading2']))
                 story.append(Table([[Table(npTable.tolist(), style=GRID_STYLE) for npTable in mappingTables[mappingGroup][pageIdx]]]))
 
 
@@ -148,7 +136,8 @@ class PdfBackend(FileBackend):
         framePortrait  = Frame(doc.leftMargin,   doc.topMargin+footerOffset,  doc.width,  doc.height-doc.topMargin-headerOffset, topPadding=headerPadding, bottomPadding=footerPadding, id='portrait_frame ' )
 
         doc.addPageTemplates([
-                PageTemplate(id='portrait', frames=framePortrait,  onPage=partial(PageStyle.logosInternalPagenumber, landscape=False, numPages=numTotalPages+3, filename=filename)),
-                PageTemplate(id='landscape',frames=frameLandscape, onPage=partial(PageStyle.logosInternalPagenumber, landscape=True , numPages=numTotalPages+3, filename=filename), pagesize=landscape(A4)),
+                PageTemplate(id='portrait', frames=framePortrait,  onPage=partial(PageStyle.logosInternalPagenumber, landscape=False, headerLogoPath=adapterObj.reportHeaderLogoPath, footerLogoPath=adapterObj.reportFooterLogoPath, numPages=numTotalPages+3, filename=filename)),
+                PageTemplate(id='landscape',frames=frameLandscape, onPage=partial(PageStyle.logosInternalPagenumber, landscape=True , headerLogoPath=adapterObj.reportHeaderLogoPath, footerLogoPath=adapterObj.reportFooterLogoPath, numPages=numTotalPages+3, filename=filename), pagesize=landscape(A4)),
             ])
+        doc.setProgressCallBack(buildProgress)
         doc.build(story)
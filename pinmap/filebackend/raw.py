@@ -30,6 +30,8 @@ class RawBackend(FileBackend):
         |:-------------------------|:----------------------|:---------------------------------------------|:-----------|:-----------------------|:--------------------------------|:----------------------------------|
         | Column identifier of pin | Row identifeir of pin | To which bus the pin belong to, can be empty | Signalname | Default open or closed | Regex to filter allowed modules | Regex to filter allowed functions |
 
+        An optional Connector column assigns the pins to different connectors of the board, each connector gets its own pin-grid.
+
         Parameters
         ----------
         filepath: Path to the mapping file as string or pathlib.Path
@@ -55,6 +57,8 @@ class RawBackend(FileBackend):
         mapping[MappingColumnLabels.MAPPED_PINMODFUNC]     = mapping[MappingColumnLabels.MAPPED_PINMODFUNC].fillna('')
         mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].fillna(-1)
         mapping[MappingColumnLabels.PRIMARY]               = mapping[MappingColumnLabels.PRIMARY].fillna('')
+        if MappingColumnLabels.CONNECTOR in mapping.columns:
+            mapping[MappingColumnLabels.CONNECTOR] = mapping[MappingColumnLabels.CONNECTOR].fillna('').astype(str)
 
         # Make sure all columns have the correct type.
         mapping = mapping.astype({
@@ -0,0 +1,58 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+
+REPORT_COLUMNS_PER_PAGE    = 3
+REPORT_ROWS_PER_PAGE       = 33
+MAPPING_TABLE_COLUMN_NAMES = {
+                                'ELO': ['Baseboard', 'MCU Board Pin'],
+                                'SW':  ['Baseboard', 'MCU Pinfunction']
+                             }
+
+def mappingTableCells(adapterObj: object) -> pd.DataFrame:
+    """Return the text of the report table cells of every pin, indexed by mapping index: the baseboard pin with its signal
+    and the assignment for the ELO and the SW tables. The assignment labels are only split once per distinct label."""
+    mapping   = adapterObj.mapping
+    baseboard = mapping[MappingColumnLabels.PINGRID_COLUMN].astype(str) + mapping[MappingColumnLabels.PINGRID_ROW].astype(str) + ": " \
+                + mapping[MappingColumnLabels.SIGNAL].astype(str).str.extract(r'^([A-Za-z0-9]+_*[A-Za-z0-9]*)', expand=False).fillna('')
+    splitLabels = {label: adapterObj._splitPinSelectorValueString(label) for label in pd.unique(mapping[MappingColumnLabels.MAPPED_PINMODFUNC])}
+    elo = []
+    sw  = []
+    for label in mapping[MappingColumnLabels.MAPPED_PINMODFUNC].values:
+        (strBoardPin, strMcuPin, strModule, strFunction) = splitLabels[label]
+        if len(strBoardPin) > 0 and len(strMcuPin) > 0:
+            elo.append(strBoardPin + " - " + strMcuPin)
+            sw.append(strMcuPin + " - " + strModule + "_" + strFunction)
+        else:
+            elo.append('')
+            sw.append('')
+    return pd.DataFrame({'Baseboard': baseboard.values, 'ELO': elo, 'SW': sw}, index=mapping.index)
+
+def buildMappingTables(adapterObj: object, checkCancelled: callable = None) -> tuple[list, dict]:
+    """Paginate the pin-grid of adapterObj, see PinGridLayout.paginate, and fill the mapping tables of every page. Returns
+    the pages and, per mapping group, a list with the tables of every page. Every table is a numpy array of strings with the
+    header in the first row. Shared by all report backends, so they all show the same pages."""
+    pages         = adapterObj.layout.paginate(REPORT_COLUMNS_PER_PAGE, REPORT_ROWS_PER_PAGE)
+    cells         = mappingTableCells(adapterObj)
+    mappingTables = {mappingGroup: [] for mappingGroup in MAPPING_TABLE_COLUMN_NAMES.keys()}
+    for page in pages:
+        if checkCancelled is not None:
+            checkCancelled()
+        pageCells = cells.loc[page.entries.index]
+        tableIdxs = page.entries['Table-Index'].values
+        rowIdxs   = page.entries['Table-Row'].values + 1
+        for mappingGroup in MAPPING_TABLE_COLUMN_NAMES.keys():
+            pageTables = [np.full((page.numTableRows + 1, 2), '', dtype=np.dtype('U100')) for _ in range(page.numTables)]
+            for pageTable in pageTables:
+                pageTable[0,:] = MAPPING_TABLE_COLUMN_NAMES[mappingGroup]
+            for tableIdx, rowIdx, baseboard, assignment in zip(tableIdxs, rowIdxs, pageCells['Baseboard'].values, pageCells[mappingGroup].values):
+                pageTables[tableIdx][rowIdx, 0] = baseboard
+                pageTables[tableIdx][rowIdx, 1] = assignment
+            mappingTables[mappingGroup].append(pageTables)
+    return (pages, mappingTables)
@@ -0,0 +1,304 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import contextlib
+import datetime as dt
+import hashlib
+import pathlib as pl
+import sqlite3
+import pandas as pd
+
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.filebackend import OptionsColumnLabels
+from pinmap.filebackend.base import FileBackend
+
+# Mapping table columns and their SQL column names.
+SQL_MAPPING_COLUMNS = {
+        MappingColumnLabels.PINGRID_COLUMN:        'pin_column',
+        MappingColumnLabels.PINGRID_ROW:           'pin_row',
+        MappingColumnLabels.BUS:                   'bus',
+        MappingColumnLabels.SIGNAL:                'signal',
+        MappingColumnLabels.STATUS:                'status',
+        MappingColumnLabels.REGEX_MODULE:          'regex_module',
+        MappingColumnLabels.REGEX_FUNCTION:        'regex_function',
+        MappingColumnLabels.MAPPED_PINMODFUNC:     'mapped_pinmodfunc',
+        MappingColumnLabels.MAPPED_PINMODFUNC_KEY: 'mapped_pinmodfunc_key',
+        MappingColumnLabels.PRIMARY:               'is_primary',
+        MappingColumnLabels.CONNECTOR:             'connector',
+    }
+SQL_MAPPING_STATE_COLUMNS = [MappingColumnLabels.MAPPED_PINMODFUNC, MappingColumnLabels.MAPPED_PINMODFUNC_KEY, MappingColumnLabels.PRIMARY]
+
+SQL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS adapters (
+    adapter_id   INTEGER PRIMARY KEY,
+    name         TEXT NOT NULL UNIQUE,
+    notes        TEXT NOT NULL DEFAULT '',
+    options_hash TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    revision_id  INTEGER PRIMARY KEY,
+    adapter_id   INTEGER NOT NULL REFERENCES adapters(adapter_id),
+    saved_at     TEXT NOT NULL,
+    changed_rows INTEGER NOT NULL,
+    mapping_rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mapping (
+    adapter_id            INTEGER NOT NULL REFERENCES adapters(adapter_id),
+    idx                   INTEGER NOT NULL,
+    pin_column            TEXT NOT NULL,
+    pin_row               INTEGER NOT NULL,
+    bus                   TEXT NOT NULL,
+    signal                TEXT NOT NULL,
+    status                TEXT NOT NULL,
+    regex_module          TEXT NOT NULL,
+    regex_function        TEXT NOT NULL,
+    mapped_pinmodfunc     TEXT NOT NULL,
+    mapped_pinmodfunc_key INTEGER NOT NULL,
+    is_primary            TEXT NOT NULL,
+    connector             TEXT NOT NULL,
+    PRIMARY KEY (adapter_id, idx)
+);
+CREATE TABLE IF NOT EXISTS mapping_history (
+    revision_id           INTEGER NOT NULL REFERENCES revisions(revision_id),
+    idx                   INTEGER NOT NULL,
+    pin_column            TEXT NOT NULL,
+    pin_row               INTEGER NOT NULL,
+    bus                   TEXT NOT NULL,
+    signal                TEXT NOT NULL,
+    status                TEXT NOT NULL,
+    regex_module          TEXT NOT NULL,
+    regex_function        TEXT NOT NULL,
+    mapped_pinmodfunc     TEXT NOT NULL,
+    mapped_pinmodfunc_key INTEGER NOT NULL,
+    is_primary            TEXT NOT NULL,
+    connector             TEXT NOT NULL,
+    PRIMARY KEY (revision_id, idx)
+);
+CREATE TABLE IF NOT EXISTS pins (
+    adapter_id INTEGER NOT NULL REFERENCES adapters(adapter_id),
+    pin_key    INTEGER NOT NULL,
+    board_pin  TEXT NOT NULL,
+    mcu_pin    TEXT NOT NULL,
+    comment    TEXT NOT NULL,
+    PRIMARY KEY (adapter_id, pin_key)
+);
+CREATE TABLE IF NOT EXISTS modules (
+    adapter_id INTEGER NOT NULL REFERENCES adapters(adapter_id),
+    module_key INTEGER NOT NULL,
+    name       TEXT NOT NULL,
+    PRIMARY KEY (adapter_id, module_key)
+);
+CREATE TABLE IF NOT EXISTS functions (
+    adapter_id   INTEGER NOT NULL REFERENCES adapters(adapter_id),
+    function_key INTEGER NOT NULL,
+    name         TEXT NOT NULL,
+    PRIMARY KEY (adapter_id, function_key)
+);
+CREATE TABLE IF NOT EXISTS mod_func (
+    adapter_id   INTEGER NOT NULL REFERENCES adapters(adapter_id),
+    mod_func_key INTEGER NOT NULL,
+    module_key   INTEGER NOT NULL,
+    function_key INTEGER NOT NULL,
+    PRIMARY KEY (adapter_id, mod_func_key)
+);
+CREATE TABLE IF NOT EXISTS pin_mod_func (
+    adapter_id       INTEGER NOT NULL REFERENCES adapters(adapter_id),
+    pin_mod_func_key INTEGER NOT NULL,
+    pin_key          INTEGER NOT NULL,
+    mod_func_key     INTEGER NOT NULL,
+    alt_index        INTEGER NOT NULL,
+    PRIMARY KEY (adapter_id, pin_mod_func_key)
+);
+CREATE INDEX IF NOT EXISTS pins_mcu_pin       ON pins (mcu_pin);
+CREATE INDEX IF NOT EXISTS modules_name       ON modules (name);
+CREATE INDEX IF NOT EXISTS mapping_mapped_key ON mapping (adapter_id, mapped_pinmodfunc_key);
+"""
+
+class SqliteBackend(FileBackend):
+    """Bundle backend which stores adapters in an SQLite database. One database file can be used as catalog for many adapters,
+    which are distinguished by their name. Writing a bundle only updates the mapping rows which changed since the last write,
+    in a single transaction, and records every write in the revisions table. The changed rows of every revision are kept in
+    the mapping_history table, so the mapping of any revision can be read back with readRevision."""
+    @staticmethod
+    def getFileEnding() -> str:
+        return '.sqlite'
+
+    @staticmethod
+    def hasBundleSupport() -> bool:
+        return True
+
+    @staticmethod
+    def _connect(filepath: pl.Path | str, create: bool = False) -> contextlib.closing:
+        """Open the catalog at filepath, the connection is closed when the returned context is left. Only writers create a
+        missing catalog, readers refuse it, so a mistyped path is not silently read as an empty catalog."""
+        if not create and not pl.Path(filepath).exists():
+            raise Exception("Bundle file {} does not exist.".format(filepath))
+        connection = sqlite3.connect(str(filepath))
+        connection.executescript(SQL_SCHEMA)
+        return contextlib.closing(connection)
+
+    @staticmethod
+    def _adapterId(connection: sqlite3.Connection, name: str, create: bool = False) -> int | None:
+        result = connection.execute("SELECT adapter_id FROM adapters WHERE name = ?", (name, )).fetchone()
+        if result is None and create:
+            return connection.execute("INSERT INTO adapters (name) VALUES (?)", (name, )).lastrowid
+        return None if result is None else result[0]
+
+    @staticmethod
+    def _optionsHash(options: PinOptions) -> str:
+        optionsHash = hashlib.sha1()
+        for table in [options.pins, options.modules, options.functions, options.modFunc, options.pinModFunc]:
+            optionsHash.update(pd.util.hash_pandas_object(table.astype(str), index=True).values.tobytes())
+        return optionsHash.hexdigest()
+
+    @staticmethod
+    def readBundle(filepath: pl.Path | str, name: str | None = None) -> tuple[pd.DataFrame, PinOptions, str]:
+        """Read mapping, options and notes of the adapter name, which defaults to the file name without ending."""
+        filepath = pl.Path(filepath)
+        name     = filepath.stem if name is None else name
+        with SqliteBackend._connect(filepath) as connection, connection:
+            adapterId = SqliteBackend._adapterId(connection, name)
+            if adapterId is None:
+                raise Exception("Adapter {} not found in {}.".format(name, filepath))
+            notes = connection.execute("SELECT notes FROM adapters WHERE adapter_id = ?", (adapterId, )).fetchone()[0]
+
+            sqlColumns = ", ".join(SQL_MAPPING_COLUMNS.values())
+            mapping    = pd.read_sql_query("SELECT {} FROM mapping WHERE adapter_id = ? ORDER BY idx".format(sqlColumns), connection, params=(adapterId, ))
+            mapping.columns = list(SQL_MAPPING_COLUMNS.keys())
+            if (mapping[MappingColumnLabels.CONNECTOR] == '').all():
+                mapping = mapping.drop(columns=[MappingColumnLabels.CONNECTOR])
+
+            def readTable(query: str, columns: list[str]) -> pd.DataFrame:
+                table = pd.read_sql_query(query, connection, params=(adapterId, ))
+                table.columns = columns
+                return table
+            options = PinOptions.fromKeyTables(
+                    pins       = readTable("SELECT board_pin, mcu_pin, comment FROM pins WHERE adapter_id = ? ORDER BY pin_key", [OptionsColumnLabels.BOARD_PIN, OptionsColumnLabels.MCU_PIN, OptionsColumnLabels.COMMENT]),
+                    modules    = readTable("SELECT name FROM modules WHERE adapter_id = ? ORDER BY module_key", ['names']),
+                    functions  = readTable("SELECT name FROM functions WHERE adapter_id = ? ORDER BY function_key", ['names']),
+                    modFunc    = readTable("SELECT module_key, function_key FROM mod_func WHERE adapter_id = ? ORDER BY mod_func_key", ['Module-Key', 'Function-Key']),
+                    pinModFunc = readTable("SELECT pin_key, mod_func_key, alt_index FROM pin_mod_func WHERE adapter_id = ? ORDER BY pin_mod_func_key", ['Pin-Key', 'ModFunc-Key', 'Alt-Index']),
+                )
+        return (mapping, options, notes)
+
+    @staticmethod
+    def writeBundle(filepath: pl.Path | str, mapping: pd.DataFrame, options: PinOptions, notes: str, name: str | None = None) -> None:
+        """Write mapping, options and notes of the adapter name, which defaults to the file name without ending. Only mapping rows
+        which differ from the stored ones are written and the option tables are only rewritten if the options changed."""
+        filepath = pl.Path(filepath)
+        name     = filepath.stem if name is None else name
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with SqliteBackend._connect(filepath, create=True) as connection, connection:
+            adapterId = SqliteBackend._adapterId(connection, name, create=True)
+            rows      = mapping.reset_index(drop=True)
+            if MappingColumnLabels.CONNECTOR not in rows.columns:
+                rows = rows.assign(**{MappingColumnLabels.CONNECTOR: ''})
+            rows = rows[list(SQL_MAPPING_COLUMNS.keys())]
+
+            stored = pd.read_sql_query("SELECT idx, {} FROM mapping WHERE adapter_id = ? ORDER BY idx".format(", ".join(SQL_MAPPING_COLUMNS.values())), connection, params=(adapterId, ))
+            stored = stored.set_index('idx')
+            stored.columns = list(SQL_MAPPING_COLUMNS.keys())
+            if len(stored) != len(rows) or not stored.index.equals(rows.index):
+                # The pin structure changed, replace all rows.
+                connection.execute("DELETE FROM mapping WHERE adapter_id = ?", (adapterId, ))
+                changedRows = rows
+            else:
+                changed     = (rows.astype(str).values != stored.astype(str).values).any(axis=1)
+                changedRows = rows[changed]
+            changedValues = [(int(idx), *SqliteBackend._sqlValues(row)) for idx, row in zip(changedRows.index, changedRows.itertuples(index=False))]
+            connection.executemany("INSERT OR REPLACE INTO mapping (adapter_id, idx, {}) VALUES (?, ?{})".format(", ".join(SQL_MAPPING_COLUMNS.values()), ", ?" * len(SQL_MAPPING_COLUMNS)),
+                                   [(adapterId, *values) for values in changedValues])
+
+            optionsHash = SqliteBackend._optionsHash(options)
+            if connection.execute("SELECT options_hash FROM adapters WHERE adapter_id = ?", (adapterId, )).fetchone()[0] != optionsHash:
+                SqliteBackend._writeOptions(connection, adapterId, options)
+            connection.execute("UPDATE adapters SET notes = ?, options_hash = ? WHERE adapter_id = ?", (notes, optionsHash, adapterId))
+            revisionId = connection.execute("INSERT INTO revisions (adapter_id, saved_at, changed_rows, mapping_rows) VALUES (?, ?, ?, ?)",
+                                            (adapterId, dt.datetime.now().isoformat(), len(changedRows), len(rows))).lastrowid
+            # A structural change writes all rows, so the latest history row of every pin up to a revision is its state.
+            connection.executemany("INSERT INTO mapping_history (revision_id, idx, {}) VALUES (?, ?{})".format(", ".join(SQL_MAPPING_COLUMNS.values()), ", ?" * len(SQL_MAPPING_COLUMNS)),
+                                   [(revisionId, *values) for values in changedValues])
+
+    @staticmethod
+    def _sqlValues(row: tuple) -> tuple:
+        return tuple(int(value) if hasattr(value, 'item') and isinstance(value.item(), int) else value for value in row)
+
+    @staticmethod
+    def _writeOptions(connection: sqlite3.Connection, adapterId: int, options: PinOptions) -> None:
+        for table in ['pins', 'modules', 'functions', 'mod_func', 'pin_mod_func']:
+            connection.execute("DELETE FROM {} WHERE adapter_id = ?".format(table), (adapterId, ))
+        pins = options.pins
+        comments = pins[OptionsColumnLabels.COMMENT] if OptionsColumnLabels.COMMENT in pins.columns else pd.Series('', index=pins.index)
+        connection.executemany("INSERT INTO pins VALUES (?, ?, ?, ?, ?)",
+                               [(adapterId, key, str(board), str(mcu), str(comment)) for key, (board, mcu, comment) in enumerate(zip(pins[OptionsColumnLabels.BOARD_PIN], pins[OptionsColumnLabels.MCU_PIN], comments))])
+        connection.executemany("INSERT INTO modules VALUES (?, ?, ?)",   [(adapterId, key, str(moduleName)) for key, moduleName in enumerate(options.modules['names'])])
+        connection.executemany("INSERT INTO functions VALUES (?, ?, ?)", [(adapterId, key, str(functionName)) for key, functionName in enumerate(options.functions['names'])])
+        connection.executemany("INSERT INTO mod_func VALUES (?, ?, ?, ?)",
+                               [(adapterId, key, int(moduleKey), int(functionKey)) for key, (moduleKey, functionKey) in enumerate(options.modFunc[['Module-Key', 'Function-Key']].values)])
+        pinModFunc = options.pinModFunc
+        altIndexes = pinModFunc['Alt-Index'] if 'Alt-Index' in pinModFunc.columns else pinModFunc.groupby('Pin-Key').cumcount()
+        connection.executemany("INSERT INTO pin_mod_func VALUES (?, ?, ?, ?, ?)",
+                               [(adapterId, key, int(pinKey), int(modFuncKey), int(altIdx)) for key, (pinKey, modFuncKey, altIdx) in enumerate(zip(pinModFunc['Pin-Key'], pinModFunc['ModFunc-Key'], altIndexes))])
+
+    @staticmethod
+    def listAdapters(filepath: pl.Path | str) -> pd.DataFrame:
+        """Return name and number of stored revisions of all adapters in the catalog."""
+        with SqliteBackend._connect(filepath) as connection, connection:
+            adapters = pd.read_sql_query("SELECT a.name AS Name, COUNT(r.saved_at) AS Revisions, MAX(r.saved_at) AS 'Last-Saved' FROM adapters a "
+                                         "LEFT JOIN revisions r ON r.adapter_id = a.adapter_id GROUP BY a.adapter_id ORDER BY a.name", connection)
+        return adapters
+
+    @staticmethod
+    def findAdaptersUsingMcuPin(filepath: pl.Path | str, mcuPin: str) -> pd.DataFrame:
+        """Return all adapters in the catalog which map the MCU pin, with the baseboard pin and the mapped module and function."""
+        query = ("SELECT a.name AS Adapter, m.pin_column AS 'Column', m.pin_row AS 'Row', m.signal AS Signal, mo.name AS Module, fu.name AS Function "
+                 "FROM pins p "
+                 "JOIN pin_mod_func pmf ON pmf.adapter_id = p.adapter_id AND pmf.pin_key = p.pin_key "
+                 "JOIN mapping m ON m.adapter_id = p.adapter_id AND m.mapped_pinmodfunc_key = pmf.pin_mod_func_key "
+                 "JOIN mod_func mf ON mf.adapter_id = p.adapter_id AND mf.mod_func_key = pmf.mod_func_key "
+                 "JOIN modules mo ON mo.adapter_id = p.adapter_id AND mo.module_key = mf.module_key "
+                 "JOIN functions fu ON fu.adapter_id = p.adapter_id AND fu.function_key = mf.function_key "
+                 "JOIN adapters a ON a.adapter_id = p.adapter_id "
+                 "WHERE p.mcu_pin = ? ORDER BY a.name, m.idx")
+        with SqliteBackend._connect(filepath) as connection, connection:
+            adapters = pd.read_sql_query(query, connection, params=(mcuPin, ))
+        return adapters
+
+    @staticmethod
+    def history(filepath: pl.Path | str, name: str) -> pd.DataFrame:
+        """Return the write history of one adapter, the Revision-Id can be passed to readRevision."""
+        with SqliteBackend._connect(filepath) as connection, connection:
+            revisions = pd.read_sql_query("SELECT r.revision_id AS 'Revision-Id', r.saved_at AS 'Saved-At', r.changed_rows AS 'Changed-Rows' FROM revisions r "
+                                          "JOIN adapters a ON a.adapter_id = r.adapter_id WHERE a.name = ? ORDER BY r.revision_id", connection, params=(name, ))
+        return revisions
+
+    @staticmethod
+    def readRevision(filepath: pl.Path | str, name: str, revisionId: int | None = None) -> pd.DataFrame:
+        """Return the mapping of the adapter name as it was written by the revision revisionId, which defaults to the latest
+        revision, see history. The mappings of several revisions can be compared with diffRevisions."""
+        filepath = pl.Path(filepath)
+        with SqliteBackend._connect(filepath) as connection, connection:
+            adapterId = SqliteBackend._adapterId(connection, name)
+            if adapterId is None:
+                raise Exception("Adapter {} not found in {}.".format(name, filepath))
+            if revisionId is None:
+                revision = connection.execute("SELECT revision_id, mapping_rows FROM revisions WHERE adapter_id = ? ORDER BY revision_id DESC LIMIT 1", (adapterId, )).fetchone()
+            else:
+                revision = connection.execute("SELECT revision_id, mapping_rows FROM revisions WHERE adapter_id = ? AND revision_id = ?", (adapterId, int(revisionId))).fetchone()
+            if revision is None:
+                raise Exception("Revision {} of adapter {} not found in {}.".format(revisionId, name, filepath))
+            (revisionId, mappingRows) = revision
+            history = pd.read_sql_query("SELECT h.idx, {} FROM mapping_history h JOIN revisions r ON r.revision_id = h.revision_id "
+                                        "WHERE r.adapter_id = ? AND h.revision_id <= ? AND h.idx < ? ORDER BY h.revision_id".format(", ".join('h.' + column for column in SQL_MAPPING_COLUMNS.values())),
+                                        connection, params=(adapterId, revisionId, mappingRows))
+        mapping = history.drop_duplicates('idx', keep='last').sort_values('idx')
+        if len(mapping) != mappingRows:
+            raise Exception("The history of revision {} of adapter {} is incomplete.".format(revisionId, name))
+        mapping = mapping.drop(columns=['idx']).reset_index(drop=True)
+        mapping.columns = list(SQL_MAPPING_COLUMNS.keys())
+        if (mapping[MappingColumnLabels.CONNECTOR] == '').all():
+            mapping = mapping.drop(columns=[MappingColumnLabels.CONNECTOR])
+        return mapping
@@ -0,0 +1,175 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import json
+import pathlib as pl
+import xml.etree.ElementTree as ET
+
+from pinmap.pinoptions import PinOptions, PinOptionsBuilder
+from pinmap.filebackend.base import FileBackend
+
+JSON_READ_CHUNK_SIZE = 1 << 16
+
+class JsonStreamStates():
+    __slots__ = ()
+    START            = 'start'
+    MEMBER_KEY       = 'member-key'
+    MEMBER_SEPARATOR = 'member-separator'
+    MEMBER_VALUE     = 'member-value'
+    PINS_START       = 'pins-start'
+    PINS             = 'pins'
+
+class VendorBackend(FileBackend):
+    """Options backend for vendor pin-mux databases exported as XML, JSON or JSON lines. The files are parsed incrementally,
+    pin by pin, directly into the key tables of PinOptions, so the wide options table is never built and memory stays flat
+    independent of the file size.
+
+    XML files contain one element per pin with its alternatives as child elements:
+
+        <pin board="X0_1" mcu="PIN3_22">
+            <alt index="0" module="GPIO" function="PIO1_22"/>
+            <alt index="1" module="CM8"  function="RTS_SCL_CSEL1"/>
+        </pin>
+
+    JSON files contain an array of pin objects, either at the top level or as member >pins< of the top level object. JSON
+    lines files (.jsonl, .ndjson) contain one pin object per line:
+
+        {"board": "X0_1", "mcu": "PIN3_22", "alternatives": [{"index": 0, "module": "GPIO", "function": "PIO1_22"}]}
+
+    The element, attribute and key names can be adapted by subclassing.
+    """
+    PIN_TAG           = 'pin'
+    ALTERNATIVE_TAG   = 'alt'
+    BOARD_PIN_KEY     = 'board'
+    MCU_PIN_KEY       = 'mcu'
+    COMMENT_KEY       = 'comment'
+    ALTERNATIVES_KEY  = 'alternatives'
+    ALT_INDEX_KEY     = 'index'
+    MODULE_KEY        = 'module'
+    FUNCTION_KEY      = 'function'
+    JSON_PINS_KEY     = 'pins'
+
+    @staticmethod
+    def getDataFileEnding() -> str:
+        return '.xml'
+
+    @classmethod
+    def readOptionsfile(cls, filepath: pl.Path | str) -> PinOptions:
+        """Stream-parse a vendor pin-mux file into a PinOptions object, the format is selected by the file ending."""
+        filepath = pl.Path(filepath)
+        builder  = PinOptionsBuilder()
+        if filepath.suffix.lower() == '.xml':
+            pinRecords = cls._iterXmlPins(filepath)
+        elif filepath.suffix.lower() in ['.jsonl', '.ndjson']:
+            pinRecords = cls._iterJsonLinesPins(filepath)
+        elif filepath.suffix.lower() == '.json':
+            pinRecords = cls._iterJsonPins(filepath)
+        else:
+            raise Exception("Unsupported vendor options file type: " + filepath.suffix)
+        for pinRecord in pinRecords:
+            cls._addPinRecord(builder, pinRecord)
+        return builder.build()
+
+    @classmethod
+    def _addPinRecord(cls, builder: PinOptionsBuilder, pinRecord: dict) -> None:
+        alternatives = []
+        for position, alternative in enumerate(pinRecord.get(cls.ALTERNATIVES_KEY, [])):
+            alternatives.append((alternative.get(cls.ALT_INDEX_KEY, position), alternative.get(cls.MODULE_KEY, ''), alternative.get(cls.FUNCTION_KEY, '')))
+        builder.addPin(pinRecord.get(cls.BOARD_PIN_KEY, ''), pinRecord.get(cls.MCU_PIN_KEY, ''), alternatives, pinRecord.get(cls.COMMENT_KEY, ''))
+
+    @classmethod
+    def _iterXmlPins(cls, filepath: pl.Path):
+        root = None
+        for event, element in ET.iterparse(filepath, events=('start', 'end')):
+            if root is None:
+                root = element
+            if event != 'end' or element.tag != cls.PIN_TAG:
+                continue
+            pinRecord = dict(element.attrib)
+            pinRecord[cls.ALTERNATIVES_KEY] = [dict(alternative.attrib) for alternative in element.iter(cls.ALTERNATIVE_TAG)]
+            yield pinRecord
+            # Drop the parsed pin, otherwise the tree below the root keeps growing.
+            element.clear()
+            root.clear()
+
+    @classmethod
+    def _iterJsonLinesPins(cls, filepath: pl.Path):
+        with open(filepath, 'r', encoding='utf-8') as jsonFile:
+            for line in jsonFile:
+                if len(line.strip()) > 0:
+                    yield json.loads(line)
+
+    @classmethod
+    def _iterJsonPins(cls, filepath: pl.Path):
+        """Yield the objects of the pin array one by one, while only keeping one read chunk and one object in memory. The pin
+        array is either the top level value or the member JSON_PINS_KEY of the top level object, other members of the top
+        level object are decoded and skipped."""
+        decoder = json.JSONDecoder()
+        with open(filepath, 'r', encoding='utf-8') as jsonFile:
+            buffer    = ''
+            position  = 0
+            endOfFile = False
+            state     = JsonStreamStates.START
+            while True:
+                # Skip whitespace and separators, read more data if the buffer is exhausted.
+                while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                    position += 1
+                if position >= len(buffer):
+                    if endOfFile:
+                        if state != JsonStreamStates.START:
+                            raise Exception("Unexpected end of JSON file: " + str(filepath))
+                        return
+                    chunk     = jsonFile.read(JSON_READ_CHUNK_SIZE)
+                    endOfFile = len(chunk) == 0
+                    buffer    = buffer[position:] + chunk
+                    position  = 0
+                    continue
+                char = buffer[position]
+                if state == JsonStreamStates.START:
+                    if char == '[':
+                        state = JsonStreamStates.PINS
+                    elif char == '{':
+                        state = JsonStreamStates.MEMBER_KEY
+                    else:
+                        raise Exception("The JSON file neither contains a pin array nor an object: " + str(filepath))
+                    position += 1
+                    continue
+                if state == JsonStreamStates.MEMBER_SEPARATOR:
+                    if char != ':':
+                        raise Exception("Invalid object member in JSON file: " + str(filepath))
+                    state     = JsonStreamStates.PINS_START if memberKey == cls.JSON_PINS_KEY else JsonStreamStates.MEMBER_VALUE
+                    position += 1
+                    continue
+                if state == JsonStreamStates.PINS_START:
+                    if char != '[':
+                        raise Exception("Member {} of the JSON file is not an array: {}".format(cls.JSON_PINS_KEY, filepath))
+                    state     = JsonStreamStates.PINS
+                    position += 1
+                    continue
+                if (state == JsonStreamStates.MEMBER_KEY and char == '}') or (state == JsonStreamStates.PINS and char == ']'):
+                    return
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    value, end = None, None
+                if end is None or (end == len(buffer) and not endOfFile):
+                    # The value might be cut off by the end of the chunk, e.g. a number, it is decoded again with more data.
+                    if endOfFile:
+                        raise Exception("Invalid JSON value in file: " + str(filepath))
+                    chunk     = jsonFile.read(JSON_READ_CHUNK_SIZE)
+                    endOfFile = len(chunk) == 0
+                    buffer    = buffer[position:] + chunk
+                    position  = 0
+                    continue
+                position = end
+                if state == JsonStreamStates.MEMBER_KEY:
+                    if not isinstance(value, str):
+                        raise Exception("Invalid object member in JSON file: " + str(filepath))
+                    memberKey = value
+                    state     = JsonStreamStates.MEMBER_SEPARATOR
+                elif state == JsonStreamStates.MEMBER_VALUE:
+                    state = JsonStreamStates.MEMBER_KEY
+                else:
+                    yield value
@@ -0,0 +1,151 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import threading
+import pandas as pd
+
+from pinmap.adapter import Adapter
+from pinmap.helper import PinCell
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.autosave import JOURNAL_STATE_COLUMNS
+from pinmap.diff import MappingDiff, mergeMappings
+from pinmap.listeners import MappingListeners
+
+class AdapterFork(Adapter):
+    """Copy-on-write child of an Adapter without frontend. The fork shares the PinOptions, the derived indexes and the
+    static columns of the mapping table with its parent, only the columns holding the assignment are copied. Changes are
+    made with updateMapping, compared with diff and either applied to the parent with mergeBack or dropped with discard.
+    Forks can be forked again. A fork without label has the name of its parent and serves as snapshot for exports. The
+    PinCells and buses of a fork are only created when it is first edited."""
+
+    def __init__(self, parentAdapter: Adapter, label: str | None) -> None:
+        super(Adapter, self).__init__(**parentAdapter._initkwargs)
+        self.baseboard     = parentAdapter.baseboard
+        self.mcuboard      = parentAdapter.mcuboard
+        self._revision     = parentAdapter.revision
+        self.parentAdapter = parentAdapter
+        self.label         = label
+        self.mappingLock       = threading.RLock()
+        self.mappingListeners  = MappingListeners(self)
+        self.forks             = []
+        self.conflictIndex     = parentAdapter.conflictIndex
+        with parentAdapter.mappingLock:
+            self._options = parentAdapter.options
+            # The shallow copy shares the data of all columns, the assignment columns are then replaced by own copies.
+            self._mapping = parentAdapter.mapping.copy(deep=False)
+            for column in JOURNAL_STATE_COLUMNS:
+                self._mapping[column] = parentAdapter.mapping[column].copy()
+            self._forkBase = parentAdapter.mapping[JOURNAL_STATE_COLUMNS].copy()
+            self._notes    = parentAdapter.notes
+            for attribute in ['_layout', '_optionLabels', '_searchIndex', '_compatibility', '_edbColVals', '_edbRowVals']:
+                if hasattr(parentAdapter, attribute):
+                    setattr(self, attribute, getattr(parentAdapter, attribute))
+        # The PinCells are only created once they are needed, e.g. not for a snapshot of an export or the report preview.
+        self._frontendPending = True
+
+    def _ensureFrontendElements(self) -> None:
+        """Create the PinCells and buses from the mapping of the fork, a fork has no widgets and no selector options to fill."""
+        if self.frontendGenerated:
+            return
+        with self.mappingLock:
+            if self.frontendGenerated:
+                return
+            self._generatePinCells()
+            self._frontendPending = False
+            self._refreshBusModuleKeys()
+
+    @property
+    def name(self) -> str:
+        if self.label is None:
+            return self.parentAdapter.name
+        return self.parentAdapter.name + '_' + self.label
+
+    @property
+    def notes(self) -> str:
+        return self._notes
+
+    @notes.setter
+    def notes(self, value: str) -> str:
+        self._notes = value
+
+    def _generateFrontendElements(self) -> None:
+        self._generatePinCells()
+
+    def enqueueSelectorChange(self, pinSelector: PinCell) -> None:
+        """A fork has no update loop, changes are applied immediately."""
+        self.processSelectorChange(pinSelector)
+
+    def enqueueFrontendTask(self, function: callable) -> None:
+        """A fork has no update loop, tasks are run immediately."""
+        function()
+
+    def enqueueSelectorRefresh(self, mappingIdxs: list[int]) -> None:
+        pass
+
+    def _removeExportedAutosave(self) -> None:
+        """A fork without label is the snapshot of an export of its parent and has the same export paths, so the autosave
+        files of the parent are removed unless its autosave is running."""
+        if self.label is None:
+            self.parentAdapter._removeExportedAutosave()
+        else:
+            super()._removeExportedAutosave()
+
+    def updateFrontend(self, startingPinSelector: PinCell) -> None:
+        pass
+
+    def selectorOptions(self, mappingIdx: int) -> tuple[str]:
+        """Return the options which can currently be assigned to the pin at mappingIdx, starting with the empty option."""
+        return self._computeSelectorOptions(mappingIdx, self.mapping.iloc[mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC])[0]
+
+    def updateMapping(self, mappingIdx: int, value: str) -> None:
+        """Assign a pin-module-function-combination to the pin at mappingIdx, value is its label as in optionLabels, with or
+        without conflict tag, or an empty string to clear the pin. The conflict tag is resolved like the PinSelector does."""
+        pinCell = self.pinCells[mappingIdx]
+        value   = self._removeSharedPrefixFromSelectorValue(value)
+        if value == '':
+            pinCell.value = ''
+        else:
+            matchingOptions = [option for option in self.selectorOptions(mappingIdx) if option != '' and self._removeSharedPrefixFromSelectorValue(option) == value]
+            if len(matchingOptions) == 0:
+                raise Exception("{} is not an option of pin {}.".format(value, pinCell.fullLabel))
+            pinCell.value = matchingOptions[0]
+        self.processSelectorChange(pinCell)
+
+    @property
+    def changes(self) -> MappingDiff:
+        """Changes of this fork compared to the parent at fork time."""
+        baseMapping = self.mapping.copy()
+        baseMapping[JOURNAL_STATE_COLUMNS] = self._forkBase
+        return MappingDiff(baseMapping, self.mapping)
+
+    def mergeBack(self) -> pd.DataFrame:
+        """Apply the changes of this fork to the parent with a three-way merge against the parent state at fork time. Pins
+        which were changed by both are kept as in the parent and returned as conflicts, see mergeMappings. The fork stays
+        usable, further merges only apply changes made afterwards."""
+        parentAdapter = self.parentAdapter
+        with self.mappingLock, parentAdapter.mappingLock:
+            baseMapping = self.mapping.copy()
+            baseMapping[JOURNAL_STATE_COLUMNS] = self._forkBase
+            with parentAdapter.mappingListeners.change():
+                (merged, conflicts) = mergeMappings(baseMapping, parentAdapter.mapping, self.mapping)
+                for column in JOURNAL_STATE_COLUMNS:
+                    parentAdapter.mapping[column] = merged[column].values
+                if parentAdapter.frontendGenerated:
+                    parentAdapter._refreshBusModuleKeys()
+            self._forkBase = self.mapping[JOURNAL_STATE_COLUMNS].copy()
+        if parentAdapter.frontendGenerated:
+            # The widgets of the parent are only changed by its update loop, a lazy parent creates them from the mapping.
+            parentAdapter.enqueueFrontendTask(lambda: parentAdapter.updateFrontend(parentAdapter._firstPinSelector()))
+        return conflicts
+
+    def discard(self) -> None:
+        """Drop this fork, it is removed from the forks of the parent and must not be used anymore."""
+        if self in self.parentAdapter.forks:
+            self.parentAdapter.forks.remove(self)
+        for child in list(self.forks):
+            child.discard()
+        del self._mapping
+        self.pinCells = []
+        self.buses    = {}
@@ -5,16 +5,20 @@
 
 import ipywidgets as widgets
 
-class PinSelector(widgets.Dropdown):
-    """Element consisting of a ipywidget.Label and ipywidget.Dropdown which allows to select the MCU-Pin
-    which should be mapped to a EDB-Pin."""
-    def __init__(self, *args, **kwargs):
-        super(PinSelector, self).__init__(*args, **kwargs)
+class PinSelectorBase(object):
+    """Properties shared by all widgets which allow to select the MCU-Pin which should be mapped to a EDB-Pin."""
+    # Typed text narrows the options instead of selecting one, see pinmap.combobox.PinComboSelector.
+    typeAhead = False
+
+    def _initPinSelector(self, **kwargs):
         self._mappingIdx = kwargs.get('mappingIdx')
         self._parent     = kwargs.get('parent')
         self._previous   = kwargs.get('previous', None)
         self._next       = kwargs.get('next', None)
         self.fullLabel   = kwargs.get('fullLabel')
+        self.optionsHash = None
+        self.menuOptions = ('',)
+        self.allowedKeys = None
 
     @property
     def mappingIdx(self) -> int:
@@ -52,6 +56,54 @@ class PinSelector(widgets.Dropdown):
     def fullLabel(self, value: str) -> None:
         self._fullLabel = value
 
+    @property
+    def optionsHash(self) -> int | None:
+        """Hash of the options which were last sent to the frontend, None if no options were set by the Adapter yet."""
+        return getattr(self, '_optionsHash', None)
+
+    @optionsHash.setter
+    def optionsHash(self, value: int | None) -> None:
+        self._optionsHash = value
+
+    @property
+    def menuOptions(self) -> tuple[str]:
+        """All options computed by the Adapter, including the empty option."""
+        return getattr(self, '_menuOptions', ('',))
+
+    @menuOptions.setter
+    def menuOptions(self, value: tuple[str]) -> None:
+        self._menuOptions = value
+
+    @property
+    def allowedKeys(self) -> object:
+        """The pinModFunc keys of menuOptions without the empty option, in the same order."""
+        return getattr(self, '_allowedKeys', None)
+
+    @allowedKeys.setter
+    def allowedKeys(self, value: object) -> None:
+        self._allowedKeys = value
+
+class PinSelector(PinSelectorBase, widgets.Dropdown):
+    """Element consisting of a ipywidget.Label and ipywidget.Dropdown which allows to select the MCU-Pin
+    which should be mapped to a EDB-Pin."""
+    def __init__(self, *args, **kwargs):
+        super(PinSelector, self).__init__(*args, **kwargs)
+        self._initPinSelector(**kwargs)
+
+class PinCell(PinSelectorBase):
+    """Headless stand-in for a PinSelector which represents one cell of the mapping datagrid. It holds the value and options
+    of the pin without creating a widget, the datagrid frontend edits it with one shared PinSelector."""
+    def __init__(self, *args, **kwargs):
+        self.value   = kwargs.get('value', '')
+        self.options = ('',)
+        self._initPinSelector(**kwargs)
+
+    def observe(self, *args, **kwargs) -> None:
+        pass
+
+    def unobserve(self, *args, **kwargs) -> None:
+        pass
+
 class ClearButton(widgets.Button):
     """Element consisting of a ipywidget.Label and ipywidget.Dropdown which allows to select the MCU-Pin
     which should be mapped to a EDB-Pin."""
@@ -0,0 +1,98 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+
+class LayoutPage(object):
+    """One page of a paginated pin-grid, holding only the populated pins of one connector."""
+    def __init__(self, connector: str, pageColumn: int, pageRow: int, entries: pd.DataFrame) -> None:
+        self.connector  = connector
+        self.pageColumn = pageColumn
+        self.pageRow    = pageRow
+        self.entries    = entries
+
+    @property
+    def numTables(self) -> int:
+        """Number of pin-grid columns on this page, i.e. the number of tables."""
+        return int(self.entries['Table-Index'].max()) + 1
+
+    @property
+    def numTableRows(self) -> int:
+        """Number of pin-grid rows on this page, i.e. the number of rows of each table without header."""
+        return int(self.entries['Table-Row'].max()) + 1
+
+class PinGridLayout(object):
+    def __init__(self, mapping: pd.DataFrame) -> None:
+        """Build the layout index of a mapping table. The pins are grouped by connector, each connector has its own grid spanned
+        by the Column and Row values which are actually populated on it. The coordinates of every pin are stored as a sparse
+        map from mapping index to (connector, grid column, grid row).
+
+        Parameters
+        ----------
+        mapping : Mapping table as in Adapter.mapping, the Connector column is optional. Without it, all pins belong to one connector.
+        """
+        if MappingColumnLabels.CONNECTOR in mapping.columns:
+            connectorValues = mapping[MappingColumnLabels.CONNECTOR].astype(str).values
+        else:
+            connectorValues = np.full(len(mapping), '', dtype=object)
+        self.connectors  = pd.unique(connectorValues).tolist()
+        self.columnVals  = {}
+        self.rowVals     = {}
+        gridColumns      = np.zeros(len(mapping), dtype=int)
+        gridRows         = np.zeros(len(mapping), dtype=int)
+        columnValues     = mapping[MappingColumnLabels.PINGRID_COLUMN].values
+        rowValues        = mapping[MappingColumnLabels.PINGRID_ROW].values
+        for connector in self.connectors:
+            members = connectorValues == connector
+            self.columnVals[connector] = np.sort(pd.unique(columnValues[members]))
+            self.rowVals[connector]    = np.sort(pd.unique(rowValues[members]))
+            gridColumns[members] = np.searchsorted(self.columnVals[connector], columnValues[members])
+            gridRows[members]    = np.searchsorted(self.rowVals[connector], rowValues[members])
+        self.coordinates = pd.DataFrame({
+                MappingColumnLabels.CONNECTOR: connectorValues,
+                'Grid-Column': gridColumns,
+                'Grid-Row':    gridRows,
+            }, index=mapping.index)
+
+    def connectorShape(self, connector: str) -> tuple[int, int]:
+        """Return the shape (rows, columns) of the populated grid of one connector."""
+        return (len(self.rowVals[connector]), len(self.columnVals[connector]))
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Return the shape (rows, columns) of all connector grids stacked below each other."""
+        shapes = [self.connectorShape(connector) for connector in self.connectors]
+        return (sum(shape[0] for shape in shapes), max([shape[1] for shape in shapes], default=0))
+
+    def position(self, mappingIdx: int) -> tuple[str, int, int]:
+        """Return (connector, grid row, grid column) of a pin."""
+        coordinate = self.coordinates.loc[mappingIdx]
+        return (coordinate[MappingColumnLabels.CONNECTOR], int(coordinate['Grid-Row']), int(coordinate['Grid-Column']))
+
+    def connectorMembers(self, connector: str) -> pd.DataFrame:
+        """Return the coordinates of all pins of one connector."""
+        return self.coordinates[self.coordinates[MappingColumnLabels.CONNECTOR] == connector]
+
+    def paginate(self, numColsPerPage: int, numRowsPerPage: int) -> list[LayoutPage]:
+        """Split every connector grid into pages of at most numColsPerPage grid columns and numRowsPerPage grid rows. Pages
+        without any populated pin are skipped. The pages are ordered by connector, then column-wise.
+
+        Each page holds a table indexed by mapping index with the Table-Index, i.e. the grid column on the page, and
+        the Table-Row, i.e. the grid row on the page."""
+        coordinates = self.coordinates.assign(**{
+                'Page-Column': self.coordinates['Grid-Column'] // numColsPerPage,
+                'Page-Row':    self.coordinates['Grid-Row']    // numRowsPerPage,
+                'Table-Index': self.coordinates['Grid-Column'] %  numColsPerPage,
+                'Table-Row':   self.coordinates['Grid-Row']    %  numRowsPerPage,
+            })
+        connectorOrder = {connector: order for order, connector in enumerate(self.connectors)}
+        coordinates = coordinates.assign(**{'Connector-Order': coordinates[MappingColumnLabels.CONNECTOR].map(connectorOrder)})
+        pages = []
+        for (_, pageColumn, pageRow), entries in coordinates.groupby(['Connector-Order', 'Page-Column', 'Page-Row'], sort=True):
+            pages.append(LayoutPage(entries[MappingColumnLabels.CONNECTOR].iloc[0], int(pageColumn), int(pageRow), entries[['Table-Index', 'Table-Row']]))
+        return pages
@@ -0,0 +1,56 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import contextlib
+import pandas as pd
+
+from pinmap.autosave import JOURNAL_STATE_COLUMNS
+
+class MappingListeners(object):
+    def __init__(self, adapter: object) -> None:
+        """Functions listener(adapter, previous, current) which are called after every change of the mapping of adapter.
+        previous and current hold the MAPPED_PINMODFUNC, MAPPED_PINMODFUNC_KEY and PRIMARY columns of the changed rows
+        before and after the change, indexed by the mapping index.
+
+        Parameters
+        ----------
+        adapter : Adapter whose mapping changes are reported.
+        """
+        self.adapter    = adapter
+        self._listeners = []
+
+    def __len__(self) -> int:
+        return len(self._listeners)
+
+    def add(self, listener: callable) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove(self, listener: callable) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @contextlib.contextmanager
+    def change(self):
+        """Report the changes which the enclosed block makes to the mapping to all listeners, the block has to hold the
+        mappingLock of the adapter. Nothing is compared if there is no listener."""
+        stateBefore = self.adapter.mapping[JOURNAL_STATE_COLUMNS].copy() if len(self._listeners) > 0 else None
+        yield
+        if stateBefore is not None:
+            self._notify(stateBefore)
+
+    def _notify(self, stateBefore: pd.DataFrame) -> None:
+        """Compare the mapping state with stateBefore and pass the changed rows to all listeners."""
+        stateAfter = self.adapter.mapping[JOURNAL_STATE_COLUMNS]
+        if not stateBefore.index.equals(stateAfter.index):
+            # The pins were reloaded, added pins have no previous state.
+            stateBefore = stateBefore.reindex(stateAfter.index)
+        changed = (stateBefore != stateAfter).any(axis=1)
+        if not changed.any():
+            return
+        previous = stateBefore[changed]
+        current  = stateAfter[changed].copy()
+        for listener in list(self._listeners):
+            listener(self.adapter, previous, current)
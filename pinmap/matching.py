@@ -0,0 +1,110 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pandas as pd
+
+from pinmap.helper import PinCell
+from pinmap.filebackend import MappingColumnLabels
+
+def matchPins(candidates: dict, pinKeys: np.ndarray, modFuncKeys: np.ndarray) -> dict:
+    """Assign every member one of its candidate pin-module-function-combinations, so that no MCU pin and no
+    module-function-combination is used twice. The assignment is a bipartite matching between members and MCU pins, found
+    with augmenting paths (Kuhn's algorithm), candidates are tried in the given order. The module-function-combination is
+    a second resource which is reserved by the member before a path is augmented, so it is never shared.
+
+    Parameters
+    ----------
+    candidates  : Dictionary of member to list of candidate pinModFunc keys, in order of preference.
+    pinKeys     : Pin-Key of every pinModFunc key.
+    modFuncKeys : ModFunc-Key of every pinModFunc key.
+
+    Returns a dictionary of member to pinModFunc key for all members which could be matched.
+    """
+    pinOwners     = {}  # Pin-Key -> (member, pinModFunc key)
+    modFuncOwners = {}  # ModFunc-Key -> member
+
+    def augment(member: object, visitedPins: set) -> bool:
+        for pinModFuncKey in candidates[member]:
+            pinKey     = pinKeys[pinModFuncKey]
+            modFuncKey = modFuncKeys[pinModFuncKey]
+            if pinKey in visitedPins or modFuncOwners.get(modFuncKey, member) != member:
+                continue
+            visitedPins.add(pinKey)
+            owner = pinOwners.get(pinKey)
+            # Reserve the module-function-combination before displacing the owner, so the owner cannot move onto it.
+            reserved = modFuncKey not in modFuncOwners
+            modFuncOwners[modFuncKey] = member
+            if owner is None or augment(owner[0], visitedPins):
+                for ownedKey, ownedMember in list(modFuncOwners.items()):
+                    if ownedMember == member and ownedKey != modFuncKey:
+                        del modFuncOwners[ownedKey]
+                pinOwners[pinKey] = (member, pinModFuncKey)
+                return True
+            if reserved:
+                del modFuncOwners[modFuncKey]
+        return False
+
+    for member in candidates:
+        augment(member, set())
+    return {member: pinModFuncKey for (member, pinModFuncKey) in pinOwners.values()}
+
+def assignBus(adapter: object, bus: str, moduleKey: int | str) -> pd.Series:
+    """Map all members of a bus to one module in a single operation. Members already assigned to the module keep their
+    assignment, members assigned to another module are cleared. Like in the frontend, a module can only be used by one
+    bus. The remaining members are matched against the functions of the module, which have to fit their Regex-Function,
+    using MCU pins and module-function-combinations which are not used anywhere else, see matchPins. The mapping
+    listeners of the adapter are informed and one refresh of its frontend is queued.
+
+    Parameters
+    ----------
+    adapter   : Adapter whose bus is assigned.
+    bus       : Name of the bus as in the Bus column.
+    moduleKey : Key or name of the module.
+
+    Returns the assigned option labels indexed by mapping index, members which could not be matched have an empty label.
+    """
+    if bus == '' or bus not in adapter.buses:
+        raise Exception("Unknown bus: " + str(bus))
+    if isinstance(moduleKey, str):
+        matchingModules = adapter.options.modules.index[adapter.options.modules.names == moduleKey]
+        if len(matchingModules) == 0:
+            raise Exception("Unknown module: " + moduleKey)
+        moduleKey = matchingModules[0]
+    for otherBus in adapter.buses:
+        if otherBus != '' and otherBus != bus and adapter.buses[otherBus]['Module-Key'] == moduleKey:
+            raise Exception("Module {} is already used by bus {}.".format(moduleKey, otherBus))
+    pinModFunc    = adapter.options.pinModFunc
+    pinKeys       = pinModFunc['Pin-Key'].values.astype(int)
+    modFuncKeys   = pinModFunc['ModFunc-Key'].values.astype(int)
+    moduleKeys    = adapter.options.modFunc['Module-Key'].values.astype(int)
+    memberIdxs    = [member.mappingIdx for member in adapter.buses[bus]['Members']]
+
+    with adapter.mappingLock, adapter.mappingListeners.change():
+        mappedKeys  = adapter.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int)
+        for mappingIdx in memberIdxs:
+            if mappedKeys[mappingIdx] != -1 and moduleKeys[modFuncKeys[mappedKeys[mappingIdx]]] != moduleKey:
+                # Clearing with a PinCell takes care of the primary usage like clearing a PinSelector does.
+                adapter.selectorChangeUpdateMapping(PinCell(mappingIdx=mappingIdx, parent=adapter))
+        mappedKeys   = adapter.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int)
+        usedKeys     = mappedKeys[mappedKeys != -1]
+        freeMembers  = [mappingIdx for mappingIdx in memberIdxs if mappedKeys[mappingIdx] == -1]
+        moduleOption = (moduleKeys[modFuncKeys] == moduleKey) & ~np.isin(pinKeys, pinKeys[usedKeys]) & ~np.isin(modFuncKeys, modFuncKeys[usedKeys])
+        candidates   = {}
+        for mappingIdx in freeMembers:
+            fittingKeys = adapter.compatibility.pinModFuncKeys(mappingIdx)
+            candidates[mappingIdx] = fittingKeys[moduleOption[fittingKeys]].tolist()
+        matches = matchPins(candidates, pinKeys, modFuncKeys)
+
+        for mappingIdx, pinModFuncKey in matches.items():
+            adapter.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC]     = adapter.optionLabels[pinModFuncKey]
+            adapter.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = pinModFuncKey
+            adapter.mapping.loc[mappingIdx, MappingColumnLabels.PRIMARY]               = 'x'
+        adapter._refreshBusModuleKeys()
+        assigned = adapter.mapping.loc[memberIdxs, MappingColumnLabels.MAPPED_PINMODFUNC].copy()
+    firstMember = adapter.buses[bus]['Members'][0]
+    # The widgets are only changed by the update loop of the adapter.
+    adapter.enqueueFrontendTask(lambda: adapter.updateFrontend(firstMember))
+    return assigned
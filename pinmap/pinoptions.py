@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import re
 import pandas as pd
 from pinmap import StandardStrings as PMTSTR
 from pinmap.filebackend import OptionsColumnLabels
@@ -34,7 +35,7 @@ class PinOptions(object):
         self.modules   = pd.DataFrame(pd.concat([self.initTable[columnname] for columnname in self.initTable.filter(regex=r'ALT\d+-Module').columns], ignore_index=True).unique(), columns=['names'])
         self.functions = pd.DataFrame(pd.concat([self.initTable[columnname] for columnname in self.initTable.filter(regex=r'ALT\d+-Function').columns], ignore_index=True).unique(), columns=['names'])
         self.modFunc   = pd.DataFrame(columns=['Module-Key', 'Function-Key'])
-        self.pinModFunc = pd.DataFrame(columns=['Pin-Key', 'ModFunc-Key'])
+        self.pinModFunc = pd.DataFrame(columns=['Pin-Key', 'ModFunc-Key', 'Alt-Index'])
 
         # Remove empty, N/C or N/A modules and functions
         listRemovable = ['', PMTSTR.NOT_AVAILABLE, PMTSTR.NOT_CONNECTED]
@@ -58,4 +59,84 @@ class PinOptions(object):
                 else:
                     idx = self.modFunc.shape[0]
                     self.modFunc.loc[idx] = [moduleIdx, functionIdx]
-                self.pinModFunc.loc[self.pinModFunc.shape[0]] = [rowIdx, idx]
+                self.pinModFunc.loc[self.pinModFunc.shape[0]] = [rowIdx, idx, int(re.match(r'ALT(\d+)', altModule).group(1))]
+
+    @classmethod
+    def fromKeyTables(cls, pins: pd.DataFrame, modules: pd.DataFrame, functions: pd.DataFrame, modFunc: pd.DataFrame, pinModFunc: pd.DataFrame) -> object:
+        """Create a PinOptions object directly from its key tables, e.g. built by the PinOptionsBuilder. The wide initTable is
+        only derived from the key tables if it is accessed."""
+        options = cls.__new__(cls)
+        options.pins       = pins
+        options.modules    = modules
+        options.functions  = functions
+        options.modFunc    = modFunc
+        options.pinModFunc = pinModFunc
+        return options
+
+    @property
+    def initTable(self) -> pd.DataFrame:
+        """Options in the wide format of the options file, see __init__."""
+        if not hasattr(self, '_initTable'):
+            self._initTable = self._generateInitTable()
+        return self._initTable
+
+    @initTable.setter
+    def initTable(self, value: pd.DataFrame) -> None:
+        self._initTable = value
+
+    def _generateInitTable(self) -> pd.DataFrame:
+        """Derive the wide options table from the key tables."""
+        pinModFunc = self.pinModFunc.astype(int)
+        if 'Alt-Index' not in pinModFunc.columns:
+            pinModFunc = pinModFunc.assign(**{'Alt-Index': pinModFunc.groupby('Pin-Key').cumcount()})
+        modFuncKeys = pinModFunc['ModFunc-Key'].values
+        alternatives = pd.DataFrame({
+                'Pin-Key':   pinModFunc['Pin-Key'].values,
+                'Alt-Index': pinModFunc['Alt-Index'].values,
+                'Module':    self.modules['names'].values[self.modFunc['Module-Key'].values.astype(int)[modFuncKeys]],
+                'Function':  self.functions['names'].values[self.modFunc['Function-Key'].values.astype(int)[modFuncKeys]],
+            })
+        wideTable = alternatives.pivot(index='Pin-Key', columns='Alt-Index', values=['Module', 'Function'])
+        numAlternatives = int(pinModFunc['Alt-Index'].max()) + 1 if len(pinModFunc) > 0 else 0
+        initTable = self.pins[[OptionsColumnLabels.BOARD_PIN, OptionsColumnLabels.MCU_PIN]].copy()
+        for altIdx in range(numAlternatives):
+            for part in ['Module', 'Function']:
+                column = wideTable[(part, altIdx)] if (part, altIdx) in wideTable.columns else pd.Series(dtype=str)
+                initTable['ALT{}-{}'.format(altIdx, part)] = column.reindex(initTable.index).fillna('').values
+        if OptionsColumnLabels.COMMENT in self.pins.columns and (self.pins[OptionsColumnLabels.COMMENT] != '').any():
+            initTable[OptionsColumnLabels.COMMENT] = self.pins[OptionsColumnLabels.COMMENT].values
+        return initTable.astype(str)
+
+class PinOptionsBuilder(object):
+    """Build the key tables of a PinOptions object pin by pin, without the wide options table. Modules, functions and
+    module-function-combinations are interned on first use, so memory only grows with the number of distinct entries."""
+    def __init__(self) -> None:
+        self._pins          = []
+        self._moduleKeys    = {}
+        self._functionKeys  = {}
+        self._modFuncKeys   = {}
+        self._pinModFunc    = []
+        self._listRemovable = ['', PMTSTR.NOT_AVAILABLE, PMTSTR.NOT_CONNECTED]
+
+    def addPin(self, boardPin: str, mcuPin: str, alternatives: list[tuple[int, str, str]], comment: str = '') -> None:
+        """Add a pin with its function alternatives, given as (alternative index, module, function)."""
+        pinKey = len(self._pins)
+        self._pins.append((str(boardPin), str(mcuPin), str(comment)))
+        for (altIdx, module, function) in alternatives:
+            module   = str(module).strip()
+            function = str(function).strip()
+            if module in self._listRemovable or function in self._listRemovable:
+                continue
+            moduleKey   = self._moduleKeys.setdefault(module, len(self._moduleKeys))
+            functionKey = self._functionKeys.setdefault(function, len(self._functionKeys))
+            modFuncKey  = self._modFuncKeys.setdefault((moduleKey, functionKey), len(self._modFuncKeys))
+            self._pinModFunc.append((pinKey, modFuncKey, int(altIdx)))
+
+    def build(self) -> PinOptions:
+        return PinOptions.fromKeyTables(
+                pins       = pd.DataFrame(self._pins, columns=[OptionsColumnLabels.BOARD_PIN, OptionsColumnLabels.MCU_PIN, OptionsColumnLabels.COMMENT]),
+                modules    = pd.DataFrame(list(self._moduleKeys.keys()), columns=['names']),
+                functions  = pd.DataFrame(list(self._functionKeys.keys()), columns=['names']),
+                modFunc    = pd.DataFrame(list(self._modFuncKeys.keys()), columns=['Module-Key', 'Function-Key']),
+                pinModFunc = pd.DataFrame(self._pinModFunc, columns=['Pin-Key', 'ModFunc-Key', 'Alt-Index']),
+            )
@@ -0,0 +1,62 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import threading
+import ipywidgets as widgets
+
+from pinmap.filebackend.html import HtmlBackend
+
+class ReportPreview(object):
+    def __init__(self, adapter: object) -> None:
+        """Report of an adapter rendered by the HtmlBackend. The preview follows the changes of the mapping and the notes,
+        it is rendered again from a snapshot on a background thread once nothing changed for guiPreviewDelay seconds and
+        shown by the update loop of the adapter.
+
+        Parameters
+        ----------
+        adapter : Adapter whose report is shown.
+        """
+        self.adapter     = adapter
+        self.frontEnd    = widgets.HTML(value=HtmlBackend.renderReport(adapter.snapshot(), standalone=False))
+        self._lock       = threading.Lock()
+        self._timer      = None
+        self._generation = 0
+        self._closed     = False
+        adapter.mappingListeners.add(self._schedule)
+        adapter.noteBox.observe(self._schedule, names='value', type='change')
+
+    def close(self) -> None:
+        """Stop following the adapter, a pending rendering is cancelled. Closing again has no effect."""
+        if self._closed:
+            return
+        self._closed = True
+        self.adapter.mappingListeners.remove(self._schedule)
+        self.adapter.noteBox.unobserve(self._schedule, names='value', type='change')
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _schedule(self, *args) -> None:
+        """Restart the delay of the next rendering. Called with the mapping lock held, so nothing is rendered here."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._generation += 1
+            self._timer = threading.Timer(self.adapter.guiPreviewDelay, self._render, args=(self._generation, ))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _render(self, generation: int) -> None:
+        html = HtmlBackend.renderReport(self.adapter.snapshot(), standalone=False)
+        self.adapter.enqueueFrontendTask(lambda: self._show(generation, html))
+
+    def _show(self, generation: int, html: str) -> None:
+        # A rendering which took longer than a later one must not overwrite it.
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._timer = None
+        self.frontEnd.value = html
@@ -0,0 +1,139 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pandas as pd
+
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.filebackend import OptionsColumnLabels
+from pinmap.validation import ValidationRules, validateMapping
+from pinmap.diff import pinKeyColumns, recomputePrimaries
+
+RELOAD_STATE_COLUMNS     = [MappingColumnLabels.MAPPED_PINMODFUNC, MappingColumnLabels.MAPPED_PINMODFUNC_KEY, MappingColumnLabels.PRIMARY]
+RELOAD_STRUCTURE_COLUMNS = [MappingColumnLabels.CONNECTOR, MappingColumnLabels.PINGRID_COLUMN, MappingColumnLabels.PINGRID_ROW,
+                            MappingColumnLabels.BUS, MappingColumnLabels.SIGNAL, MappingColumnLabels.STATUS]
+OPTION_KEY_COLUMNS       = [OptionsColumnLabels.BOARD_PIN, OptionsColumnLabels.MCU_PIN, 'Module', 'Function']
+
+class ReloadReasons():
+    __slots__ = ()
+    OPTION_REMOVED = 'option-removed'
+    PIN_REMOVED    = 'pin-removed'
+    REGEX_MODULE   = ValidationRules.REGEX_MODULE
+    REGEX_FUNCTION = ValidationRules.REGEX_FUNCTION
+
+class ReloadReport(object):
+    def __init__(self, invalid: pd.DataFrame, addedPins: pd.DataFrame, removedPins: pd.DataFrame, structureChanged: bool) -> None:
+        """Result of remapping a mapping onto reloaded base files.
+
+        Parameters
+        ----------
+        invalid          : Assignments which became invalid with the reason. Assignments whose pin or option was removed are
+                           dropped, assignments which violate the new regexes are kept.
+        addedPins        : Pins which only exist in the new mapping file.
+        removedPins      : Pins which only existed in the old mapping file.
+        structureChanged : True if pins were added, removed, reordered or their labels changed, i.e. the frontend has to be rebuilt.
+        """
+        self.invalid          = invalid
+        self.addedPins        = addedPins
+        self.removedPins      = removedPins
+        self.structureChanged = structureChanged
+
+    def summary(self) -> dict:
+        summary = {'addedPins': len(self.addedPins), 'removedPins': len(self.removedPins), 'structureChanged': self.structureChanged}
+        summary.update(self.invalid.groupby('Reason').size().to_dict())
+        return summary
+
+def optionKeyTable(options: PinOptions) -> pd.DataFrame:
+    """Return the Board-Pin, MCU-Pin, Module and Function names of every pinModFunc key, i.e. the representation of the
+    keys which does not depend on the order of the options file."""
+    pinKeys     = options.pinModFunc['Pin-Key'].values.astype(int)
+    modFuncKeys = options.pinModFunc['ModFunc-Key'].values.astype(int)
+    return pd.DataFrame({
+            OptionsColumnLabels.BOARD_PIN: options.pins[OptionsColumnLabels.BOARD_PIN].astype(str).values[pinKeys],
+            OptionsColumnLabels.MCU_PIN:   options.pins[OptionsColumnLabels.MCU_PIN].astype(str).values[pinKeys],
+            'Module':                      options.modules['names'].astype(str).values[options.modFunc['Module-Key'].values.astype(int)[modFuncKeys]],
+            'Function':                    options.functions['names'].astype(str).values[options.modFunc['Function-Key'].values.astype(int)[modFuncKeys]],
+        })
+
+def _invalidRows(mapping: pd.DataFrame, reason: str) -> pd.DataFrame:
+    invalid = pd.DataFrame({
+            MappingColumnLabels.PINGRID_COLUMN: mapping[MappingColumnLabels.PINGRID_COLUMN].values,
+            MappingColumnLabels.PINGRID_ROW:    mapping[MappingColumnLabels.PINGRID_ROW].values,
+            MappingColumnLabels.SIGNAL:         mapping[MappingColumnLabels.SIGNAL].values,
+            'Assignment':                       mapping[MappingColumnLabels.MAPPED_PINMODFUNC].astype(str).str.split('>> ').str[-1].values,
+            'Reason':                           reason,
+        })
+    if MappingColumnLabels.CONNECTOR in mapping.columns:
+        invalid.insert(0, MappingColumnLabels.CONNECTOR, mapping[MappingColumnLabels.CONNECTOR].values)
+    return invalid
+
+def remapMapping(oldMapping: pd.DataFrame, oldOptions: PinOptions, newMapping: pd.DataFrame, newOptions: PinOptions, newOptionLabels: list[str]) -> tuple[pd.DataFrame, ReloadReport]:
+    """Carry the assignments of oldMapping over to newMapping, e.g. after the base files were edited. Pins are aligned by
+    (Connector,) Column and Row, pinModFunc keys by the names of board pin, MCU pin, module and function, so the keys are
+    remapped even if the options file was reordered.
+
+    Parameters
+    ----------
+    oldMapping      : Mapping table with the current assignments.
+    oldOptions      : PinOptions the keys of oldMapping refer to.
+    newMapping      : Mapping table read from the edited mapping file.
+    newOptions      : PinOptions read from the edited options file.
+    newOptionLabels : Selector label of every pinModFunc key of newOptions, see Adapter.optionLabels.
+
+    Returns the new mapping table with the carried assignments and a ReloadReport.
+    """
+    rowKeys    = pinKeyColumns(oldMapping, newMapping)
+    oldMapping = oldMapping.reset_index(drop=True)
+    newMapping = newMapping.reset_index(drop=True)
+    invalid    = []
+
+    # Translate the old keys into the new key space.
+    oldKeys     = oldMapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int)
+    oldAssigned = oldKeys != -1
+    newKeyTable = optionKeyTable(newOptions).reset_index().rename(columns={'index': 'New-Key'})
+    oldNames    = optionKeyTable(oldOptions).iloc[oldKeys[oldAssigned]].reset_index(drop=True)
+    remapped    = oldNames.merge(newKeyTable.drop_duplicates(OPTION_KEY_COLUMNS), on=OPTION_KEY_COLUMNS, how='left')['New-Key'].fillna(-1).astype(int).values
+    newKeys     = np.full(len(oldMapping), -1, dtype=int)
+    newKeys[oldAssigned] = remapped
+    optionRemoved = oldAssigned & (newKeys == -1)
+    invalid.append(_invalidRows(oldMapping[optionRemoved], ReloadReasons.OPTION_REMOVED))
+
+    # Align the pins of both mapping tables.
+    oldState = oldMapping[rowKeys].assign(**{
+            'Old-Key':                             newKeys,
+            MappingColumnLabels.MAPPED_PINMODFUNC: oldMapping[MappingColumnLabels.MAPPED_PINMODFUNC].values,
+            MappingColumnLabels.PRIMARY:           oldMapping[MappingColumnLabels.PRIMARY].values,
+        })
+    aligned  = newMapping[rowKeys].merge(oldState.drop_duplicates(rowKeys), on=rowKeys, how='left', indicator=True)
+    carried  = (aligned['_merge'] == 'both').values & (aligned['Old-Key'].fillna(-1).values.astype(int) != -1)
+    removed  = oldMapping[rowKeys].merge(newMapping[rowKeys].drop_duplicates(), on=rowKeys, how='left', indicator=True)['_merge'].values == 'left_only'
+    invalid.append(_invalidRows(oldMapping[removed & oldAssigned & ~optionRemoved], ReloadReasons.PIN_REMOVED))
+
+    mapping      = newMapping.copy()
+    carriedKeys  = aligned['Old-Key'].values[carried].astype(int)
+    labels       = np.full(len(mapping), '', dtype=object)
+    prefixes     = aligned[MappingColumnLabels.MAPPED_PINMODFUNC].values[carried].astype(str)
+    labels[carried] = [label[:label.rfind('>> ') + 3] if '>> ' in label else '' for label in prefixes]
+    labels[carried] = labels[carried] + np.asarray([newOptionLabels[key] for key in carriedKeys], dtype=object)
+    mapping[MappingColumnLabels.MAPPED_PINMODFUNC]     = labels
+    mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = np.where(carried, aligned['Old-Key'].fillna(-1).values, -1).astype(int)
+    mapping[MappingColumnLabels.PRIMARY]               = np.where(carried, aligned[MappingColumnLabels.PRIMARY].fillna('').values, '')
+    recomputePrimaries(mapping)
+
+    # Carried assignments which do not fit the edited regexes are kept, but reported.
+    violations = validateMapping(mapping, newOptions).issues
+    violations = violations[violations['Rule'].isin([ReloadReasons.REGEX_MODULE, ReloadReasons.REGEX_FUNCTION])]
+    violationKeys = pinKeyColumns(mapping)
+    violations    = violations[violationKeys + ['Rule']].merge(mapping, on=violationKeys)
+    for rule in [ReloadReasons.REGEX_MODULE, ReloadReasons.REGEX_FUNCTION]:
+        invalid.append(_invalidRows(violations[violations['Rule'] == rule], rule))
+
+    structureColumns = [column for column in RELOAD_STRUCTURE_COLUMNS if column in oldMapping.columns or column in newMapping.columns]
+    structureChanged = (len(oldMapping) != len(newMapping)) or any(column not in oldMapping.columns or column not in newMapping.columns for column in structureColumns) \
+                       or not oldMapping[structureColumns].astype(str).equals(newMapping[structureColumns].astype(str))
+    addedPins   = newMapping.loc[(aligned['_merge'] == 'left_only').values, rowKeys]
+    removedPins = oldMapping.loc[removed, rowKeys]
+    return mapping, ReloadReport(pd.concat(invalid, ignore_index=True), addedPins, removedPins, structureChanged)
@@ -0,0 +1,348 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import re
+import time
+import pathlib as pl
+import numpy as np
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+
+REPLAY_EVENT_COLUMNS = ['Mapping-Index', 'PinModFunc-Key']
+REPLAY_TIME_COLUMNS  = ['Options', 'Update', 'Check']
+
+SYNTHETIC_MODULES = {
+    'GPIO': None,
+    'UART': ['TXD', 'RXD', 'RTS', 'CTS'],
+    'SPI':  ['SCK', 'MOSI', 'MISO', 'CS0', 'CS1'],
+    'I2C':  ['SCL', 'SDA'],
+    'PWM':  ['OUT0', 'OUT1', 'OUT2', 'OUT3'],
+}
+
+def writeSyntheticBoards(directory: pl.Path | str, numPins: int = 200, numMcuPins: int = 120, numInstances: int = 4, numAlternatives: int = 8,
+                         busSize: int = 4, busShare: float = 0.5, seed: int = 0) -> tuple[pl.Path, pl.Path]:
+    """Write a random mapping file and options file in the raw format, e.g. to replay random events against boards of any
+    size. Every MCU pin gets numAlternatives random module-function-combinations of numInstances instances of GPIO, UART,
+    SPI, I2C and PWM modules. busShare of the baseboard pins are grouped into buses of busSize pins.
+
+    Returns the paths of the mapping file and the options file.
+    """
+    rng       = np.random.default_rng(seed)
+    directory = pl.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    options = {'Board-Pin': [], 'MCU-Pin': []}
+    for alternative in range(numAlternatives):
+        options['ALT{}-Module'.format(alternative)]   = []
+        options['ALT{}-Function'.format(alternative)] = []
+    for pin in range(numMcuPins):
+        (port, portPin) = divmod(pin, 32)
+        options['Board-Pin'].append("X{}_{}".format(port, portPin))
+        options['MCU-Pin'].append("P{}_{}".format(port, portPin))
+        pinModFuncs = set()
+        for alternative in range(numAlternatives):
+            # A module-function-combination is offered at most once per pin, like on real MCUs.
+            while True:
+                module = rng.choice(list(SYNTHETIC_MODULES))
+                if SYNTHETIC_MODULES[module] is None:
+                    (moduleName, functionName) = (module, "PIO{}_{}".format(port, portPin))
+                else:
+                    (moduleName, functionName) = ("{}{}".format(module, rng.integers(numInstances)), str(rng.choice(SYNTHETIC_MODULES[module])))
+                if (moduleName, functionName) not in pinModFuncs:
+                    pinModFuncs.add((moduleName, functionName))
+                    break
+            options['ALT{}-Module'.format(alternative)].append(moduleName)
+            options['ALT{}-Function'.format(alternative)].append(functionName)
+    optionsFile = directory.joinpath('synthetic_mcuboard.csv')
+    pd.DataFrame(options).to_csv(optionsFile, index=False)
+
+    busModules = [module for module in SYNTHETIC_MODULES if SYNTHETIC_MODULES[module] is not None]
+    mapping    = []
+    busCount   = 0
+    pin        = 0
+    while pin < numPins:
+        if rng.random() < busShare:
+            module = rng.choice(busModules)
+            for function in SYNTHETIC_MODULES[module][:busSize]:
+                if pin < numPins:
+                    mapping.append((pin, "BUS{}".format(busCount), "{}{}_{}".format(module, busCount, function), module, function))
+                    pin += 1
+            busCount += 1
+        else:
+            module = '|'.join(rng.choice(list(SYNTHETIC_MODULES), size=2, replace=False))
+            mapping.append((pin, '', "SIG{}".format(pin), module, ''))
+            pin += 1
+    mappingFile = directory.joinpath('synthetic_baseboard.csv')
+    pd.DataFrame({
+            MappingColumnLabels.PINGRID_COLUMN: [chr(ord('A') + int(pin // 100) % 26) for (pin, _, _, _, _) in mapping],
+            MappingColumnLabels.PINGRID_ROW:    [pin % 100 + 1 for (pin, _, _, _, _) in mapping],
+            MappingColumnLabels.BUS:            [bus for (_, bus, _, _, _) in mapping],
+            MappingColumnLabels.SIGNAL:         [signal for (_, _, signal, _, _) in mapping],
+            MappingColumnLabels.STATUS:         ['Open' if rng.random() < 0.2 else 'Closed' for _ in mapping],
+            MappingColumnLabels.REGEX_MODULE:   [module for (_, _, _, module, _) in mapping],
+            MappingColumnLabels.REGEX_FUNCTION: [function for (_, _, _, _, function) in mapping],
+        }).to_csv(mappingFile, index=False)
+    return (mappingFile, optionsFile)
+
+def writeEvents(filepath: pl.Path | str, events: list[tuple[int, int]]) -> None:
+    pd.DataFrame(events, columns=REPLAY_EVENT_COLUMNS).to_csv(filepath, index=False)
+
+def readEvents(filepath: pl.Path | str) -> list[tuple[int, int]]:
+    events = pd.read_csv(filepath)
+    return [(int(mappingIdx), int(pinModFuncKey)) for (mappingIdx, pinModFuncKey) in events[REPLAY_EVENT_COLUMNS].values]
+
+class EventRecorder(object):
+    def __init__(self, adapter: object) -> None:
+        """Record the changes of the PinSelectors of adapter as (mapping index, pinModFunc key) events, -1 clears the pin.
+        The events are independent of the conflict tags shown in the selectors and can be replayed with replayEvents."""
+        self.adapter = adapter
+        self.events  = []
+        self._processSelectorChange = adapter.processSelectorChange
+        adapter.processSelectorChange = self._recordSelectorChange
+
+    def _recordSelectorChange(self, pinSelector: object) -> None:
+        self._processSelectorChange(pinSelector)
+        pinModFuncKey = self.adapter.mapping.iloc[pinSelector.mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC_KEY]
+        self.events.append((int(pinSelector.mappingIdx), int(pinModFuncKey)))
+
+    def stop(self) -> list[tuple[int, int]]:
+        """Stop recording and return the recorded events."""
+        if 'processSelectorChange' in self.adapter.__dict__:
+            del self.adapter.processSelectorChange
+        return self.events
+
+    def save(self, filepath: pl.Path | str) -> None:
+        writeEvents(filepath, self.events)
+
+class ReferenceModel(object):
+    def __init__(self, adapter: object) -> None:
+        """Straightforward model of the mapping state of adapter, which only tracks the assigned pinModFunc keys. The expected
+        Primary flags, conflict tags, bus modules and options are derived from scratch from these keys with plain loops and
+        group-bys, independent of the history of the changes. It serves as oracle for the incremental updates of
+        selectorChangeUpdateMapping, _updatePrimary and _updateBusModuleKey and for the options computed by
+        _computeSelectorOptions."""
+        options           = adapter.options
+        self.pinKeys      = options.pinModFunc['Pin-Key'].values.astype(int).tolist()
+        self.modFuncKeys  = options.pinModFunc['ModFunc-Key'].values.astype(int).tolist()
+        self.moduleKeys   = options.modFunc['Module-Key'].values.astype(int).tolist()
+        self.functionKeys = options.modFunc['Function-Key'].values.astype(int).tolist()
+        self.optionLabels = adapter.optionLabels
+        self.pinBuses     = adapter.mapping[MappingColumnLabels.BUS].tolist()
+        self.gridLabels   = [str(column) + str(row) for column, row in zip(adapter.mapping[MappingColumnLabels.PINGRID_COLUMN], adapter.mapping[MappingColumnLabels.PINGRID_ROW])]
+        # The regexes do not depend on the state, their matches are only evaluated once.
+        moduleNames    = options.modules['names'].tolist()
+        functionNames  = options.functions['names'].tolist()
+        self.regexModules   = [{moduleKey for moduleKey, name in enumerate(moduleNames) if isinstance(name, str) and re.search(regex, name)}
+                               for regex in adapter.mapping[MappingColumnLabels.REGEX_MODULE]]
+        self.regexFunctions = [{functionKey for functionKey, name in enumerate(functionNames) if isinstance(name, str) and re.search(regex, name)}
+                               for regex in adapter.mapping[MappingColumnLabels.REGEX_FUNCTION]]
+        self.busMembers   = {bus: [member.mappingIdx for member in adapter.buses[bus]['Members']] for bus in adapter.buses if bus != ''}
+        self.keys         = adapter.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int).tolist()
+        # Conflicts with other adapters sharing the options are owned by the ConflictIndex, which is not modelled.
+        if adapter.conflictIndex is not None:
+            self._otherAdapterTag = lambda pinKey, modFuncKey: adapter.conflictIndex.conflictTag(adapter, pinKey, modFuncKey)
+        else:
+            self._otherAdapterTag = lambda pinKey, modFuncKey: ''
+
+    def apply(self, mappingIdx: int, pinModFuncKey: int) -> None:
+        self.keys[mappingIdx] = pinModFuncKey
+
+    def primaryViolation(self, primary: list[bool]) -> tuple[int, bool, bool] | None:
+        """Check the Primary flags against the assignments. Every MCU pin and module-function-combination has at most one
+        primary pin and every assigned pin whose MCU pin and module-function-combination are not used by a primary pin is
+        primary. Returns (mapping index, expected, actual) of the first violation or None."""
+        assigned = pd.DataFrame({'PinModFunc-Key': self.keys, 'Primary': primary})
+        unassignedPrimaries = assigned.index[(assigned['PinModFunc-Key'] == -1) & assigned['Primary']]
+        if len(unassignedPrimaries) > 0:
+            return (int(unassignedPrimaries[0]), False, True)
+        assigned = assigned[assigned['PinModFunc-Key'] != -1].copy()
+        assigned['Pin-Key']     = [self.pinKeys[pinModFuncKey] for pinModFuncKey in assigned['PinModFunc-Key']]
+        assigned['ModFunc-Key'] = [self.modFuncKeys[pinModFuncKey] for pinModFuncKey in assigned['PinModFunc-Key']]
+        primaries = assigned[assigned['Primary']]
+        for groupColumn in ['Pin-Key', 'ModFunc-Key']:
+            sharedPrimaries = primaries.index[primaries.groupby(groupColumn).cumcount() > 0]
+            if len(sharedPrimaries) > 0:
+                return (int(sharedPrimaries[0]), False, True)
+        unclaimed = assigned.index[~assigned['Primary'] & ~assigned['Pin-Key'].isin(primaries['Pin-Key']) & ~assigned['ModFunc-Key'].isin(primaries['ModFunc-Key'])]
+        if len(unclaimed) > 0:
+            return (int(unclaimed[0]), True, False)
+        return None
+
+    def busModuleKeys(self) -> dict[str, int]:
+        busModuleKeys = {}
+        for bus, members in self.busMembers.items():
+            assigned = [self.keys[mappingIdx] for mappingIdx in members if self.keys[mappingIdx] != -1]
+            busModuleKeys[bus] = self.moduleKeys[self.modFuncKeys[assigned[0]]] if len(assigned) > 0 else -1
+        return busModuleKeys
+
+    def allowedKeys(self, mappingIdx: int, busModuleKeys: dict[str, int]) -> set[int]:
+        bus = self.pinBuses[mappingIdx]
+        if bus != '' and busModuleKeys[bus] >= 0:
+            allowedModules = {busModuleKeys[bus]}
+        else:
+            allowedModules = set(self.regexModules[mappingIdx])
+            if bus != '':
+                allowedModules -= set(busModuleKeys.values())
+        allowedFunctions = self.regexFunctions[mappingIdx]
+        return {pinModFuncKey for pinModFuncKey, modFuncKey in enumerate(self.modFuncKeys)
+                if self.moduleKeys[modFuncKey] in allowedModules and self.functionKeys[modFuncKey] in allowedFunctions}
+
+    def conflictTag(self, mappingIdx: int, pinModFuncKey: int, primary: list[bool]) -> str:
+        """Conflict tag of the option pinModFuncKey in the PinSelector of mappingIdx. The option is tagged with the first
+        primary pin using its MCU pin, or else its module-function-combination. A primary pin does not conflict with the
+        MCU pin and module-function-combination it uses itself."""
+        ownKey = self.keys[mappingIdx] if primary[mappingIdx] else -1
+        for (specifier, groupKeys) in [("Pin", self.pinKeys), ("Func", self.modFuncKeys)]:
+            groupKey = groupKeys[pinModFuncKey]
+            if ownKey != -1 and groupKeys[ownKey] == groupKey:
+                continue
+            for otherIdx, otherKey in enumerate(self.keys):
+                if otherIdx != mappingIdx and otherKey != -1 and primary[otherIdx] and groupKeys[otherKey] == groupKey:
+                    strBus = '@' + self.pinBuses[otherIdx] if self.pinBuses[otherIdx] != '' else ''
+                    return "{}>{}{}>> ".format(specifier, self.gridLabels[otherIdx], strBus)
+        return self._otherAdapterTag(self.pinKeys[pinModFuncKey], self.modFuncKeys[pinModFuncKey])
+
+    def selectorOptions(self, mappingIdx: int, busModuleKeys: dict[str, int], primary: list[bool]) -> dict[int, str]:
+        """Expected options of the PinSelector of mappingIdx including their conflict tags, indexed by the pinModFunc key."""
+        return {pinModFuncKey: self.conflictTag(mappingIdx, pinModFuncKey, primary) + self.optionLabels[pinModFuncKey]
+                for pinModFuncKey in self.allowedKeys(mappingIdx, busModuleKeys)}
+
+class ReplayDivergence(object):
+    def __init__(self, step: int, event: tuple[int, int], kind: str, location: object, expected: object, actual: object) -> None:
+        """First difference between the incremental state and the ReferenceModel, kind is the compared quantity, e.g.
+        Primary, and location the mapping index or bus."""
+        self.step     = step
+        self.event    = event
+        self.kind     = kind
+        self.location = location
+        self.expected = expected
+        self.actual   = actual
+
+    def __repr__(self) -> str:
+        return "Step {} {}: {} of {} is {}, expected {}".format(self.step, self.event, self.kind, self.location, self.actual, self.expected)
+
+class ReplayResult(object):
+    def __init__(self, events: list[tuple[int, int]], stepTimes: pd.DataFrame, divergence: ReplayDivergence | None) -> None:
+        """Result of replayEvents, stepTimes holds the time in seconds of every replayed step, split into computing the options
+        of the changed pin, updating the mapping and checking against the reference."""
+        self.events     = events
+        self.stepTimes  = stepTimes
+        self.divergence = divergence
+
+    @property
+    def consistent(self) -> bool:
+        return self.divergence is None
+
+    def summary(self) -> dict:
+        summary = {'steps': len(self.stepTimes), 'consistent': self.consistent}
+        for column in REPLAY_TIME_COLUMNS:
+            summary[column + ' total'] = float(self.stepTimes[column].sum())
+            summary[column + ' max']   = float(self.stepTimes[column].max()) if len(self.stepTimes) > 0 else 0.0
+        return summary
+
+def _findDivergence(adapter: object, reference: ReferenceModel, checkOptions: bool) -> tuple | None:
+    mapping = adapter.mapping
+    keys    = mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int)
+    primary = (mapping[MappingColumnLabels.PRIMARY] != '').values.tolist()
+    labels  = mapping[MappingColumnLabels.MAPPED_PINMODFUNC].values
+    for idx in range(len(mapping)):
+        if keys[idx] != reference.keys[idx]:
+            return (MappingColumnLabels.MAPPED_PINMODFUNC_KEY, idx, reference.keys[idx], keys[idx])
+        expectedLabel = '' if keys[idx] == -1 else reference.optionLabels[keys[idx]]
+        # Primary pins are shown without conflict tag, the tag of a shared pin is checked with the options.
+        if (labels[idx] if primary[idx] else adapter._removeSharedPrefixFromSelectorValue(labels[idx])) != expectedLabel:
+            return (MappingColumnLabels.MAPPED_PINMODFUNC, idx, expectedLabel, labels[idx])
+    violation = reference.primaryViolation(primary)
+    if violation is not None:
+        return (MappingColumnLabels.PRIMARY, *violation)
+    busModuleKeys = reference.busModuleKeys()
+    for bus, moduleKey in busModuleKeys.items():
+        if adapter.buses[bus]['Module-Key'] != moduleKey:
+            return ('Module-Key', bus, moduleKey, adapter.buses[bus]['Module-Key'])
+    if checkOptions:
+        for idx in range(len(mapping)):
+            (menuOptions, allowedKeys) = adapter._computeSelectorOptions(idx, labels[idx])
+            options         = dict(zip(allowedKeys.tolist(), menuOptions[1:]))
+            expectedOptions = reference.selectorOptions(idx, busModuleKeys, primary)
+            if options.keys() != expectedOptions.keys():
+                return ('Options', idx, sorted(expectedOptions.keys() - options.keys()), sorted(options.keys() - expectedOptions.keys()))
+            for pinModFuncKey, option in options.items():
+                if option != expectedOptions[pinModFuncKey]:
+                    return ('Conflict-Tag', idx, expectedOptions[pinModFuncKey], option)
+    return None
+
+def _applyEvent(adapter: object, mappingIdx: int, pinModFuncKey: int) -> tuple[float, float]:
+    """Set the PinCell of mappingIdx to the option with pinModFuncKey like a user would and return the time needed to
+    compute the options and to update the mapping."""
+    pinCell = adapter.pinCells[mappingIdx]
+    start   = time.perf_counter()
+    if pinModFuncKey == -1:
+        value = ''
+    else:
+        (menuOptions, allowedKeys) = adapter._computeSelectorOptions(mappingIdx, adapter.mapping.iloc[mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC])
+        positions = np.flatnonzero(allowedKeys == pinModFuncKey)
+        if len(positions) == 0:
+            raise Exception("PinModFunc key {} is not an option of pin {}.".format(pinModFuncKey, pinCell.fullLabel))
+        value = menuOptions[positions[0] + 1]
+    optionsTime = time.perf_counter() - start
+    pinCell.value = value
+    start = time.perf_counter()
+    adapter.processSelectorChange(pinCell)
+    return (optionsTime, time.perf_counter() - start)
+
+def randomEvents(adapter: object, count: int, seed: int = 0, clearShare: float = 0.2) -> list[tuple[int, int]]:
+    """Generate count random events against the current state of adapter, which is not changed. Every event either assigns
+    one of the options of a random pin or, with probability clearShare, clears a random assigned pin."""
+    rng  = np.random.default_rng(seed)
+    fork = adapter.fork('random')
+    events = []
+    try:
+        while len(events) < count:
+            assigned = np.flatnonzero(fork.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values != -1)
+            if len(assigned) > 0 and rng.random() < clearShare:
+                event = (int(rng.choice(assigned)), -1)
+            else:
+                mappingIdx  = int(rng.integers(len(fork.mapping)))
+                allowedKeys = fork._computeSelectorOptions(mappingIdx, fork.mapping.iloc[mappingIdx][MappingColumnLabels.MAPPED_PINMODFUNC])[1]
+                if len(allowedKeys) == 0:
+                    continue
+                event = (mappingIdx, int(rng.choice(allowedKeys)))
+            _applyEvent(fork, *event)
+            events.append(event)
+    finally:
+        fork.discard()
+    return events
+
+def replayEvents(adapter: object, events: list[tuple[int, int]], optionsCheckInterval: int = 0, stopOnDivergence: bool = True) -> ReplayResult:
+    """Replay events headlessly on a fork of adapter at full speed and compare the incremental state with the ReferenceModel
+    after every step. The adapter itself is not changed.
+
+    Parameters
+    ----------
+    adapter              : Adapter whose current state is the starting point of the replay.
+    events               : List of (mapping index, pinModFunc key) events, e.g. recorded by an EventRecorder or generated by randomEvents.
+    optionsCheckInterval : Also compare the options of every pin with a from-scratch computation after every n-th step, which
+                           is slow on large boards. Defaults to 0, i.e. the options are not checked.
+    stopOnDivergence     : Stop at the first divergence, defaults to True.
+    """
+    fork       = adapter.fork('replay')
+    reference  = ReferenceModel(fork)
+    stepTimes  = []
+    divergence = None
+    try:
+        for step, (mappingIdx, pinModFuncKey) in enumerate(events):
+            (optionsTime, updateTime) = _applyEvent(fork, mappingIdx, pinModFuncKey)
+            start = time.perf_counter()
+            reference.apply(mappingIdx, pinModFuncKey)
+            found = _findDivergence(fork, reference, optionsCheckInterval > 0 and (step + 1) % optionsCheckInterval == 0)
+            stepTimes.append((optionsTime, updateTime, time.perf_counter() - start))
+            if found is not None and divergence is None:
+                divergence = ReplayDivergence(step, (mappingIdx, pinModFuncKey), *found)
+                if stopOnDivergence:
+                    break
+    finally:
+        fork.discard()
+    return ReplayResult(events, pd.DataFrame(stepTimes, columns=REPLAY_TIME_COLUMNS), divergence)
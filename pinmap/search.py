@@ -0,0 +1,90 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import re
+import numpy as np
+import pandas as pd
+
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend import OptionsColumnLabels
+
+SEARCH_NGRAM_LENGTH = 3
+
+class OptionsSearchIndex(object):
+    def __init__(self, options: PinOptions) -> None:
+        """Build an inverted index over the board pin, MCU pin, module and function names of all pin-module-function-combinations.
+
+        The distinct lowercase tokens form a sorted vocabulary, every token has a sorted posting array of pinModFunc keys.
+        Prefix queries are answered by a binary search on the vocabulary, substring queries by a trigram index over the
+        vocabulary, so neither has to look at the pinModFunc table.
+
+        Parameters
+        ----------
+        options : PinOptions object to index.
+        """
+        pinKeys     = options.pinModFunc['Pin-Key'].values.astype(int)
+        modFuncKeys = options.pinModFunc['ModFunc-Key'].values.astype(int)
+        keys        = np.arange(len(pinKeys))
+        tokenColumns = [
+                options.pins[OptionsColumnLabels.BOARD_PIN].astype(str).values[pinKeys],
+                options.pins[OptionsColumnLabels.MCU_PIN].astype(str).values[pinKeys],
+                options.modules['names'].astype(str).values[options.modFunc['Module-Key'].values.astype(int)[modFuncKeys]],
+                options.functions['names'].astype(str).values[options.modFunc['Function-Key'].values.astype(int)[modFuncKeys]],
+            ]
+        postings = pd.DataFrame({
+                'Token': pd.Series(np.concatenate(tokenColumns)).str.lower().values,
+                'Key':   np.tile(keys, len(tokenColumns)),
+            }).drop_duplicates()
+        groups = postings.groupby('Token', sort=True)['Key']
+        self.vocabulary = np.array(list(groups.groups.keys()), dtype=object)
+        self.postings   = [np.sort(keyValues.values) for _, keyValues in groups]
+        self.numKeys    = len(keys)
+
+        self._ngrams = {}
+        for tokenIdx, token in enumerate(self.vocabulary):
+            for start in range(max(len(token) - SEARCH_NGRAM_LENGTH + 1, 0)):
+                self._ngrams.setdefault(token[start:start + SEARCH_NGRAM_LENGTH], set()).add(tokenIdx)
+
+    def _prefixTokens(self, term: str) -> np.ndarray:
+        start = np.searchsorted(self.vocabulary, term, side='left')
+        stop  = np.searchsorted(self.vocabulary, term + '\uffff', side='left')
+        return np.arange(start, stop)
+
+    def _substringTokens(self, term: str) -> np.ndarray:
+        if len(term) < SEARCH_NGRAM_LENGTH:
+            candidates = range(len(self.vocabulary))
+        else:
+            candidates = None
+            for start in range(len(term) - SEARCH_NGRAM_LENGTH + 1):
+                ngramTokens = self._ngrams.get(term[start:start + SEARCH_NGRAM_LENGTH], set())
+                candidates  = ngramTokens if candidates is None else candidates & ngramTokens
+                if len(candidates) == 0:
+                    return np.array([], dtype=int)
+        return np.array([tokenIdx for tokenIdx in candidates if term in self.vocabulary[tokenIdx]], dtype=int)
+
+    def _termKeys(self, term: str, prefix: bool) -> np.ndarray:
+        tokenIdxs = self._prefixTokens(term) if prefix else self._substringTokens(term)
+        if len(tokenIdxs) == 0:
+            return np.array([], dtype=int)
+        if len(tokenIdxs) == 1:
+            return self.postings[tokenIdxs[0]]
+        return np.unique(np.concatenate([self.postings[tokenIdx] for tokenIdx in tokenIdxs]))
+
+    def search(self, query: str, allowedKeys: np.ndarray | None = None, prefix: bool = False) -> np.ndarray:
+        """Return the sorted pinModFunc keys matching the query. The query is split into terms at whitespace and dashes, a key
+        matches if every term is a prefix (prefix=True) or a substring (prefix=False) of any of its tokens, ignoring case.
+        If allowedKeys is given, only keys contained in it are returned. An empty query matches all (allowed) keys."""
+        terms  = [term for term in re.split(r'[\s\-]+', query.lower()) if len(term) > 0]
+        result = None
+        for term in terms:
+            termKeys = self._termKeys(term, prefix)
+            result   = termKeys if result is None else np.intersect1d(result, termKeys, assume_unique=True)
+            if len(result) == 0:
+                break
+        if result is None:
+            result = np.arange(self.numKeys)
+        if allowedKeys is not None:
+            result = result[np.isin(result, allowedKeys)]
+        return result
@@ -0,0 +1,72 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import os
+import pickle
+import pathlib as pl
+import pandas as pd
+
+from pinmap.__version__ import __version__
+from pinmap.pinoptions import PinOptions
+
+SESSION_FILE_ENDING    = '.session'
+SESSION_FORMAT_VERSION = 1
+SESSION_DERIVED_STATE  = ['_layout', '_optionLabels', '_searchIndex', '_compatibility', '_edbColVals', '_edbRowVals']
+
+def sourceFileTimes(paths: list[pl.Path]) -> tuple:
+    """Modification times of the files a session was created from, missing files are None."""
+    return tuple(path.stat().st_mtime_ns if path.exists() else None for path in paths)
+
+class SessionSnapshot(object):
+    """Binary snapshot of the state of an adapter, i.e. mapping, PinOptions, notes, bus module keys, the derived indexes and
+    the options of every pin-selector, so an adapter can be restored without parsing the base files or computing options.
+
+    A snapshot is only valid for the pinmap version and format version it was written with and for the source files with
+    the modification times at the time of writing, read returns None for stale snapshots.
+
+    WARNING: The snapshot is stored with pickle, which executes arbitrary code while a file is read. There is no integrity
+    check, only read session files which you wrote yourself or which come from a source you trust as much as the code you
+    run, never session files received from others. Exchange adapters with the export files instead."""
+
+    def __init__(self, name: str, sourceTimes: tuple, mapping: pd.DataFrame, options: PinOptions, notes: str, busModuleKeys: dict,
+                 selectorOptions: dict, derivedState: dict) -> None:
+        self.formatVersion   = SESSION_FORMAT_VERSION
+        self.pinmapVersion   = __version__
+        self.name            = name
+        self.sourceTimes     = sourceTimes
+        self.mapping         = mapping
+        self.options         = options
+        self.notes           = notes
+        self.busModuleKeys   = busModuleKeys
+        self.selectorOptions = selectorOptions
+        self.derivedState    = derivedState
+
+    def write(self, filepath: pl.Path | str) -> None:
+        """Write the snapshot, the file is replaced atomically so an interrupted write keeps the previous snapshot."""
+        filepath = pl.Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        temporaryPath = filepath.with_name(filepath.name + '.tmp')
+        with open(temporaryPath, 'wb') as sessionFile:
+            pickle.dump(self, sessionFile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaryPath, filepath)
+
+    @staticmethod
+    def read(filepath: pl.Path | str, name: str, sourceTimes: tuple) -> object:
+        """Return the snapshot stored in filepath, or None if there is none, it cannot be read or it is stale, i.e. it was
+        written by another version, for another adapter or the source files were modified since. The file is unpickled,
+        it must be trusted, see SessionSnapshot."""
+        filepath = pl.Path(filepath)
+        if not filepath.exists():
+            return None
+        try:
+            with open(filepath, 'rb') as sessionFile:
+                snapshot = pickle.load(sessionFile)
+        except Exception:
+            return None
+        if not isinstance(snapshot, SessionSnapshot) or getattr(snapshot, 'formatVersion', None) != SESSION_FORMAT_VERSION or snapshot.pinmapVersion != __version__:
+            return None
+        if snapshot.name != name or snapshot.sourceTimes != sourceTimes:
+            return None
+        return snapshot
@@ -0,0 +1,127 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import html
+import collections
+import ipywidgets as widgets
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+
+class UtilizationStats(object):
+    def __init__(self, adapter: object) -> None:
+        """Counters of the MCU pins, modules and buses used by the mapping of adapter. The counters are built once and then
+        updated by a mapping listener with the previous and current state of the changed pins only, i.e. every assign or
+        unassign costs O(1). The frontEnd shows a small summary which follows every change.
+
+        Parameters
+        ----------
+        adapter : Adapter whose mapping is counted.
+        """
+        self.adapter = adapter
+        self.summaryLabel = widgets.HTML(value='')
+        self._rebuild()
+        adapter.mappingListeners.add(self._mappingChanged)
+
+    def close(self) -> None:
+        """Stop following the mapping of the adapter."""
+        self.adapter.mappingListeners.remove(self._mappingChanged)
+
+    def _rebuild(self) -> None:
+        options           = self.adapter.options
+        mapping           = self.adapter.mapping
+        self._pinKeys     = options.pinModFunc['Pin-Key'].values.astype(int)
+        self._moduleKeys  = options.modFunc['Module-Key'].values.astype(int)[options.pinModFunc['ModFunc-Key'].values.astype(int)]
+        self._moduleNames = options.modules['names'].astype(str).values
+        self.numMcuPins   = len(options.pins)
+        self.busSizes     = mapping[mapping[MappingColumnLabels.BUS] != ''].groupby(MappingColumnLabels.BUS).size().to_dict()
+        self._buses       = mapping[MappingColumnLabels.BUS].values
+        self.mcuPinUsage  = collections.Counter()
+        self.moduleUsage  = collections.Counter()
+        self.busUsage     = collections.Counter()
+        self.numAssigned  = 0
+        self.numShared    = 0
+        self.numConflictedMcuPins = 0
+        keys    = mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values
+        primary = mapping[MappingColumnLabels.PRIMARY].values
+        for mappingIdx in range(len(mapping)):
+            self._count(mappingIdx, int(keys[mappingIdx]), primary[mappingIdx], 1)
+        self._updateFrontEnd()
+
+    def _count(self, mappingIdx: int, pinModFuncKey: int, primary: str, sign: int) -> None:
+        """Add (sign 1) or remove (sign -1) the assignment of one pin to or from all counters."""
+        if pinModFuncKey == -1:
+            return
+        pinKey = self._pinKeys[pinModFuncKey]
+        if sign < 0 and self.mcuPinUsage[pinKey] == 2:
+            self.numConflictedMcuPins -= 1
+        self.mcuPinUsage[pinKey] += sign
+        if sign > 0 and self.mcuPinUsage[pinKey] == 2:
+            self.numConflictedMcuPins += 1
+        if self.mcuPinUsage[pinKey] == 0:
+            del self.mcuPinUsage[pinKey]
+        moduleKey = self._moduleKeys[pinModFuncKey]
+        self.moduleUsage[moduleKey] += sign
+        if self.moduleUsage[moduleKey] == 0:
+            del self.moduleUsage[moduleKey]
+        bus = self._buses[mappingIdx]
+        if bus != '':
+            self.busUsage[bus] += sign
+        self.numAssigned += sign
+        if primary == '':
+            self.numShared += sign
+
+    def _mappingChanged(self, adapter: object, previous: pd.DataFrame, current: pd.DataFrame) -> None:
+        if previous[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].isna().any() or len(self._buses) != len(adapter.mapping):
+            # The base files were reloaded, the counters are rebuilt for the new pins and options.
+            self._rebuild()
+            return
+        for mappingIdx, oldKey, oldPrimary, newKey, newPrimary in zip(current.index,
+                previous[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values, previous[MappingColumnLabels.PRIMARY].values,
+                current[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values, current[MappingColumnLabels.PRIMARY].values):
+            self._count(mappingIdx, int(oldKey), oldPrimary, -1)
+            self._count(mappingIdx, int(newKey), newPrimary, 1)
+        self._updateFrontEnd()
+
+    @property
+    def numUsedMcuPins(self) -> int:
+        return len(self.mcuPinUsage)
+
+    @property
+    def numFreeMcuPins(self) -> int:
+        return self.numMcuPins - self.numUsedMcuPins
+
+    @property
+    def modulesInUse(self) -> dict[str, int]:
+        """Number of assigned pins per module in use."""
+        return {str(self._moduleNames[moduleKey]): count for moduleKey, count in sorted(self.moduleUsage.items())}
+
+    @property
+    def busFill(self) -> dict[str, tuple[int, int]]:
+        """Number of assigned members and number of members per bus."""
+        return {bus: (self.busUsage.get(bus, 0), size) for bus, size in self.busSizes.items()}
+
+    def summary(self) -> dict:
+        return {
+                'assignedPins':       self.numAssigned,
+                'usedMcuPins':        self.numUsedMcuPins,
+                'freeMcuPins':        self.numFreeMcuPins,
+                'conflictedMcuPins':  self.numConflictedMcuPins,
+                'sharedAssignments':  self.numShared,
+                'modulesInUse':       len(self.moduleUsage),
+                'fullBuses':          sum(1 for (assigned, size) in self.busFill.values() if assigned == size),
+            }
+
+    def _updateFrontEnd(self) -> None:
+        summary = self.summary()
+        busFill = ', '.join("{} {}/{}".format(html.escape(bus), assigned, size) for bus, (assigned, size) in self.busFill.items())
+        self.summaryLabel.value = ("<b>MCU pins</b> {usedMcuPins} used, {freeMcuPins} free, {conflictedMcuPins} conflicted &nbsp; "
+                                   "<b>Assignments</b> {assignedPins}, {sharedAssignments} shared &nbsp; "
+                                   "<b>Modules</b> {modulesInUse} in use").format(**summary) + ("&nbsp; <b>Buses</b> " + busFill if busFill != '' else '')
+
+    @property
+    def frontEnd(self) -> widgets.HTML:
+        """Show the live summary below the current cell."""
+        return self.summaryLabel
@@ -0,0 +1,160 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import json
+import re
+import numpy as np
+import pandas as pd
+
+from pinmap import StandardStrings as PMTSTR
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.filebackend import OptionsColumnLabels
+
+class ValidationRules():
+    __slots__ = ()
+    MULTIPLY_DRIVEN_PIN     = 'multiply-driven-pin'
+    BUS_SPLIT               = 'bus-split-across-modules'
+    SUPPLY_MAPPED_TO_SIGNAL = 'supply-mapped-to-signal'
+    SIGNAL_MAPPED_TO_SUPPLY = 'signal-mapped-to-supply'
+    OPEN_UNASSIGNED         = 'open-pin-unassigned'
+    REGEX_MODULE            = 'regex-module-violation'
+    REGEX_FUNCTION          = 'regex-function-violation'
+
+class ValidationSeverity():
+    __slots__ = ()
+    ERROR   = 'error'
+    WARNING = 'warning'
+
+SUPPLY_LABELS = [PMTSTR.SUPPLY_5V_LABEL, PMTSTR.SUPPLY_3V3_LABEL, PMTSTR.SUPPLY_GND_LABEL]
+ISSUE_COLUMNS = ['Rule', 'Severity', MappingColumnLabels.PINGRID_COLUMN, MappingColumnLabels.PINGRID_ROW, MappingColumnLabels.BUS, MappingColumnLabels.SIGNAL, 'Message']
+
+class ValidationReport(object):
+    def __init__(self, issues: pd.DataFrame) -> None:
+        self.issues = issues
+
+    @property
+    def errors(self) -> pd.DataFrame:
+        return self.issues[self.issues['Severity'] == ValidationSeverity.ERROR]
+
+    @property
+    def warnings(self) -> pd.DataFrame:
+        return self.issues[self.issues['Severity'] == ValidationSeverity.WARNING]
+
+    @property
+    def ok(self) -> bool:
+        """True if the report does not contain any error, warnings are allowed."""
+        return len(self.errors) == 0
+
+    def summary(self) -> dict:
+        """Return the number of issues per rule."""
+        return self.issues.groupby('Rule').size().to_dict()
+
+    def toDict(self) -> dict:
+        return {'ok': self.ok, 'summary': self.summary(), 'issues': self.issues.to_dict(orient='records')}
+
+    def toJson(self) -> str:
+        return json.dumps(self.toDict(), indent=2, default=str)
+
+def _issues(mapping: pd.DataFrame, mask: np.ndarray, rule: str, severity: str, messages: np.ndarray | str) -> pd.DataFrame:
+    flagged = mapping[mask]
+    if not isinstance(messages, str):
+        messages = np.asarray(messages)[mask]
+    issues = pd.DataFrame({
+            'Rule':                             rule,
+            'Severity':                         severity,
+            MappingColumnLabels.PINGRID_COLUMN: flagged[MappingColumnLabels.PINGRID_COLUMN].values,
+            MappingColumnLabels.PINGRID_ROW:    flagged[MappingColumnLabels.PINGRID_ROW].values,
+            MappingColumnLabels.BUS:            flagged[MappingColumnLabels.BUS].values,
+            MappingColumnLabels.SIGNAL:         flagged[MappingColumnLabels.SIGNAL].values,
+            'Message':                          messages,
+        }, index=flagged.index, columns=ISSUE_COLUMNS)
+    if MappingColumnLabels.CONNECTOR in mapping.columns:
+        # Boards with several connectors reuse the same Column and Row.
+        issues.insert(ISSUE_COLUMNS.index(MappingColumnLabels.PINGRID_COLUMN), MappingColumnLabels.CONNECTOR, flagged[MappingColumnLabels.CONNECTOR].values)
+    return issues
+
+def _take(values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Look up keys in values, an empty lookup table yields zeros, which only happens if nothing is assigned."""
+    if len(values) == 0:
+        return np.zeros(len(keys), dtype=values.dtype)
+    return values[keys]
+
+def _regexMatches(regexValues: np.ndarray, nameKeys: np.ndarray, names: pd.Series) -> np.ndarray:
+    """Return for every row whether names[nameKeys[row]] matches regexValues[row]. Every distinct regex is evaluated only once
+    against all names, the rows then look up their result."""
+    matches = np.ones(len(regexValues), dtype=bool)
+    for regex in pd.unique(regexValues):
+        rows = regexValues == regex
+        nameMatches = names.str.contains(regex, regex=True, na=False).values
+        matches[rows] = nameMatches[nameKeys[rows]]
+    return matches
+
+def validateMapping(mapping: pd.DataFrame, options: PinOptions) -> ValidationReport:
+    """Check a whole mapping table against the design rules, every rule is one vectorized pass over the table.
+
+    - multiply-driven-pin: an MCU pin is assigned to more than one baseboard pin.
+    - bus-split-across-modules: the members of a bus are assigned to different modules.
+    - supply-mapped-to-signal: a supply or ground pin of the baseboard is assigned to a signal module.
+    - signal-mapped-to-supply: a signal pin of the baseboard is assigned to a supply or ground module.
+    - open-pin-unassigned: a pin with status Open is not assigned, reported as warning.
+    - regex-module-violation / regex-function-violation: the assignment does not match the regexes of the baseboard pin.
+    """
+    mapping  = mapping.reset_index(drop=True)
+    keys     = mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].values.astype(int)
+    assigned = keys != -1
+    safeKeys = np.where(assigned, keys, 0)
+
+    pinKeys       = _take(options.pinModFunc['Pin-Key'].values.astype(int), safeKeys)
+    modFuncKeys   = _take(options.pinModFunc['ModFunc-Key'].values.astype(int), safeKeys)
+    modKeys       = _take(options.modFunc['Module-Key'].values.astype(int), modFuncKeys)
+    funcKeys      = _take(options.modFunc['Function-Key'].values.astype(int), modFuncKeys)
+    moduleNames   = options.modules['names'].astype(str)
+    functionNames = options.functions['names'].astype(str)
+    mcuPins       = _take(options.pins[OptionsColumnLabels.MCU_PIN].values.astype(str), pinKeys)
+    modules       = _take(moduleNames.values.astype(str), modKeys)
+    functions     = _take(functionNames.values.astype(str), funcKeys)
+    issues        = []
+
+    # Multiply driven pins, i.e. one MCU pin on several baseboard pins.
+    pinUsage = pd.Series(np.where(assigned, pinKeys, -1)).map(pd.Series(pinKeys[assigned]).value_counts()).fillna(0).values
+    issues.append(_issues(mapping, assigned & (pinUsage > 1), ValidationRules.MULTIPLY_DRIVEN_PIN, ValidationSeverity.ERROR,
+                          np.char.add('MCU pin is assigned more than once: ', mcuPins)))
+
+    # Buses which are split across several modules.
+    buses        = mapping[MappingColumnLabels.BUS].values
+    onBus        = assigned & (buses != '')
+    busModules   = pd.DataFrame({'Bus': buses[onBus], 'Module-Key': modKeys[onBus]}).groupby('Bus')['Module-Key'].nunique()
+    splitBuses   = busModules[busModules > 1].index
+    issues.append(_issues(mapping, onBus & np.isin(buses, splitBuses), ValidationRules.BUS_SPLIT, ValidationSeverity.ERROR,
+                          np.char.add('Bus member is assigned to module ', modules)))
+
+    # Supply and ground pins must only be connected to supply and ground modules and vice versa.
+    supplyPattern = '^(' + '|'.join(re.escape(label) for label in SUPPLY_LABELS) + ')$'
+    supplyPins    = mapping[MappingColumnLabels.REGEX_MODULE].str.strip().str.match(supplyPattern).values
+    supplyModules = pd.Series(modules).str.match(supplyPattern).values
+    issues.append(_issues(mapping, assigned & supplyPins & ~supplyModules, ValidationRules.SUPPLY_MAPPED_TO_SIGNAL, ValidationSeverity.ERROR,
+                          np.char.add('Supply pin is assigned to signal module ', modules)))
+    issues.append(_issues(mapping, assigned & ~supplyPins & supplyModules, ValidationRules.SIGNAL_MAPPED_TO_SUPPLY, ValidationSeverity.ERROR,
+                          np.char.add('Signal pin is assigned to supply module ', modules)))
+
+    # Open pins should be assigned.
+    openPins = mapping[MappingColumnLabels.STATUS].str.contains(PMTSTR.STATUS_OPEN, regex=False).values
+    issues.append(_issues(mapping, openPins & ~assigned, ValidationRules.OPEN_UNASSIGNED, ValidationSeverity.WARNING, 'Open pin is not assigned'))
+
+    # Assignments have to match the regexes of the baseboard pin.
+    if assigned.any():
+        regexModule   = mapping[MappingColumnLabels.REGEX_MODULE].values
+        regexFunction = mapping[MappingColumnLabels.REGEX_FUNCTION].values
+        moduleOk      = np.ones(len(keys), dtype=bool)
+        functionOk    = np.ones(len(keys), dtype=bool)
+        moduleOk[assigned]   = _regexMatches(regexModule[assigned], modKeys[assigned], moduleNames)
+        functionOk[assigned] = _regexMatches(regexFunction[assigned], funcKeys[assigned], functionNames)
+        issues.append(_issues(mapping, assigned & ~moduleOk, ValidationRules.REGEX_MODULE, ValidationSeverity.ERROR,
+                              np.char.add('Module does not match Regex-Module: ', modules)))
+        issues.append(_issues(mapping, assigned & ~functionOk, ValidationRules.REGEX_FUNCTION, ValidationSeverity.ERROR,
+                              np.char.add('Function does not match Regex-Function: ', functions)))
+
+    return ValidationReport(pd.concat(issues).sort_index(kind='stable').reset_index(drop=True))
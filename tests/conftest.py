@@ -0,0 +1,36 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pathlib as pl
+
+import pytest
+
+from pinmap.pinoptions import PinOptions
+from pinmap.filebackend.raw import RawBackend
+from pinmap.reload import optionKeyTable
+
+EXAMPLE_PATH = pl.Path(__file__).resolve().parent.parent / 'example'
+
+def optionLabels(options: PinOptions) -> list[str]:
+    """Selector label of every pinModFunc key, formatted like Adapter.optionLabels."""
+    names = optionKeyTable(options)
+    return ["{:<6} - {:<5} - {} - {}".format(*labelParts) for labelParts in names.itertuples(index=False)]
+
+@pytest.fixture
+def exampleFiles() -> tuple[pl.Path, pl.Path]:
+    return (EXAMPLE_PATH / 'example_baseboard.csv', EXAMPLE_PATH / 'example_mcuboard.csv')
+
+@pytest.fixture
+def exampleMapping(exampleFiles):
+    return RawBackend.readMappingfile(exampleFiles[0])
+
+@pytest.fixture
+def exampleOptions(exampleFiles) -> PinOptions:
+    return RawBackend.readOptionsfile(exampleFiles[1])
+
+@pytest.fixture
+def adapterModule():
+    """The adapter module, tests using it are skipped if the frontend dependencies are not installed."""
+    return pytest.importorskip('pinmap.adapter')
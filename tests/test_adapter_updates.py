@@ -0,0 +1,68 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+
+async def waitFor(condition: callable, timeout: float = 10.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+async def drain(adapter) -> None:
+    """Wait until the update loop has handled everything queued so far."""
+    handled = []
+    adapter.enqueueFrontendTask(lambda: handled.append(True))
+    await waitFor(lambda: len(handled) > 0 and adapter.updateQueue.empty())
+
+def pinSelectors(adapter) -> dict:
+    return {pinSelector.mappingIdx: pinSelector for bus in adapter.buses.values() for pinSelector in bus['Members']}
+
+def test_frontend_task_runs_on_event_loop(adapterModule, exampleFiles):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles)
+        ranOn   = []
+        adapter.enqueueFrontendTask(lambda: ranOn.append(asyncio.get_running_loop()))
+        await waitFor(lambda: len(ranOn) > 0)
+        assert ranOn == [asyncio.get_running_loop()]
+    asyncio.run(scenario())
+
+def test_selector_change_is_applied_by_update_loop(adapterModule, exampleFiles):
+    async def scenario():
+        adapter     = adapterModule.Adapter(generate=exampleFiles, guiUpdateCoalesceTime=0.0)
+        pinSelector = pinSelectors(adapter)[1]
+        option      = pinSelector.options[1]
+        pinSelector.value = option
+        adapter.enqueueFrontendTask(lambda: None)
+        await waitFor(lambda: adapter.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] == option)
+        await waitFor(lambda: adapter.updateQueue.empty())
+        assert adapter.mapping.loc[1, MappingColumnLabels.PRIMARY] == 'x'
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize('guiAsyncUpdates', [True, False])
+def test_update_loop_keeps_queue_order_and_survives_errors(adapterModule, exampleFiles, guiAsyncUpdates):
+    async def scenario():
+        adapter     = adapterModule.Adapter(generate=exampleFiles, guiUpdateCoalesceTime=0.05, guiAsyncUpdates=guiAsyncUpdates)
+        await drain(adapter)
+        pinSelector = pinSelectors(adapter)[1]
+        option      = pinSelector.options[1]
+        seen        = []
+        def failingTask():
+            raise Exception("task failed")
+        pinSelector.value = option
+        adapter.enqueueFrontendTask(lambda: seen.append(adapter.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC]))
+        adapter.enqueueFrontendTask(failingTask)
+        await drain(adapter)
+        assert seen == [option]
+        assert str(adapter.updateError) == "task failed"
+        pinSelector.value = ''
+        await drain(adapter)
+        assert adapter.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] == ''
+        adapter.close()
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+import json
+
+from pinmap.autosave import MappingJournal, JOURNAL_STATE_COLUMNS
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.filebackend.html import HtmlBackend
+
+from test_adapter_updates import drain, pinSelectors
+
+def mappingDelta(mapping, mappingIdxs: list[int]):
+    return mapping.loc[mappingIdxs, JOURNAL_STATE_COLUMNS]
+
+def test_close_compacts_into_snapshot(tmp_path, exampleMapping):
+    mapping = exampleMapping.copy()
+    mapping.loc[2, MappingColumnLabels.PRIMARY] = 'x'
+    journal = MappingJournal(tmp_path / 'a.journal', tmp_path / 'a.autosave', idleTime=60.0)
+    journal.appendMappingDelta(mappingDelta(mapping, [2]))
+    journal.appendNotes("first")
+    journal.appendNotes("second")
+    journal.close()
+    assert (tmp_path / 'a.journal').read_text() == ''
+    records = [json.loads(line) for line in (tmp_path / 'a.autosave').read_text().splitlines()]
+    assert records == [{'idx': 2, 'state': [str(mapping.loc[2, column]) if column != MappingColumnLabels.MAPPED_PINMODFUNC_KEY else int(mapping.loc[2, column]) for column in JOURNAL_STATE_COLUMNS]}, {'notes': "second"}]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['a.autosave', 'a.journal']
+
+def test_replay_applies_journal_over_snapshot_and_skips_partial_line(tmp_path, exampleMapping):
+    snapshotPath = tmp_path / 'a.autosave'
+    journalPath  = tmp_path / 'a.journal'
+    snapshotPath.write_text(json.dumps({'idx': 0, 'state': ['old', 1, '']}) + '\n' + json.dumps({'idx': 1, 'state': ['kept', 2, 'x']}) + '\n' + json.dumps({'notes': 'old'}) + '\n')
+    journalPath.write_text(json.dumps({'idx': 0, 'state': ['new', 3, 'x']}) + '\n' + '{"idx": 1, "sta')
+    mapping = exampleMapping.copy()
+    notes   = MappingJournal.replay(journalPath, mapping, snapshotPath)
+    assert notes == 'old'
+    assert mapping.loc[0, JOURNAL_STATE_COLUMNS].tolist() == ['new', 3, 'x']
+    assert mapping.loc[1, JOURNAL_STATE_COLUMNS].tolist() == ['kept', 2, 'x']
+
+def test_replay_without_files_keeps_mapping(tmp_path, exampleMapping):
+    mapping = exampleMapping.copy()
+    assert MappingJournal.replay(tmp_path / 'a.journal', mapping, tmp_path / 'a.autosave') is None
+    assert mapping.equals(exampleMapping)
+
+def test_autosave_does_not_write_export_files(adapterModule, exampleFiles, tmp_path):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, exportPath=tmp_path, guiUpdateCoalesceTime=0.0, autosave=True)
+        await drain(adapter)
+        adapter.exportData()
+        exportedFiles = {path: path.read_bytes() for path in adapter.exportDirPath.iterdir()}
+        pinSelector = pinSelectors(adapter)[1]
+        option      = pinSelector.options[1]
+        pinSelector.value = option
+        await drain(adapter)
+        adapter.close()
+        assert {path: path.read_bytes() for path in adapter.exportDirPath.iterdir()} == exportedFiles
+        assert adapter.exportJournalPath.read_text() == ''
+        assert adapter.exportAutosavePath.exists()
+        restored = adapterModule.Adapter(importPath=tmp_path, baseboard=adapter.baseboard, mcuboard=adapter.mcuboard)
+        assert restored.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] == option
+        restored.close()
+    asyncio.run(scenario())
+
+def test_export_without_autosave_removes_stale_autosave(adapterModule, exampleFiles, tmp_path):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, exportPath=tmp_path, autosave=True)
+        await drain(adapter)
+        finalizer = adapter._journalFinalizer
+        adapter.disableAutosave()
+        # The journal is closed through its finalizer, which holds no reference to the adapter.
+        assert not finalizer.alive
+        assert adapter.exportJournalPath.exists()
+        adapter.exportData()
+        assert not adapter.exportJournalPath.exists() and not adapter.exportAutosavePath.exists()
+        adapter.close()
+    asyncio.run(scenario())
+
+def test_export_removes_stale_autosave_of_the_parent(adapterModule, exampleFiles, tmp_path):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, exportPath=tmp_path, backendReport=HtmlBackend)
+        await drain(adapter)
+        stale = json.dumps({'idx': 1, 'state': ['STALE', 1, 'x']}) + '\n'
+        for export in [adapter.exportMapping, lambda: adapter.exportMappingAsync(withReport=False).wait()]:
+            adapter.exportAutosavePath.write_text(stale)
+            adapter.exportJournalPath.write_text(stale)
+            export()
+            assert not adapter.exportAutosavePath.exists() and not adapter.exportJournalPath.exists()
+        restored = adapterModule.Adapter(importPath=tmp_path, baseboard=adapter.baseboard, mcuboard=adapter.mcuboard)
+        assert restored.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] != 'STALE'
+        restored.close()
+        adapter.close()
+    asyncio.run(scenario())
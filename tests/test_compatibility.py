@@ -0,0 +1,55 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pytest
+
+from pinmap.compatibility import CompatibilityMatrix
+from pinmap.filebackend import MappingColumnLabels, OptionsColumnLabels
+from pinmap.reload import optionKeyTable
+
+def denseMatrix(mapping, options) -> np.ndarray:
+    """Reference: pins x pinModFunc keys, evaluating the regexes of every pin against every key."""
+    names = optionKeyTable(options)
+    dense = np.zeros((len(mapping), len(names)), dtype=bool)
+    for position, (regexModule, regexFunction) in enumerate(mapping[[MappingColumnLabels.REGEX_MODULE, MappingColumnLabels.REGEX_FUNCTION]].values):
+        dense[position] = names['Module'].str.contains(regexModule, regex=True).values & names['Function'].str.contains(regexFunction, regex=True).values
+    return dense
+
+@pytest.fixture
+def matrices(exampleMapping, exampleOptions) -> tuple[CompatibilityMatrix, np.ndarray]:
+    return (CompatibilityMatrix(exampleMapping, exampleOptions), denseMatrix(exampleMapping, exampleOptions))
+
+def test_forward_queries(matrices):
+    (compatibility, dense) = matrices
+    assert compatibility.nnz == dense.sum()
+    for mappingIdx in range(dense.shape[0]):
+        assert compatibility.pinModFuncKeys(mappingIdx).tolist() == np.flatnonzero(dense[mappingIdx]).tolist()
+        assert (compatibility.row(mappingIdx) == dense[mappingIdx]).all()
+
+def test_reverse_queries(matrices, exampleOptions):
+    (compatibility, dense) = matrices
+    for pinModFuncKey in range(dense.shape[1]):
+        assert compatibility.mappingIdxsForPinModFunc(pinModFuncKey).tolist() == np.flatnonzero(dense[:, pinModFuncKey]).tolist()
+    pinKeys    = exampleOptions.pinModFunc['Pin-Key'].values.astype(int)
+    moduleKeys = exampleOptions.modFunc['Module-Key'].values.astype(int)[exampleOptions.pinModFunc['ModFunc-Key'].values.astype(int)]
+    for pinKey in range(len(exampleOptions.pins)):
+        assert compatibility.mappingIdxsForMcuPin(pinKey).tolist() == np.flatnonzero(dense[:, pinKeys == pinKey].any(axis=1)).tolist()
+    for moduleKey in range(len(exampleOptions.modules)):
+        assert compatibility.mappingIdxsForModule(moduleKey).tolist() == np.flatnonzero(dense[:, moduleKeys == moduleKey].any(axis=1)).tolist()
+
+def test_host_pins(adapterModule, exampleFiles, exampleMapping, exampleOptions):
+    adapter = adapterModule.Adapter(generate=exampleFiles, guiAsyncUpdates=False, lazy=True)
+    dense   = denseMatrix(exampleMapping, exampleOptions)
+    names   = optionKeyTable(exampleOptions)
+    mcuPin  = names[OptionsColumnLabels.MCU_PIN].iloc[0]
+    module  = names['Module'].iloc[0]
+    hosts   = adapter.hostPins(mcuPin=mcuPin, module=module)
+    assert hosts.index.tolist() == np.flatnonzero(dense[:, ((names[OptionsColumnLabels.MCU_PIN] == mcuPin) & (names['Module'] == module)).values].any(axis=1)).tolist()
+    assert set(hosts.index) <= set(adapter.hostPins(mcuPin=mcuPin).index)
+    assert set(hosts.index) <= set(adapter.hostPins(module=module).index)
+    with pytest.raises(Exception, match="Unknown module"):
+        adapter.hostPins(module='no-such-module')
+    adapter.close()
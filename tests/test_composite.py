@@ -0,0 +1,58 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+
+import pytest
+
+from test_adapter_updates import drain, pinSelectors, waitFor
+
+@pytest.fixture
+def compositeModule(adapterModule):
+    return pytest.importorskip('pinmap.composite')
+
+def makeComposite(adapterModule, compositeModule, exampleFiles):
+    Board = adapterModule.Board
+    baseboards = [(Board(vendor='V', longname='first', shortname='BB1', revision='A'), exampleFiles[0]),
+                  (Board(vendor='V', longname='second', shortname='BB2', revision='A'), exampleFiles[0])]
+    return compositeModule.CompositeAdapter(baseboards, exampleFiles[1], guiUpdateCoalesceTime=0.0)
+
+def test_change_refreshes_only_affected_selectors_of_other_adapters(adapterModule, compositeModule, exampleFiles):
+    async def scenario():
+        composite = makeComposite(adapterModule, compositeModule, exampleFiles)
+        (first, second) = (composite.adapters['BB1'], composite.adapters['BB2'])
+        await drain(first)
+        await drain(second)
+        refreshed = []
+        second.refreshSelectorOptions = lambda mappingIdxs, refresh=second.refreshSelectorOptions: (refreshed.append(list(mappingIdxs)), refresh(mappingIdxs))
+        pinSelector = pinSelectors(first)[1]
+        option      = pinSelector.options[1]
+        pinSelector.value = option
+        await waitFor(lambda: first.mapping.loc[1, 'Mapped-PinModFunc'] == option)
+        await drain(second)
+        pinModFuncKey = int(first.mapping.loc[1, 'Mapped-PinModFunc-Key'])
+        pinModFunc    = first.options.pinModFunc
+        sharing       = pinModFunc.index[(pinModFunc['Pin-Key'] == pinModFunc['Pin-Key'][pinModFuncKey]) | (pinModFunc['ModFunc-Key'] == pinModFunc['ModFunc-Key'][pinModFuncKey])]
+        expected      = set(idx for key in sharing for idx in second.compatibility.mappingIdxsForPinModFunc(key))
+        assert refreshed == [sorted(expected)]
+        tagged = [label for label in pinSelectors(second)[1].options if label.endswith(option)]
+        assert tagged[0].startswith('Pin>BB1:')
+        assert len(composite.conflicts) == 0
+    asyncio.run(scenario())
+
+def test_conflicts_across_adapters(adapterModule, compositeModule, exampleFiles):
+    async def scenario():
+        composite = makeComposite(adapterModule, compositeModule, exampleFiles)
+        (first, second) = (composite.adapters['BB1'], composite.adapters['BB2'])
+        option = pinSelectors(first)[1].options[1]
+        pinSelectors(first)[1].value = option
+        await waitFor(lambda: first.mapping.loc[1, 'Mapped-PinModFunc'] == option)
+        await drain(second)
+        pinSelectors(second)[1].value = [label for label in pinSelectors(second)[1].options if label.endswith(option)][0]
+        await waitFor(lambda: len(composite.conflicts) > 0)
+        assert sorted(set(composite.conflicts['Adapter'])) == ['BB1', 'BB2']
+        pinSelectors(first)[1].value = ''
+        await waitFor(lambda: len(composite.conflicts) == 0)
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+
+from test_adapter_updates import drain
+
+@pytest.fixture
+def datagridAdapter(adapterModule, exampleFiles):
+    pytest.importorskip('ipydatagrid')
+    return lambda **kwargs: adapterModule.Adapter(generate=exampleFiles, guiMode='datagrid', guiUpdateCoalesceTime=0.0, **kwargs)
+
+def test_shared_editor_assigns_clicked_pin(datagridAdapter):
+    async def scenario():
+        adapter = datagridAdapter()
+        await drain(adapter)
+        sentCells = []
+        adapter.datagrid.grid.set_cell_value_by_index = lambda column, row, value: sentCells.append((column, row, value))
+        adapter.datagrid._cellClicked({'primary_key_row': 1})
+        editor = adapter.datagrid.editor
+        assert not editor.disabled
+        assert tuple(editor.options) == adapter.pinCells[1].menuOptions and len(editor.options) > 1
+        option = editor.options[1]
+        editor.value = option
+        await drain(adapter)
+        assert adapter.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] == option
+        assert (MappingColumnLabels.MAPPED_PINMODFUNC, 1, option) in sentCells
+        # Only cells of the mapped pin and conflict tags of other pins are sent, never the unchanged cells.
+        assert all(column in [MappingColumnLabels.MAPPED_PINMODFUNC, 'Conflict'] for (column, _, _) in sentCells)
+        assert adapter.datagrid._data.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] == option
+        # The editor keeps editing the clicked pin, the selected option is not tagged as conflict.
+        assert editor.value == option
+        adapter.close()
+    asyncio.run(scenario())
+
+def test_datagrid_splits_conflict_tags(datagridAdapter):
+    async def scenario():
+        adapter = datagridAdapter()
+        await drain(adapter)
+        adapter.mapping.loc[2, MappingColumnLabels.MAPPED_PINMODFUNC] = 'Pin>A2>> label'
+        frame = adapter.datagrid.frame()
+        assert frame.loc[2, [MappingColumnLabels.MAPPED_PINMODFUNC, 'Conflict']].tolist() == ['label', 'Pin>A2']
+        assert frame.loc[3, 'Conflict'] == ''
+        adapter.close()
+    asyncio.run(scenario())
@@ -0,0 +1,77 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.diff import ChangeLabels, MergeConflictReasons, diffMappings, mergeMappings, recomputePrimaries
+
+LABELS = {
+    0: 'A1     - P1    - UART0 - TX',
+    1: 'A2     - P2    - UART0 - RX',
+    2: 'A1     - P1    - SPI0 - SCK',
+    3: 'A3     - P3    - UART0 - TX',
+}
+
+def makeMapping(keys: list[int], primary: list[str] | None = None, connectors: list[str] | None = None) -> pd.DataFrame:
+    count = len(keys)
+    mapping = pd.DataFrame({
+            MappingColumnLabels.PINGRID_COLUMN:        ['A'] * count,
+            MappingColumnLabels.PINGRID_ROW:           list(range(1, count + 1)) if connectors is None else [1] * count,
+            MappingColumnLabels.BUS:                   [''] * count,
+            MappingColumnLabels.MAPPED_PINMODFUNC:     [LABELS.get(key, '') for key in keys],
+            MappingColumnLabels.MAPPED_PINMODFUNC_KEY: keys,
+            MappingColumnLabels.PRIMARY:               primary if primary is not None else ['x' if key != -1 else '' for key in keys],
+        })
+    if connectors is not None:
+        mapping.insert(0, MappingColumnLabels.CONNECTOR, connectors)
+    return mapping
+
+def test_diff_keys_pins_by_connector():
+    old = makeMapping([0, -1], connectors=['J1', 'J2'])
+    new = makeMapping([0, 1],  connectors=['J1', 'J2'])
+    diff = diffMappings(old, new)
+    assert len(diff.pins) == 2
+    assert diff.summary() == {'added': 1, 'removed': 0, 'changed': 0, 'primaryFlips': 0, 'busChanges': 0}
+    assert diff.added.index.tolist() == [('J2', 'A', 1)]
+
+def test_diff_detects_changed_assignment():
+    diff = diffMappings(makeMapping([0, 1]), makeMapping([0, 3]))
+    assert diff.pins['Change'].tolist() == [ChangeLabels.UNCHANGED, ChangeLabels.CHANGED]
+
+def test_merge_keys_pins_by_connector():
+    base   = makeMapping([-1, -1], connectors=['J1', 'J2'])
+    ours   = makeMapping([0, -1],  connectors=['J1', 'J2'])
+    theirs = makeMapping([-1, 1],  connectors=['J1', 'J2'])
+    (merged, conflicts) = mergeMappings(base, ours, theirs)
+    assert merged[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].tolist() == [0, 1]
+    assert len(conflicts) == 0
+
+def test_merge_recomputes_primaries_across_rows():
+    base   = makeMapping([-1, -1])
+    ours   = makeMapping([0, -1])
+    theirs = makeMapping([-1, 2])
+    (merged, conflicts) = mergeMappings(base, ours, theirs)
+    assert merged[MappingColumnLabels.PRIMARY].tolist() == ['x', '']
+    assert merged[MappingColumnLabels.MAPPED_PINMODFUNC].iloc[1].startswith('Pin>A1>> ')
+    assert conflicts['Reason'].tolist() == [MergeConflictReasons.PIN]
+    assert conflicts.index.tolist() == [('A', 2)]
+
+def test_merge_reports_function_conflicts():
+    (merged, conflicts) = mergeMappings(makeMapping([-1, -1]), makeMapping([0, -1]), makeMapping([-1, 3]))
+    assert merged[MappingColumnLabels.MAPPED_PINMODFUNC].iloc[1].startswith('Func>A1>> ')
+    assert conflicts['Reason'].tolist() == [MergeConflictReasons.FUNCTION]
+
+def test_merge_keeps_ours_on_same_pin_conflict():
+    (merged, conflicts) = mergeMappings(makeMapping([-1]), makeMapping([0]), makeMapping([1]))
+    assert merged[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].tolist() == [0]
+    assert conflicts['Reason'].tolist() == [MergeConflictReasons.ASSIGNMENT]
+
+def test_recompute_primaries_promotes_and_strips_prefix():
+    mapping = makeMapping([0, 2], primary=['', ''])
+    mapping.loc[0, MappingColumnLabels.MAPPED_PINMODFUNC] = 'Pin>A9>> ' + LABELS[0]
+    recomputePrimaries(mapping)
+    assert mapping[MappingColumnLabels.PRIMARY].tolist() == ['x', '']
+    assert mapping[MappingColumnLabels.MAPPED_PINMODFUNC].tolist() == [LABELS[0], 'Pin>A1>> ' + LABELS[2]]
@@ -0,0 +1,52 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import threading
+
+from pinmap.export import ExportJob, ExportStatus
+
+class ReportBackend():
+    def __init__(self, pages: int, failAt: int | None = None) -> None:
+        self.pages  = pages
+        self.failAt = failAt
+
+    def writeReportFile(self, snapshot, progress=None, cancelEvent=None) -> None:
+        for page in range(self.pages):
+            if cancelEvent is not None and cancelEvent.is_set():
+                return
+            if page == self.failAt:
+                raise Exception("Report failed")
+            progress((page + 1) / self.pages)
+
+class Snapshot():
+    def __init__(self, backendReport: ReportBackend) -> None:
+        self.backendReport = backendReport
+        self.exported      = False
+
+    def exportData(self) -> None:
+        self.exported = True
+
+def test_export_pushes_widget_updates_through_schedule():
+    scheduled    = []
+    exportThread = []
+    job = ExportJob(Snapshot(ReportBackend(5)), schedule=lambda function: (scheduled.append(function), exportThread.append(threading.current_thread())))
+    assert job.wait(10.0)
+    assert job.status == ExportStatus.DONE and job.progress == 1.0 and job.snapshot.exported
+    assert job.progressBar.value == 0.0 and job.statusLabel.value == ExportStatus.RUNNING
+    assert threading.main_thread() not in exportThread
+    # Updates are coalesced, only one is pending at a time and it shows the latest state.
+    assert len(scheduled) == 1
+    scheduled[0]()
+    assert job.progressBar.value == 1.0 and job.statusLabel.value == ExportStatus.DONE and job.cancelButton.disabled
+
+def test_export_without_schedule_updates_widgets_directly():
+    job = ExportJob(Snapshot(ReportBackend(2)))
+    assert job.wait(10.0)
+    assert job.progressBar.value == 1.0 and job.statusLabel.value == ExportStatus.DONE
+
+def test_export_reports_failure():
+    job = ExportJob(Snapshot(ReportBackend(3, failAt=1)))
+    assert job.wait(10.0)
+    assert job.status == ExportStatus.FAILED and str(job.error) == "Report failed"
@@ -0,0 +1,87 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import json
+
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.filebackend.firmware import CHeaderBackend, JsonConfigBackend, writeCatalogFirmwareFiles
+from pinmap.filebackend.raw import RawBackend
+from pinmap.filebackend.sqlite import SqliteBackend
+from pinmap.validation import validateMapping, ValidationRules
+
+from conftest import optionLabels
+
+def assign(mapping, labels: list[str], mappingIdx: int, pinModFuncKey: int):
+    mapping = mapping.copy()
+    mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC]     = labels[pinModFuncKey]
+    mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = pinModFuncKey
+    mapping.loc[mappingIdx, MappingColumnLabels.PRIMARY]               = 'x'
+    return mapping
+
+@pytest.fixture
+def validMapping(exampleMapping, exampleOptions):
+    """The example mapping with one assignment which does not violate any design rule."""
+    labels = optionLabels(exampleOptions)
+    for mappingIdx in range(len(exampleMapping)):
+        for pinModFuncKey in range(len(labels)):
+            mapping = assign(exampleMapping, labels, mappingIdx, pinModFuncKey)
+            if validateMapping(mapping, exampleOptions).ok:
+                return mapping
+    pytest.skip("No valid assignment in the example.")
+
+@pytest.fixture
+def invalidMapping(validMapping, exampleOptions):
+    """validMapping with a second pin on the same MCU pin, which is a multiply-driven-pin error."""
+    mappingIdx    = int((validMapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] != -1).idxmax())
+    pinModFuncKey = int(validMapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC_KEY])
+    otherIdx      = 0 if mappingIdx != 0 else 1
+    mapping = assign(validMapping, optionLabels(exampleOptions), otherIdx, pinModFuncKey)
+    mapping.loc[otherIdx, MappingColumnLabels.PRIMARY] = ''
+    assert ValidationRules.MULTIPLY_DRIVEN_PIN in validateMapping(mapping, exampleOptions).errors['Rule'].tolist()
+    return mapping
+
+def test_valid_mapping_is_written(tmp_path, validMapping, exampleOptions):
+    assert JsonConfigBackend.writeFirmwareFile(tmp_path / 'a.json', 'A', validMapping, exampleOptions) == 1
+    config = json.loads((tmp_path / 'a.json').read_text())
+    assert config['issues'] == [] and len(config['pins']) == 1 and len(config['pinmux']) == 1
+    CHeaderBackend.writeFirmwareFile(tmp_path / 'a.h', 'A', validMapping, exampleOptions)
+    header = (tmp_path / 'a.h').read_text()
+    assert '#define A_NUM_PINS 1' in header and 'DESIGN RULE VIOLATED' not in header
+
+def test_invalid_mapping_is_refused(tmp_path, invalidMapping, exampleOptions):
+    with pytest.raises(Exception, match=ValidationRules.MULTIPLY_DRIVEN_PIN):
+        CHeaderBackend.writeFirmwareFile(tmp_path / 'a.h', 'A', invalidMapping, exampleOptions)
+    assert not (tmp_path / 'a.h').exists()
+
+def test_invalid_mapping_is_annotated_if_allowed(tmp_path, invalidMapping, exampleOptions):
+    JsonConfigBackend.writeFirmwareFile(tmp_path / 'a.json', 'A', invalidMapping, exampleOptions, allowErrors=True)
+    config = json.loads((tmp_path / 'a.json').read_text())
+    assert ValidationRules.MULTIPLY_DRIVEN_PIN in {issue['rule'] for issue in config['issues']}
+    CHeaderBackend.writeFirmwareFile(tmp_path / 'a.h', 'A', invalidMapping, exampleOptions, allowErrors=True)
+    assert 'DESIGN RULE VIOLATED: ' + ValidationRules.MULTIPLY_DRIVEN_PIN in (tmp_path / 'a.h').read_text()
+
+def writeRawCatalog(directory, mappings: dict, options) -> None:
+    for name, mapping in mappings.items():
+        directory.joinpath(name).mkdir(parents=True)
+        RawBackend.writeMappingfile(directory.joinpath(name, 'mapping' + RawBackend.getDataFileEnding()), mapping)
+        RawBackend.writeOptionsfile(directory.joinpath(name, 'options' + RawBackend.getDataFileEnding()), options)
+
+def test_catalogs_of_both_kinds(tmp_path, validMapping, exampleOptions):
+    writeRawCatalog(tmp_path / 'raw', {'B': validMapping, 'A': validMapping}, exampleOptions)
+    SqliteBackend.writeBundle(tmp_path / 'catalog.sqlite', validMapping, exampleOptions, "", name='C')
+    written = writeCatalogFirmwareFiles(tmp_path / 'raw', RawBackend, tmp_path / 'out', JsonConfigBackend)
+    assert [path.name for path in written] == ['A.json', 'B.json']
+    written = writeCatalogFirmwareFiles(tmp_path / 'catalog.sqlite', SqliteBackend, tmp_path / 'out')
+    assert [path.name for path in written] == ['C.h']
+
+def test_catalog_with_invalid_adapter_is_refused_before_writing(tmp_path, validMapping, invalidMapping, exampleOptions):
+    writeRawCatalog(tmp_path / 'raw', {'A': validMapping, 'B': invalidMapping}, exampleOptions)
+    with pytest.raises(Exception, match="B"):
+        writeCatalogFirmwareFiles(tmp_path / 'raw', RawBackend, tmp_path / 'out')
+    assert not (tmp_path / 'out').exists()
+    written = writeCatalogFirmwareFiles(tmp_path / 'raw', RawBackend, tmp_path / 'out', allowErrors=True)
+    assert len(written) == 2
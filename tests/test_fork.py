@@ -0,0 +1,69 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+
+from pinmap.filebackend import MappingColumnLabels
+
+from test_adapter_updates import drain, pinSelectors
+
+def busMember(adapter) -> int:
+    return next(member.mappingIdx for bus, members in adapter.buses.items() if bus != '' for member in members['Members'])
+
+def test_snapshot_does_not_create_pin_cells(adapterModule, exampleFiles):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles)
+        await drain(adapter)
+        snapshot = adapter.snapshot()
+        assert not snapshot.frontendGenerated
+        assert snapshot.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].equals(adapter.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY])
+        assert not snapshot.frontendGenerated
+        adapter.close()
+    asyncio.run(scenario())
+
+def test_fork_edits_are_merged_back(adapterModule, exampleFiles):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles)
+        await drain(adapter)
+        mappingIdx = busMember(adapter)
+        fork       = adapter.fork('test')
+        option     = fork.selectorOptions(mappingIdx)[1]
+        fork.updateMapping(mappingIdx, option)
+        assert fork.frontendGenerated and len(fork.pinCells) == len(adapter.mapping)
+        bus = fork.mapping.loc[mappingIdx, MappingColumnLabels.BUS]
+        assert fork.buses[bus]['Module-Key'] >= 0 and adapter.buses[bus]['Module-Key'] == -1
+        assert adapter.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] == -1
+        assert fork.changes.summary()['added'] == 1
+
+        # A fork of the edited fork derives the bus modules from its own mapping.
+        child = fork.fork('child')
+        assert child.buses[bus]['Module-Key'] == fork.buses[bus]['Module-Key']
+        child.discard()
+
+        conflicts = fork.mergeBack()
+        assert len(conflicts) == 0
+        assert adapter.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC] == fork.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC]
+        assert adapter.buses[bus]['Module-Key'] == fork.buses[bus]['Module-Key']
+        fork.discard()
+        assert adapter.forks == []
+        adapter.close()
+    asyncio.run(scenario())
+
+def test_merge_into_lazy_parent_does_not_create_widgets(adapterModule, exampleFiles):
+    async def scenario():
+        adapter    = adapterModule.Adapter(generate=exampleFiles, lazy=True, guiUpdateCoalesceTime=0.0)
+        fork       = adapter.fork('test')
+        mappingIdx = busMember(fork)
+        fork.updateMapping(mappingIdx, fork.selectorOptions(mappingIdx)[1])
+        fork.mergeBack()
+        assert not adapter.frontendGenerated
+        option = fork.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC]
+        assert adapter.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC] == option
+        bus = fork.mapping.loc[mappingIdx, MappingColumnLabels.BUS]
+        assert adapter.buses[bus]['Module-Key'] == fork.buses[bus]['Module-Key']
+        await drain(adapter)
+        assert pinSelectors(adapter)[mappingIdx].value == option
+        adapter.close()
+    asyncio.run(scenario())
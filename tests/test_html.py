@@ -0,0 +1,75 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+import threading
+
+from pinmap.filebackend.html import HtmlBackend
+
+from test_adapter_updates import drain, pinSelectors, waitFor
+
+def test_report_is_standalone_document(adapterModule, exampleFiles, tmp_path):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, exportPath=tmp_path, backendReport=HtmlBackend)
+        await drain(adapter)
+        adapter.notes = "* first note"
+        report = HtmlBackend.renderReport(adapter)
+        assert report.startswith('<!DOCTYPE html>') and report.count('<svg') > 0 and '<li>first note</li>' in report
+        assert not HtmlBackend.renderReport(adapter, standalone=False).startswith('<!DOCTYPE html>')
+        adapter.close()
+    asyncio.run(scenario())
+
+def test_report_preview_is_rendered_once_outside_of_the_mapping_lock(adapterModule, exampleFiles, monkeypatch):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, guiUpdateCoalesceTime=0.0, guiPreviewDelay=0.5)
+        await drain(adapter)
+        renders = []
+        renderReport = HtmlBackend.renderReport
+        def countingRenderReport(adapterObj, *args, **kwargs):
+            # The mapping lock is reentrant, it can only be acquired from another thread if nobody holds it.
+            lockFree = []
+            probe = threading.Thread(target=lambda: lockFree.append(adapter.mappingLock.acquire(timeout=1.0) and adapter.mappingLock.release() is None))
+            probe.start()
+            probe.join()
+            renders.append((threading.current_thread(), lockFree == [True]))
+            return renderReport(adapterObj, *args, **kwargs)
+        monkeypatch.setattr(HtmlBackend, 'renderReport', staticmethod(countingRenderReport))
+        preview = adapter.reportPreview
+        before  = preview.value
+        assert len(renders) == 1
+        selectors = pinSelectors(adapter)
+        for mappingIdx in [1, 2, 3]:
+            selectors[mappingIdx].value = selectors[mappingIdx].options[1]
+            await drain(adapter)
+        adapter.noteBox.value = "typed"
+        adapter.noteBox.value = "typed note"
+        assert len(renders) == 1
+        await waitFor(lambda: preview.value != before and 'typed note' in preview.value)
+        await drain(adapter)
+        assert len(renders) == 2
+        assert renders[1][0] is not threading.main_thread() and renders[1][1]
+        adapter.close()
+    asyncio.run(scenario())
+
+def test_closing_twice_stops_the_report_preview_once(adapterModule, exampleFiles, monkeypatch):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, guiPreviewDelay=60.0)
+        await drain(adapter)
+        adapter.reportPreview
+        preview    = adapter._reportPreview
+        unobserve  = adapter.noteBox.unobserve
+        unobserved = []
+        def countingUnobserve(handler, *args, **kwargs):
+            unobserved.append(handler)
+            return unobserve(handler, *args, **kwargs)
+        monkeypatch.setattr(adapter.noteBox, 'unobserve', countingUnobserve)
+        adapter.noteBox.value = "scheduled"
+        adapter.close()
+        assert preview._timer is None and len(adapter.mappingListeners) == 0
+        assert not hasattr(adapter, '_reportPreview')
+        preview.close()
+        adapter.close()
+        assert unobserved.count(preview._schedule) == 1
+    asyncio.run(scenario())
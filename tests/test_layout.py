@@ -0,0 +1,41 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pandas as pd
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.layout import PinGridLayout
+
+def stackedMapping() -> pd.DataFrame:
+    """Two connectors: J1 is a sparse 2x3 grid with a missing pin, J2 a single column with a gap in its row numbers."""
+    return pd.DataFrame({
+            MappingColumnLabels.CONNECTOR:      ['J1', 'J1', 'J1', 'J1', 'J1', 'J2', 'J2', 'J2'],
+            MappingColumnLabels.PINGRID_COLUMN: ['A',  'A',  'B',  'C',  'C',  'A',  'A',  'A'],
+            MappingColumnLabels.PINGRID_ROW:    [1,    2,    1,    1,    2,    1,    2,    10],
+        })
+
+def test_connectors_have_own_populated_grids():
+    layout = PinGridLayout(stackedMapping())
+    assert layout.connectors == ['J1', 'J2']
+    assert layout.connectorShape('J1') == (2, 3)
+    assert layout.connectorShape('J2') == (3, 1)
+    assert layout.shape == (5, 3)
+    assert layout.position(4) == ('J1', 1, 2)
+    assert layout.position(7) == ('J2', 2, 0)
+    assert layout.connectorMembers('J2').index.tolist() == [5, 6, 7]
+
+def test_mapping_without_connector_is_one_grid(exampleMapping):
+    layout = PinGridLayout(exampleMapping.drop(columns=[MappingColumnLabels.CONNECTOR], errors='ignore'))
+    assert layout.connectors == ['']
+    assert layout.shape == (exampleMapping[MappingColumnLabels.PINGRID_ROW].nunique(), exampleMapping[MappingColumnLabels.PINGRID_COLUMN].nunique())
+
+def test_paginate_skips_empty_pages():
+    pages = PinGridLayout(stackedMapping()).paginate(numColsPerPage=2, numRowsPerPage=2)
+    assert [(page.connector, page.pageColumn, page.pageRow) for page in pages] == [('J1', 0, 0), ('J1', 1, 0), ('J2', 0, 0), ('J2', 0, 1)]
+    assert pages[0].entries.index.tolist() == [0, 1, 2]
+    assert (pages[0].numTables, pages[0].numTableRows) == (2, 2)
+    assert pages[1].entries.loc[4, ['Table-Index', 'Table-Row']].tolist() == [0, 1]
+    assert (pages[3].numTables, pages[3].numTableRows) == (1, 1)
+    assert sum(len(page.entries) for page in pages) == len(stackedMapping())
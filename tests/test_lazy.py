@@ -0,0 +1,71 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+
+from test_adapter_updates import drain, pinSelectors
+
+def test_lazy_adapter_loads_stages_on_demand(adapterModule, exampleFiles, exampleMapping):
+    LoadStages = adapterModule.LoadStages
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, lazy=True, guiUpdateCoalesceTime=0.0)
+        assert adapter.mapping[MappingColumnLabels.SIGNAL].equals(exampleMapping[MappingColumnLabels.SIGNAL])
+        assert not hasattr(adapter, '_options') and not adapter.frontendGenerated
+        assert set(adapter.loadTimings) == {LoadStages.MAPPING, LoadStages.INIT}
+
+        # Queries derive the options, but do not create any widget.
+        assert len(adapter.hostPins(module=adapter.options.modules['names'].iloc[0])) > 0
+        assert not adapter.frontendGenerated
+        assert LoadStages.OPTIONS in adapter.loadTimings
+
+        adapter.mappingFrontEnd
+        assert adapter.frontendGenerated and LoadStages.FRONTEND in adapter.loadTimings
+        # Until the update loop ran, every pin-selector only offers its current value.
+        assert all(tuple(pinSelector.options) == ('',) for pinSelector in pinSelectors(adapter).values())
+        await drain(adapter)
+        assert LoadStages.SELECTOR_OPTIONS in adapter.loadTimings
+        assert len(pinSelectors(adapter)[1].options) > 1
+
+        pinSelector = pinSelectors(adapter)[1]
+        option      = pinSelector.options[1]
+        pinSelector.value = option
+        await drain(adapter)
+        assert adapter.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] == option
+        adapter.close()
+    asyncio.run(scenario())
+
+def test_lazy_and_eager_adapters_show_same_options(adapterModule, exampleFiles):
+    async def scenario():
+        eager = adapterModule.Adapter(generate=exampleFiles, guiUpdateCoalesceTime=0.0)
+        lazy  = adapterModule.Adapter(generate=exampleFiles, lazy=True, guiUpdateCoalesceTime=0.0)
+        lazy.mappingFrontEnd
+        await drain(eager)
+        await drain(lazy)
+        eagerOptions = {mappingIdx: tuple(pinSelector.options) for mappingIdx, pinSelector in pinSelectors(eager).items()}
+        lazyOptions  = {mappingIdx: tuple(pinSelector.options) for mappingIdx, pinSelector in pinSelectors(lazy).items()}
+        assert lazyOptions == eagerOptions
+        eager.close()
+        lazy.close()
+    asyncio.run(scenario())
+
+def test_failed_widget_creation_is_retried(adapterModule, exampleFiles, monkeypatch):
+    async def scenario():
+        adapter  = adapterModule.Adapter(generate=exampleFiles, lazy=True)
+        generate = adapter._generateFrontendElements
+        def failingGenerate():
+            raise Exception("generation failed")
+        monkeypatch.setattr(adapter, '_generateFrontendElements', failingGenerate)
+        with pytest.raises(Exception, match="generation failed"):
+            adapter.mappingFrontEnd
+        assert not adapter.frontendGenerated
+        monkeypatch.setattr(adapter, '_generateFrontendElements', generate)
+        assert len(pinSelectors(adapter)) == len(adapter.mapping)
+        assert adapter.frontendGenerated
+        adapter.close()
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import types
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.listeners import MappingListeners
+
+def test_only_changed_rows_are_reported(exampleMapping):
+    adapter   = types.SimpleNamespace(mapping=exampleMapping.copy())
+    listeners = MappingListeners(adapter)
+    reported  = []
+    listener  = lambda source, previous, current: reported.append((source, previous, current))
+    listeners.add(listener)
+    listeners.add(listener)
+    with listeners.change():
+        adapter.mapping.loc[3, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = 7
+        adapter.mapping.loc[3, MappingColumnLabels.PRIMARY]               = 'x'
+    with listeners.change():
+        pass
+    assert len(reported) == 1
+    (source, previous, current) = reported[0]
+    assert source is adapter and previous.index.tolist() == [3] and current.index.tolist() == [3]
+    assert (previous.loc[3, MappingColumnLabels.MAPPED_PINMODFUNC_KEY], current.loc[3, MappingColumnLabels.MAPPED_PINMODFUNC_KEY]) == (-1, 7)
+
+    listeners.remove(listener)
+    with listeners.change():
+        adapter.mapping.loc[4, MappingColumnLabels.PRIMARY] = 'x'
+    assert len(reported) == 1 and len(listeners) == 0
+
+def test_reloaded_pins_are_reported_as_changed(exampleMapping):
+    adapter   = types.SimpleNamespace(mapping=exampleMapping.copy())
+    listeners = MappingListeners(adapter)
+    reported  = []
+    listeners.add(lambda source, previous, current: reported.append(current.index.tolist()))
+    with listeners.change():
+        adapter.mapping = exampleMapping.iloc[:-1].copy()
+    assert reported == []
+    with listeners.change():
+        adapter.mapping = exampleMapping.copy()
+    assert reported == [[len(exampleMapping) - 1]]
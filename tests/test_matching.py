@@ -0,0 +1,78 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+import itertools
+import threading
+
+import numpy as np
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.matching import matchPins
+
+from test_adapter_updates import drain, pinSelectors
+
+def assertValid(matches: dict, candidates: dict, pinKeys: np.ndarray, modFuncKeys: np.ndarray) -> None:
+    for member, pinModFuncKey in matches.items():
+        assert pinModFuncKey in candidates[member]
+    keys = list(matches.values())
+    assert len(set(pinKeys[keys])) == len(keys)
+    assert len(set(modFuncKeys[keys])) == len(keys)
+
+def test_match_displaces_owner_onto_free_pin():
+    pinKeys     = np.array([0, 1, 0])
+    modFuncKeys = np.array([10, 11, 12])
+    candidates  = {'B': [0, 1], 'A': [2]}
+    matches     = matchPins(candidates, pinKeys, modFuncKeys)
+    assert matches == {'B': 1, 'A': 2}
+
+def test_match_never_shares_module_function_of_displaced_owner():
+    pinKeys     = np.array([0, 1, 0])
+    modFuncKeys = np.array([10, 11, 11])
+    candidates  = {'B': [0, 1], 'A': [2]}
+    matches     = matchPins(candidates, pinKeys, modFuncKeys)
+    assertValid(matches, candidates, pinKeys, modFuncKeys)
+    assert matches == {'B': 0}
+
+def test_match_random_candidates_are_conflict_free():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        pinKeys     = rng.integers(0, 4, size=8)
+        modFuncKeys = rng.integers(0, 4, size=8)
+        candidates  = {member: rng.choice(8, size=rng.integers(0, 4), replace=False).tolist() for member in range(4)}
+        matches     = matchPins(candidates, pinKeys, modFuncKeys)
+        assertValid(matches, candidates, pinKeys, modFuncKeys)
+
+def test_match_is_maximum_when_module_functions_are_distinct():
+    pinKeys     = np.array([0, 1, 2, 0, 1])
+    modFuncKeys = np.arange(5)
+    candidates  = {'A': [0, 1], 'B': [3], 'C': [4, 2]}
+    matches     = matchPins(candidates, pinKeys, modFuncKeys)
+    best        = max(len(set(pinKeys[list(keys)])) for keys in itertools.product(*candidates.values()))
+    assert len(matches) == best
+
+def test_bus_assignment_updates_widgets_on_the_update_loop(adapterModule, exampleFiles, monkeypatch):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, guiAsyncUpdates=False)
+        await drain(adapter)
+        updatedOn      = []
+        updateFrontend = adapter.updateFrontend
+        def recordingUpdateFrontend(pinSelector):
+            updatedOn.append(threading.current_thread())
+            updateFrontend(pinSelector)
+        monkeypatch.setattr(adapter, 'updateFrontend', recordingUpdateFrontend)
+        bus = next(bus for bus in adapter.buses if bus != '')
+        for moduleKey in adapter.options.modules.index:
+            assigned = adapter.assignBus(bus, moduleKey)
+            if (assigned != '').any():
+                break
+        assert (assigned != '').any()
+        await drain(adapter)
+        assert len(updatedOn) > 0 and threading.main_thread() not in updatedOn
+        selectors = pinSelectors(adapter)
+        for mappingIdx, option in assigned.items():
+            assert selectors[mappingIdx].value == adapter.mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC]
+        adapter.close()
+    asyncio.run(scenario())
@@ -0,0 +1,60 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from conftest import optionLabels
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.diff import recomputePrimaries
+from pinmap.reload import ReloadReasons, remapMapping
+
+def twoConnectorMapping(exampleMapping):
+    mapping = exampleMapping.iloc[[1, 1]].reset_index(drop=True)
+    mapping.insert(0, MappingColumnLabels.CONNECTOR, ['J1', 'J2'])
+    return mapping
+
+def assign(mapping, labels, keys):
+    mapping = mapping.copy()
+    mapping[MappingColumnLabels.MAPPED_PINMODFUNC]     = [labels[key] if key != -1 else '' for key in keys]
+    mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = keys
+    mapping[MappingColumnLabels.PRIMARY]               = ['x' if key != -1 else '' for key in keys]
+    return mapping
+
+def test_reload_carries_assignments_per_connector(exampleMapping, exampleOptions):
+    labels     = optionLabels(exampleOptions)
+    newMapping = twoConnectorMapping(exampleMapping)
+    oldMapping = assign(newMapping, labels, [1, -1])
+    (mapping, report) = remapMapping(oldMapping, exampleOptions, newMapping, exampleOptions, labels)
+    assert mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].tolist() == [1, -1]
+    assert len(report.invalid) == 0
+    assert not report.structureChanged
+
+def test_reload_reports_regex_violations_per_connector(exampleMapping, exampleOptions):
+    labels     = optionLabels(exampleOptions)
+    newMapping = twoConnectorMapping(exampleMapping)
+    oldMapping = assign(newMapping, labels, [1, 2])   # CM8 - RTS_SCL_CSEL1 fits the regexes, SD - CMD does not.
+    (mapping, report) = remapMapping(oldMapping, exampleOptions, newMapping, exampleOptions, labels)
+    assert mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY].tolist() == [1, 2]
+    assert sorted(report.invalid['Reason']) == sorted([ReloadReasons.REGEX_MODULE, ReloadReasons.REGEX_FUNCTION])
+    assert report.invalid[MappingColumnLabels.CONNECTOR].tolist() == ['J2', 'J2']
+
+def test_reload_reports_removed_options(exampleMapping, exampleOptions):
+    labels     = optionLabels(exampleOptions)
+    oldMapping = assign(exampleMapping, labels, [1] + [-1] * (len(exampleMapping) - 1))
+    newOptions = type(exampleOptions)(exampleOptions.initTable.iloc[1:].reset_index(drop=True))
+    (mapping, report) = remapMapping(oldMapping, exampleOptions, exampleMapping, newOptions, optionLabels(newOptions))
+    assert (mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] == -1).all()
+    assert report.invalid['Reason'].tolist() == [ReloadReasons.OPTION_REMOVED]
+
+def test_reload_moves_conflict_tags_to_the_new_primary(exampleMapping, exampleOptions):
+    labels     = optionLabels(exampleOptions)
+    oldMapping = assign(exampleMapping, labels, [1, 1, 1] + [-1] * (len(exampleMapping) - 3))
+    recomputePrimaries(oldMapping)
+    assert oldMapping[MappingColumnLabels.PRIMARY].tolist()[:3] == ['x', '', '']
+    newMapping = exampleMapping.iloc[1:].reset_index(drop=True)
+    (mapping, report) = remapMapping(oldMapping, exampleOptions, newMapping, exampleOptions, labels)
+    newPrimary = mapping.iloc[0]
+    assert mapping[MappingColumnLabels.PRIMARY].tolist()[:2] == ['x', '']
+    assert mapping.loc[0, MappingColumnLabels.MAPPED_PINMODFUNC] == labels[1]
+    assert mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC].startswith("Pin>{}{}".format(newPrimary[MappingColumnLabels.PINGRID_COLUMN], newPrimary[MappingColumnLabels.PINGRID_ROW]))
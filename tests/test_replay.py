@@ -0,0 +1,77 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import numpy as np
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.replay import ReferenceModel, writeSyntheticBoards, randomEvents, replayEvents, writeEvents, readEvents, _applyEvent, _findDivergence
+
+@pytest.fixture
+def syntheticAdapter(adapterModule, tmp_path):
+    adapter = adapterModule.Adapter(generate=writeSyntheticBoards(tmp_path, numPins=60, numMcuPins=40, seed=1), guiAsyncUpdates=False)
+    yield adapter
+    adapter.close()
+
+def sharedPinEvents(adapter) -> tuple[tuple[int, int], tuple[int, int]]:
+    """Two assignments of different pins which use the same MCU pin with different module-function-combinations. Only pins
+    outside of buses are used, so their options do not depend on the modules of the buses."""
+    pinKeys     = adapter.options.pinModFunc['Pin-Key'].values
+    modFuncKeys = adapter.options.pinModFunc['ModFunc-Key'].values
+    singlePins  = np.flatnonzero(adapter.mapping[MappingColumnLabels.BUS].values == '')
+    for firstIdx in singlePins:
+        for firstKey in adapter.compatibility.pinModFuncKeys(firstIdx):
+            for secondIdx in singlePins[singlePins > firstIdx]:
+                for secondKey in adapter.compatibility.pinModFuncKeys(secondIdx):
+                    if pinKeys[secondKey] == pinKeys[firstKey] and modFuncKeys[secondKey] != modFuncKeys[firstKey]:
+                        return ((int(firstIdx), int(firstKey)), (int(secondIdx), int(secondKey)))
+    pytest.skip("No shared MCU pin in the synthetic boards.")
+
+def test_random_events_replay_consistently(syntheticAdapter):
+    for seed in range(3):
+        result = replayEvents(syntheticAdapter, randomEvents(syntheticAdapter, 100, seed=seed), optionsCheckInterval=10)
+        assert result.consistent, result.divergence
+        assert result.summary()['steps'] == 100
+    assert (syntheticAdapter.mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] == -1).all()
+
+def test_events_roundtrip(tmp_path):
+    events = [(1, 5), (3, -1)]
+    writeEvents(tmp_path / 'events.csv', events)
+    assert readEvents(tmp_path / 'events.csv') == events
+
+def test_released_pin_is_taken_over_by_its_other_user(syntheticAdapter):
+    (first, second) = sharedPinEvents(syntheticAdapter)
+    fork = syntheticAdapter.fork('test')
+    _applyEvent(fork, *first)
+    _applyEvent(fork, *second)
+    assert fork.mapping[MappingColumnLabels.PRIMARY].iloc[[first[0], second[0]]].tolist() == ['x', '']
+    _applyEvent(fork, first[0], -1)
+    assert fork.mapping.loc[second[0], MappingColumnLabels.PRIMARY] == 'x'
+    assert fork.mapping.loc[second[0], MappingColumnLabels.MAPPED_PINMODFUNC] == fork.optionLabels[second[1]]
+
+def test_reference_reports_shared_primary_and_conflict_tag(syntheticAdapter):
+    (first, second) = sharedPinEvents(syntheticAdapter)
+    fork      = syntheticAdapter.fork('test')
+    reference = ReferenceModel(fork)
+    for event in [first, second]:
+        _applyEvent(fork, *event)
+        reference.apply(*event)
+    assert _findDivergence(fork, reference, True) is None
+    busModuleKeys = reference.busModuleKeys()
+    primary       = (fork.mapping[MappingColumnLabels.PRIMARY] != '').tolist()
+    assert reference.selectorOptions(second[0], busModuleKeys, primary)[second[1]].startswith("Pin>")
+
+    fork.mapping.loc[second[0], MappingColumnLabels.PRIMARY]           = 'x'
+    fork.mapping.loc[second[0], MappingColumnLabels.MAPPED_PINMODFUNC] = fork.optionLabels[second[1]]
+    assert _findDivergence(fork, reference, False) == (MappingColumnLabels.PRIMARY, second[0], False, True)
+
+def test_reference_requires_conflict_free_pins_to_be_primary(syntheticAdapter):
+    fork      = syntheticAdapter.fork('test')
+    reference = ReferenceModel(fork)
+    (mappingIdx, pinModFuncKey) = sharedPinEvents(fork)[0]
+    _applyEvent(fork, mappingIdx, pinModFuncKey)
+    reference.apply(mappingIdx, pinModFuncKey)
+    fork.mapping.loc[mappingIdx, MappingColumnLabels.PRIMARY] = ''
+    assert reference.primaryViolation((fork.mapping[MappingColumnLabels.PRIMARY] != '').tolist()) == (mappingIdx, True, False)
@@ -0,0 +1,73 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import types
+
+import pytest
+
+graphics  = pytest.importorskip('pinmap.document.graphics')
+pagestyle = pytest.importorskip('pinmap.document.pagestyle')
+
+class CountingImageReader(object):
+    opened = []
+
+    def __init__(self, path: str) -> None:
+        CountingImageReader.opened.append(path)
+
+    def getSize(self) -> tuple[int, int]:
+        return (200, 100)
+
+class RecordingCanvas(object):
+    """Canvas stand-in which records the drawing calls and the form XObjects of one document."""
+    def __init__(self) -> None:
+        self.forms       = set()
+        self.calls       = []
+        self._pageNumber = 0
+
+    def hasForm(self, name: str) -> bool:
+        return name in self.forms
+
+    def beginForm(self, name: str) -> None:
+        self.forms.add(name)
+        self.calls.append(('beginForm', name))
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self.calls.append((name, ) + args)
+
+@pytest.fixture
+def countingImages(monkeypatch):
+    CountingImageReader.opened = []
+    monkeypatch.setattr(graphics, 'ImageReader', CountingImageReader)
+    graphics.getImageReader.cache_clear()
+    graphics.getImageSize.cache_clear()
+    yield CountingImageReader.opened
+    graphics.getImageReader.cache_clear()
+    graphics.getImageSize.cache_clear()
+
+def test_logo_is_read_once(countingImages, tmp_path):
+    logoPath = tmp_path / 'logo.png'
+    for _ in range(3):
+        graphics.getImageReader(logoPath)
+        (width, height) = graphics.getImageSize(logoPath)
+    assert countingImages == [str(logoPath)]
+    assert width == pytest.approx(2 * height)
+
+def test_static_decorations_are_drawn_once_per_document(countingImages, tmp_path):
+    doc    = types.SimpleNamespace(topMargin=10, leftMargin=10, bottomMargin=10, width=500, height=800)
+    canvas = RecordingCanvas()
+    for pageNumber in [1, 2, 3]:
+        canvas._pageNumber = pageNumber
+        pagestyle.logosInternalPagenumber(canvas, doc, headerLogoPath=tmp_path / 'header.png', footerLogoPath=tmp_path / 'footer.png', numPages=3, filename='report')
+    calls = [call[0] for call in canvas.calls]
+    assert calls.count('beginForm') == 2 and calls.count('doForm') == 6
+    assert calls.count('drawImage') == 2
+    assert [call[3] for call in canvas.calls if call[0] == 'drawRightString' and '/' in str(call[3])] == ['1/3', '2/3', '3/3']
+    assert len(countingImages) == 2
+
+def test_decorations_without_logo(tmp_path):
+    doc    = types.SimpleNamespace(topMargin=10, leftMargin=10, bottomMargin=10, width=500, height=800)
+    canvas = RecordingCanvas()
+    pagestyle.logosInternalPagenumber(canvas, doc, numPages=1, filename='report')
+    assert 'drawImage' not in [call[0] for call in canvas.calls]
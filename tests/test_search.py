@@ -0,0 +1,64 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+import re
+
+import numpy as np
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.reload import optionKeyTable
+from pinmap.search import OptionsSearchIndex
+
+from test_adapter_updates import drain, pinSelectors
+
+def bruteForceSearch(options, query: str, prefix: bool) -> list[int]:
+    """Reference implementation of OptionsSearchIndex.search which scans the tokens of every key."""
+    terms = [term for term in re.split(r'[\s\-]+', query.lower()) if len(term) > 0]
+    keys  = []
+    for pinModFuncKey, tokens in enumerate(optionKeyTable(options).astype(str).values.tolist()):
+        tokens = [token.lower() for token in tokens]
+        if all(any(token.startswith(term) if prefix else term in token for token in tokens) for term in terms):
+            keys.append(pinModFuncKey)
+    return keys
+
+@pytest.fixture
+def searchIndex(exampleOptions) -> OptionsSearchIndex:
+    return OptionsSearchIndex(exampleOptions)
+
+@pytest.mark.parametrize('prefix', [False, True])
+def test_search_matches_scan(searchIndex, exampleOptions, prefix):
+    names   = optionKeyTable(exampleOptions).astype(str)
+    queries = ["", "a", "spi", "SPI CS", "pi", "gpio - io", "no-such-token"]
+    queries += [names.iloc[0, column] for column in range(names.shape[1])]
+    queries += [names.iloc[len(names) // 2, 2] + " " + names.iloc[len(names) // 2, 3][:2]]
+    for query in queries:
+        assert searchIndex.search(query, prefix=prefix).tolist() == bruteForceSearch(exampleOptions, query, prefix), query
+
+def test_search_is_restricted_to_allowed_keys(searchIndex, exampleOptions):
+    allowedKeys = np.arange(0, len(exampleOptions.pinModFunc), 3)
+    expected    = [key for key in bruteForceSearch(exampleOptions, "spi", False) if key in set(allowedKeys)]
+    assert searchIndex.search("spi", allowedKeys).tolist() == expected
+    assert searchIndex.search("", allowedKeys).tolist() == allowedKeys.tolist()
+
+def test_combobox_narrows_options_while_typing(adapterModule, exampleFiles):
+    async def scenario():
+        adapter = adapterModule.Adapter(generate=exampleFiles, guiUpdateCoalesceTime=0.0, guiSelectorMode='combobox', guiSearchMaxOptions=3)
+        await drain(adapter)
+        pinSelector = pinSelectors(adapter)[1]
+        option      = pinSelector.menuOptions[1]
+        query       = option.split(' - ')[-2]
+        pinSelector.value = query
+        await drain(adapter)
+        assert adapter.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] == -1
+        assert 0 < len(pinSelector.options) <= 3
+        assert all(label in adapter.searchOptions(query, mappingIdx=1) for label in pinSelector.options)
+        pinSelector.value = option
+        await drain(adapter)
+        assert adapter.mapping.loc[1, MappingColumnLabels.MAPPED_PINMODFUNC] == option
+        assert option in pinSelector.options
+        adapter.close()
+    asyncio.run(scenario())
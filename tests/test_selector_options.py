@@ -0,0 +1,39 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+
+from test_adapter_updates import drain, pinSelectors
+
+def test_unchanged_options_are_not_sent_again(adapterModule, exampleFiles, monkeypatch):
+    async def scenario():
+        adapter   = adapterModule.Adapter(generate=exampleFiles, guiUpdateCoalesceTime=0.0)
+        await drain(adapter)
+        selectors = pinSelectors(adapter)
+        # Count the assignments of options, traitlets would not report an assignment of equal options as change.
+        sent = {mappingIdx: 0 for mappingIdx in selectors}
+        def countingSetattr(pinSelector, name, value, setattr=adapterModule.PinSelector.__setattr__):
+            if name == 'options':
+                sent[pinSelector.mappingIdx] += 1
+            setattr(pinSelector, name, value)
+        monkeypatch.setattr(adapterModule.PinSelector, '__setattr__', countingSetattr)
+
+        changedSelector = selectors[1]
+        option          = changedSelector.options[1]
+        changedSelector.value = option
+        await drain(adapter)
+        assert 0 < sum(count > 0 for count in sent.values()) < len(selectors)
+        assert all(pinSelector.optionsHash == hash(tuple(pinSelector.options)) for pinSelector in selectors.values())
+
+        before = dict(sent)
+        for pinSelector in selectors.values():
+            adapter._updateSelectorOptions(pinSelector)
+        assert sent == before
+
+        changedSelector.optionsHash = None
+        adapter._updateSelectorOptions(changedSelector)
+        assert sent[1] == before[1] + 1
+        adapter.close()
+    asyncio.run(scenario())
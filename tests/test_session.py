@@ -0,0 +1,70 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import asyncio
+import os
+import shutil
+
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.session import SessionSnapshot
+
+from test_adapter_updates import drain, pinSelectors
+
+@pytest.fixture
+def copiedFiles(exampleFiles, tmp_path):
+    """Copies of the example files, so their modification times can be changed."""
+    return tuple(shutil.copy(path, tmp_path / path.name) for path in exampleFiles)
+
+def test_session_is_restored_until_sources_change(adapterModule, copiedFiles, tmp_path):
+    async def scenario():
+        sessionPath = tmp_path / 'adapter.session'
+        adapter     = adapterModule.Adapter(generate=copiedFiles, sessionPath=sessionPath, guiUpdateCoalesceTime=0.0)
+        await drain(adapter)
+        assert not adapter.sessionRestored
+        pinSelector = pinSelectors(adapter)[1]
+        pinSelector.value = pinSelector.options[1]
+        await drain(adapter)
+        adapter.saveSession()
+        adapter.close()
+
+        restored = adapterModule.Adapter(generate=copiedFiles, sessionPath=sessionPath)
+        await drain(restored)
+        assert restored.sessionRestored
+        assert restored.mapping[MappingColumnLabels.MAPPED_PINMODFUNC].equals(adapter.mapping[MappingColumnLabels.MAPPED_PINMODFUNC])
+        assert pinSelectors(restored)[1].options == pinSelectors(adapter)[1].options
+        restored.close()
+
+        stat = os.stat(copiedFiles[0])
+        os.utime(copiedFiles[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        regenerated = adapterModule.Adapter(generate=copiedFiles, sessionPath=sessionPath)
+        assert not regenerated.sessionRestored
+        regenerated.close()
+    asyncio.run(scenario())
+
+def test_saving_a_lazy_adapter_does_not_create_its_widgets(adapterModule, copiedFiles, tmp_path):
+    async def scenario():
+        sessionPath = tmp_path / 'adapter.session'
+        adapter     = adapterModule.Adapter(generate=copiedFiles, sessionPath=sessionPath, lazy=True)
+        adapter.saveSession()
+        assert not adapter.frontendGenerated
+        adapter.close()
+
+        restored = adapterModule.Adapter(generate=copiedFiles, sessionPath=sessionPath, lazy=True)
+        assert restored.sessionRestored and not restored.frontendGenerated
+        assert len(pinSelectors(restored)) == len(restored.mapping)
+        restored.close()
+    asyncio.run(scenario())
+
+def test_unreadable_or_foreign_session_is_ignored(tmp_path, exampleMapping, exampleOptions):
+    sessionPath = tmp_path / 'adapter.session'
+    SessionSnapshot('A', (1, ), exampleMapping, exampleOptions, "", {}, {}, {}).write(sessionPath)
+    assert SessionSnapshot.read(sessionPath, 'A', (1, )).mapping.equals(exampleMapping)
+    assert SessionSnapshot.read(sessionPath, 'B', (1, )) is None
+    assert SessionSnapshot.read(sessionPath, 'A', (2, )) is None
+    sessionPath.write_bytes(b'not a pickle')
+    assert SessionSnapshot.read(sessionPath, 'A', (1, )) is None
+    assert SessionSnapshot.read(tmp_path / 'missing.session', 'A', (1, )) is None
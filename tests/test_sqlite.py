@@ -0,0 +1,99 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import sqlite3
+
+import pytest
+
+from pinmap.diff import diffRevisions
+from pinmap.filebackend import MappingColumnLabels, OptionsColumnLabels
+from pinmap.filebackend.sqlite import SqliteBackend
+
+from conftest import optionLabels
+
+STATE_COLUMNS = [MappingColumnLabels.MAPPED_PINMODFUNC, MappingColumnLabels.MAPPED_PINMODFUNC_KEY, MappingColumnLabels.PRIMARY]
+
+def assign(mapping, labels: list[str], mappingIdx: int, pinModFuncKey: int):
+    mapping = mapping.copy()
+    mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC]     = labels[pinModFuncKey]
+    mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = pinModFuncKey
+    mapping.loc[mappingIdx, MappingColumnLabels.PRIMARY]               = 'x'
+    return mapping
+
+def states(mapping) -> list:
+    return mapping[STATE_COLUMNS].astype(str).values.tolist()
+
+def test_revisions_are_read_back_from_history(tmp_path, exampleMapping, exampleOptions):
+    catalog = tmp_path / 'catalog.sqlite'
+    labels  = optionLabels(exampleOptions)
+    written = [exampleMapping]
+    written.append(assign(written[-1], labels, 0, 1))
+    written.append(assign(written[-1], labels, 2, 3))
+    for mapping in written:
+        SqliteBackend.writeBundle(catalog, mapping, exampleOptions, "notes", name='A')
+    SqliteBackend.writeBundle(catalog, exampleMapping, exampleOptions, "", name='B')
+
+    history = SqliteBackend.history(catalog, 'A')
+    assert history['Changed-Rows'].tolist() == [len(exampleMapping), 1, 1]
+    revisions = [SqliteBackend.readRevision(catalog, 'A', revisionId) for revisionId in history['Revision-Id']]
+    assert [states(mapping) for mapping in revisions] == [states(mapping) for mapping in written]
+    assert states(SqliteBackend.readRevision(catalog, 'A')) == states(written[-1])
+    assert list(revisions[0].columns) == list(exampleMapping.columns)
+
+    diffs = diffRevisions(revisions)
+    assert [diff.summary()['added'] for diff in diffs] == [1, 1]
+
+def test_revision_after_structural_change(tmp_path, exampleMapping, exampleOptions):
+    catalog = tmp_path / 'catalog.sqlite'
+    labels  = optionLabels(exampleOptions)
+    SqliteBackend.writeBundle(catalog, assign(exampleMapping, labels, 5, 1), exampleOptions, "", name='A')
+    shorter = exampleMapping.iloc[:4].copy()
+    SqliteBackend.writeBundle(catalog, shorter, exampleOptions, "", name='A')
+    (first, second) = SqliteBackend.history(catalog, 'A')['Revision-Id']
+    assert len(SqliteBackend.readRevision(catalog, 'A', first)) == len(exampleMapping)
+    assert states(SqliteBackend.readRevision(catalog, 'A', second)) == states(shorter)
+
+def test_unknown_revision(tmp_path, exampleMapping, exampleOptions):
+    catalog = tmp_path / 'catalog.sqlite'
+    SqliteBackend.writeBundle(catalog, exampleMapping, exampleOptions, "", name='A')
+    with pytest.raises(Exception):
+        SqliteBackend.readRevision(catalog, 'A', 100)
+    with pytest.raises(Exception):
+        SqliteBackend.readRevision(catalog, 'B')
+
+def test_catalog_queries(tmp_path, exampleMapping, exampleOptions):
+    catalog = tmp_path / 'catalog.sqlite'
+    labels  = optionLabels(exampleOptions)
+    mapping = assign(exampleMapping, labels, 0, 1)
+    SqliteBackend.writeBundle(catalog, mapping, exampleOptions, "", name='A')
+    SqliteBackend.writeBundle(catalog, mapping, exampleOptions, "", name='A')
+    adapters = SqliteBackend.listAdapters(catalog)
+    assert adapters['Name'].tolist() == ['A'] and adapters['Revisions'].tolist() == [2]
+    mcuPin = exampleOptions.pins.iloc[int(exampleOptions.pinModFunc['Pin-Key'].iloc[1])][OptionsColumnLabels.MCU_PIN]
+    users  = SqliteBackend.findAdaptersUsingMcuPin(catalog, mcuPin)
+    assert users['Adapter'].tolist() == ['A']
+    (readMapping, readOptions, notes) = SqliteBackend.readBundle(catalog, name='A')
+    assert states(readMapping) == states(mapping) and len(readOptions.pinModFunc) == len(exampleOptions.pinModFunc)
+
+def test_queries_refuse_missing_catalog(tmp_path):
+    catalog = tmp_path / 'catalgo.sqlite'
+    for query in [lambda: SqliteBackend.listAdapters(catalog), lambda: SqliteBackend.findAdaptersUsingMcuPin(catalog, 'P0'), lambda: SqliteBackend.history(catalog, 'A')]:
+        with pytest.raises(Exception, match='does not exist'):
+            query()
+    assert not catalog.exists()
+
+def test_connection_is_closed_on_error(tmp_path, exampleMapping, exampleOptions, monkeypatch):
+    catalog = tmp_path / 'catalog.sqlite'
+    SqliteBackend.writeBundle(catalog, exampleMapping, exampleOptions, "", name='A')
+    connections = []
+    connect     = sqlite3.connect
+    def recordingConnect(*args, **kwargs):
+        connections.append(connect(*args, **kwargs))
+        return connections[-1]
+    monkeypatch.setattr(sqlite3, 'connect', recordingConnect)
+    with pytest.raises(Exception):
+        SqliteBackend.readRevision(catalog, 'A', 100)
+    with pytest.raises(sqlite3.ProgrammingError, match='closed'):
+        connections[0].execute("SELECT 1")
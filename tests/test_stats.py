@@ -0,0 +1,40 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.replay import writeSyntheticBoards, randomEvents, _applyEvent
+from pinmap.stats import UtilizationStats
+
+@pytest.fixture
+def syntheticFork(adapterModule, tmp_path):
+    """A fork of an adapter on synthetic boards, forks are edited through their PinCells without any widgets."""
+    adapter = adapterModule.Adapter(generate=writeSyntheticBoards(tmp_path, numPins=60, numMcuPins=40, seed=2), guiAsyncUpdates=False)
+    yield adapter.fork('test')
+    adapter.close()
+
+def countedState(stats: UtilizationStats) -> tuple:
+    return (stats.summary(), stats.modulesInUse, stats.busFill)
+
+def test_incremental_counters_match_recount(syntheticFork):
+    stats = syntheticFork.utilization
+    for event in randomEvents(syntheticFork, 60, seed=4):
+        _applyEvent(syntheticFork, *event)
+        recount = UtilizationStats(syntheticFork)
+        recount.close()
+        assert countedState(stats) == countedState(recount)
+    mapping = syntheticFork.mapping
+    assigned = mapping[mapping[MappingColumnLabels.MAPPED_PINMODFUNC_KEY] != -1]
+    assert stats.numAssigned == len(assigned)
+    assert stats.numShared == (assigned[MappingColumnLabels.PRIMARY] == '').sum()
+    assert str(stats.numUsedMcuPins) in stats.frontEnd.value
+
+def test_closed_stats_stop_following(syntheticFork):
+    stats = UtilizationStats(syntheticFork)
+    stats.close()
+    (mappingIdx, pinModFuncKey) = randomEvents(syntheticFork, 1, seed=1, clearShare=0.0)[0]
+    _applyEvent(syntheticFork, mappingIdx, pinModFuncKey)
+    assert stats.numAssigned == 0 and syntheticFork.utilization.numAssigned == 1
@@ -0,0 +1,90 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import json
+
+import pytest
+
+from pinmap import StandardStrings as PMTSTR
+from pinmap.filebackend import MappingColumnLabels
+from pinmap.reload import optionKeyTable
+from pinmap.validation import validateMapping, ValidationRules, ValidationSeverity
+
+def findKeys(options, moduleRegex: str, functionRegex: str) -> list[int]:
+    """pinModFunc keys whose module and function names fully match the regexes."""
+    names = optionKeyTable(options).astype(str)
+    found = names.iloc[:, 2].str.fullmatch(moduleRegex) & names.iloc[:, 3].str.fullmatch(functionRegex)
+    keys  = found.index[found].tolist()
+    if len(keys) == 0:
+        pytest.skip("No option of module {} and function {} in the example.".format(moduleRegex, functionRegex))
+    return keys
+
+def assign(mapping, assignments: dict):
+    mapping = mapping.copy()
+    for mappingIdx, pinModFuncKey in assignments.items():
+        mapping.loc[mappingIdx, MappingColumnLabels.MAPPED_PINMODFUNC_KEY] = pinModFuncKey
+        mapping.loc[mappingIdx, MappingColumnLabels.PRIMARY]               = 'x'
+    return mapping
+
+def flagged(report, rule: str) -> list[tuple]:
+    """Mapping rows reported for a rule, identified by Column and Row."""
+    issues = report.issues[report.issues['Rule'] == rule]
+    return sorted(zip(issues[MappingColumnLabels.PINGRID_COLUMN], issues[MappingColumnLabels.PINGRID_ROW]))
+
+def rows(mapping, mappingIdxs: list[int]) -> list[tuple]:
+    return sorted(zip(mapping.loc[mappingIdxs, MappingColumnLabels.PINGRID_COLUMN], mapping.loc[mappingIdxs, MappingColumnLabels.PINGRID_ROW]))
+
+def rowOf(mapping, signal: str) -> int:
+    return int(mapping.index[mapping[MappingColumnLabels.SIGNAL] == signal][0])
+
+def test_unassigned_mapping_only_warns_about_open_pins(exampleMapping, exampleOptions):
+    report = validateMapping(exampleMapping, exampleOptions)
+    assert report.ok and len(report.errors) == 0
+    openPins = exampleMapping.index[exampleMapping[MappingColumnLabels.STATUS].str.contains(PMTSTR.STATUS_OPEN)].tolist()
+    assert flagged(report, ValidationRules.OPEN_UNASSIGNED) == rows(exampleMapping, openPins)
+    assert (report.warnings['Severity'] == ValidationSeverity.WARNING).all()
+    assert json.loads(report.toJson())['summary'] == {ValidationRules.OPEN_UNASSIGNED: len(openPins)}
+
+def test_multiply_driven_pin(exampleMapping, exampleOptions):
+    (first, second) = (rowOf(exampleMapping, 'SPI0_CS0 (NOR)'), rowOf(exampleMapping, 'SPI0_CS1 (SD)'))
+    pinModFuncKey   = findKeys(exampleOptions, 'GPIO', '.*IO.*')[0]
+    report = validateMapping(assign(exampleMapping, {first: pinModFuncKey, second: pinModFuncKey}), exampleOptions)
+    assert not report.ok
+    assert flagged(report, ValidationRules.MULTIPLY_DRIVEN_PIN) == rows(exampleMapping, [first, second])
+    assert set(report.errors['Rule']) == {ValidationRules.MULTIPLY_DRIVEN_PIN}
+
+def test_bus_split_across_modules(exampleMapping, exampleOptions):
+    busRows  = exampleMapping.index[exampleMapping[MappingColumnLabels.BUS] == 'UART1'].tolist()[:2]
+    txKeys   = findKeys(exampleOptions, 'CM\\d+', '.*TX.*')
+    rxKeys   = findKeys(exampleOptions, 'CM\\d+', '.*RX.*')
+    modules  = optionKeyTable(exampleOptions).iloc[:, 2]
+    pinKeys  = exampleOptions.pinModFunc['Pin-Key']
+    pairs    = [(tx, rx) for tx in txKeys for rx in rxKeys if modules[tx] != modules[rx] and pinKeys[tx] != pinKeys[rx]]
+    if len(pairs) == 0:
+        pytest.skip("No TX and RX of different modules in the example.")
+    report = validateMapping(assign(exampleMapping, dict(zip(busRows, pairs[0]))), exampleOptions)
+    assert flagged(report, ValidationRules.BUS_SPLIT) == rows(exampleMapping, busRows)
+    assert set(report.errors['Rule']) == {ValidationRules.BUS_SPLIT}
+
+def test_supply_and_signal_must_not_be_mixed(exampleMapping, exampleOptions):
+    (supplyRow, signalRow) = (rowOf(exampleMapping, '5V0'), rowOf(exampleMapping, 'BUZZER'))
+    gpioKey   = findKeys(exampleOptions, 'GPIO', '.*')[0]
+    supplyKey = findKeys(exampleOptions, 'GND|3V3|5V.*', '.*')[0]
+    report = validateMapping(assign(exampleMapping, {supplyRow: gpioKey, signalRow: supplyKey}), exampleOptions)
+    assert flagged(report, ValidationRules.SUPPLY_MAPPED_TO_SIGNAL) == rows(exampleMapping, [supplyRow])
+    assert flagged(report, ValidationRules.SIGNAL_MAPPED_TO_SUPPLY) == rows(exampleMapping, [signalRow])
+    assert flagged(report, ValidationRules.REGEX_MODULE) == rows(exampleMapping, [supplyRow, signalRow])
+
+def test_regex_function_violation(exampleMapping, exampleOptions):
+    mappingIdx    = rowOf(exampleMapping, 'SPI0_MISO')
+    pinModFuncKey = findKeys(exampleOptions, 'CM\\d+', '(?!.*(MISO|SDI)).*')[0]
+    report = validateMapping(assign(exampleMapping, {mappingIdx: pinModFuncKey}), exampleOptions)
+    assert flagged(report, ValidationRules.REGEX_FUNCTION) == rows(exampleMapping, [mappingIdx])
+    assert flagged(report, ValidationRules.REGEX_MODULE) == []
+
+def test_connector_is_reported(exampleMapping, exampleOptions):
+    mapping = exampleMapping.assign(**{MappingColumnLabels.CONNECTOR: 'J1'})
+    report  = validateMapping(mapping, exampleOptions)
+    assert (report.issues[MappingColumnLabels.CONNECTOR] == 'J1').all()
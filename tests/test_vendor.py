@@ -0,0 +1,74 @@
+# Copyright (c) 2023-2024 METTLER TOLEDO
+# Copyright (c) 2024 Philipp Miedl
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from pinmap.filebackend import OptionsColumnLabels
+from pinmap.filebackend import vendor
+from pinmap.filebackend.vendor import VendorBackend
+from pinmap.reload import optionKeyTable
+
+def pinRecords(options) -> list[dict]:
+    """The pins of an options object as records of the vendor format, including the removable N/C alternatives."""
+    initTable = options.initTable
+    numAlternatives = len(initTable.filter(regex=OptionsColumnLabels.REGEX_MODULES).columns)
+    records = []
+    for _, pin in initTable.iterrows():
+        alternatives = [{'index': altIdx, 'module': pin['ALT{}-Module'.format(altIdx)], 'function': pin['ALT{}-Function'.format(altIdx)]}
+                        for altIdx in range(numAlternatives) if pin['ALT{}-Module'.format(altIdx)] != '']
+        records.append({'board': pin[OptionsColumnLabels.BOARD_PIN], 'mcu': pin[OptionsColumnLabels.MCU_PIN], 'alternatives': alternatives})
+    return records
+
+def keyTable(options) -> list[tuple]:
+    """The pinModFunc keys by name and ALT index, which does not depend on the order of the interned keys."""
+    table = optionKeyTable(options).assign(**{'Alt-Index': options.pinModFunc['Alt-Index'].astype(int).values})
+    return sorted(table.itertuples(index=False, name=None))
+
+def writeXml(path, records: list[dict]) -> None:
+    root = ET.Element('pins')
+    for record in records:
+        pin = ET.SubElement(root, 'pin', board=record['board'], mcu=record['mcu'])
+        for alternative in record['alternatives']:
+            ET.SubElement(pin, 'alt', {key: str(value) for key, value in alternative.items()})
+    ET.ElementTree(root).write(path, encoding='utf-8')
+
+@pytest.mark.parametrize('fileEnding', ['.xml', '.json', '.jsonl'])
+def test_vendor_file_yields_same_options(tmp_path, exampleOptions, fileEnding, monkeypatch):
+    # A tiny chunk size splits the JSON objects across many reads.
+    monkeypatch.setattr(vendor, 'JSON_READ_CHUNK_SIZE', 7)
+    records  = pinRecords(exampleOptions)
+    filepath = tmp_path / ('vendor' + fileEnding)
+    if fileEnding == '.xml':
+        writeXml(filepath, records)
+    elif fileEnding == '.json':
+        filepath.write_text(json.dumps({'device': 'example', 'pins': records}, indent=1))
+    else:
+        filepath.write_text('\n'.join(json.dumps(record) for record in records) + '\n')
+    options = VendorBackend.readOptionsfile(filepath)
+    assert options.pins[OptionsColumnLabels.BOARD_PIN].tolist() == exampleOptions.pins[OptionsColumnLabels.BOARD_PIN].tolist()
+    assert keyTable(options) == keyTable(exampleOptions)
+
+def test_json_array_at_top_level(tmp_path):
+    filepath = tmp_path / 'vendor.json'
+    filepath.write_text(json.dumps([{'board': 'X1', 'mcu': 'P0', 'alternatives': [{'module': 'GPIO', 'function': 'IO0'}, {'module': 'N/C', 'function': 'N/C'}]},
+                                    {'board': 'X2', 'mcu': 'P1', 'alternatives': [{'module': 'GPIO', 'function': 'IO1'}]}]))
+    options = VendorBackend.readOptionsfile(filepath)
+    assert options.modules['names'].tolist() == ['GPIO']
+    assert options.pinModFunc.values.tolist() == [[0, 0, 0], [1, 1, 0]]
+
+def test_unsupported_file_type(tmp_path):
+    with pytest.raises(Exception, match='.csv'):
+        VendorBackend.readOptionsfile(tmp_path / 'vendor.csv')
+
+@pytest.mark.parametrize('members', [{'device': 'LPC[4357]'}, {'packages': [12345, {'name': 'LQFP[208]'}], 'count': 1234567}])
+def test_json_members_before_pins_are_skipped(tmp_path, exampleOptions, members, monkeypatch):
+    monkeypatch.setattr(vendor, 'JSON_READ_CHUNK_SIZE', 7)
+    filepath = tmp_path / 'vendor.json'
+    filepath.write_text(json.dumps(dict(members, pins=pinRecords(exampleOptions), checksum=[1, 2])))
+    options = VendorBackend.readOptionsfile(filepath)
+    assert keyTable(options) == keyTable(exampleOptions)